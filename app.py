@@ -1,16 +1,14 @@
 from fastapi import FastAPI, Request, Depends
 from mangum import Mangum
 from aws_lambda_powertools import Logger
-from middleware.request_id_middlware import RequestIdMiddleware
-from middleware.memory_cleanup_middleware import MemoryCleanupMiddleware
-from endpoints.get_all_routes import get_all_routes
+from endpoints.get_all_routes import LazyRouteLoader, get_all_routes
 from fastapi.middleware.cors import CORSMiddleware
-from middleware.jtw_middleware import JWTMiddleware
-from helpers.jwt import inject_user_token
-from middleware.cognito_auth_middleware import CognitoAuthMiddleware
+from middleware.request_pipeline_middleware import RequestPipelineMiddleware
+from helpers.consumed_capacity import install_capacity_hooks
+from helpers.dependency_timing import install_botocore_hooks
+from helpers.warm_up import warm_up
 import os
 import configparser
-from starlette.middleware.base import BaseHTTPMiddleware
 
 logger = Logger(service="workout-tracer-api")
 app = FastAPI(
@@ -39,10 +37,14 @@ elif stage == "staging":
 else:
     allowed_origins = ["http://localhost:3000", "http://localhost:8080"]
 
-app.add_middleware(CognitoAuthMiddleware)
-app.add_middleware(RequestIdMiddleware)
-app.add_middleware(JWTMiddleware)
-app.add_middleware(MemoryCleanupMiddleware)
+# Import each route group on its first request instead of at cold start
+if os.getenv("LAZY_ROUTES", "true").lower() == "true":
+    route_loader = LazyRouteLoader(app)
+else:
+    route_loader = None
+    app = get_all_routes(app)
+
+app.add_middleware(RequestPipelineMiddleware, route_loader=route_loader)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
@@ -51,8 +53,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-inject_user_token()
+# Clients copy the session's hooks on creation, so install before warm-up
+install_botocore_hooks()
+install_capacity_hooks()
 
-app = get_all_routes(app)
+# Preload during the Lambda init phase (see helpers.warm_up)
+warm_up(["dynamodb", "sqs", "secretsmanager", "pagination_token_key", "jwks"])
 
 handler = Mangum(app)
@@ -1,14 +1,37 @@
 import os
 from aws_lambda_powertools import Logger
-from aws_lambda_powertools.metrics import Metrics, MetricUnit
 import boto3
 from botocore.exceptions import ClientError
-import requests
+from helpers import dependency_timing
+from helpers.lazy_import import lazy_import
+from helpers.log_payload import log_payload
+from helpers.metrics_emitter import emit_duration, emit_metric
 import json
+import re
 import time
 import datetime
 import os
 
+# Only Strava calls need requests; keep it off the API cold start
+requests = lazy_import("requests")
+
+# StravaKeys secret, fetched once per container (preloaded by helpers.warm_up)
+_strava_keys_cache: dict | None = None
+
+
+def get_strava_keys() -> dict:
+    """Return the StravaKeys secret, reading Secrets Manager on first use only."""
+    global _strava_keys_cache
+    if _strava_keys_cache is None:
+        client = boto3.client("secretsmanager", region_name="us-west-2")
+        response = client.get_secret_value(SecretId="StravaKeys")
+        _strava_keys_cache = json.loads(response["SecretString"])
+    return _strava_keys_cache
+
+
+# Numeric ids in Strava API paths, collapsed so timings group per endpoint
+STRAVA_ID_SEGMENT = re.compile(r"/\d+")
+
 
 class StravaAuthCodeExchangeError(Exception):
     pass
@@ -24,10 +47,7 @@ class StravaClient:
             self.stage = stage
         else:
             self.stage = os.getenv("STAGE", "dev")
-        self.metrics = Metrics(
-            namespace=f"WorkoutTracer-{self.stage.upper()}",
-            service="workout_tracer_api",
-        )
+        self.metrics_namespace = f"WorkoutTracer-{self.stage.upper()}"
 
         strava_keys = self.get_strava_api_configs()
         self.strava_client_id = strava_keys[f"{self.stage.upper()}_STRAVA_CLIENT_ID"]
@@ -38,18 +58,40 @@ class StravaClient:
         self.verify_token = strava_keys.get(f"{self.stage.upper()}_VERIFY_TOKEN")
 
     def get_strava_api_configs(self):
-        client = boto3.client("secretsmanager", region_name="us-west-2")
-        response = client.get_secret_value(SecretId="StravaKeys")
+        return get_strava_keys()
+
+    def _emit_metric(self, metric_name, endpoint):
+        """Count a Strava API outcome, aggregated with the request's metrics."""
+        emit_metric(
+            metric_name,
+            {"service": "workout_tracer_api", "Endpoint": endpoint},
+            namespace=self.metrics_namespace,
+        )
 
-        secret = response["SecretString"]
-        return json.loads(secret)
+    def _request(self, method, url, **kwargs):
+        """
+        requests.request, timed as a Strava call of the current API request
+        and recorded in the StravaApiLatency histogram.
+        """
+        operation = STRAVA_ID_SEGMENT.sub("/{id}", url.split("strava.com", 1)[-1])
+        started = time.perf_counter()
+        try:
+            with dependency_timing.track("strava", operation):
+                return requests.request(method, url, **kwargs)
+        finally:
+            emit_duration(
+                "StravaApiLatency",
+                (time.perf_counter() - started) * 1000,
+                {"service": "workout_tracer_api", "Endpoint": operation},
+                namespace=self.metrics_namespace,
+            )
 
     def get_strava_callback_url(self, auth_code):
-        self.metrics.add_dimension(name="Endpoint", value="/oauth/token")
-        self.metrics.add_metric(name="StravaApiCall", unit=MetricUnit.Count, value=1)
+        self._emit_metric("StravaApiCall", "/oauth/token")
 
         try:
-            response = requests.post(
+            response = self._request(
+                "POST",
                 "https://www.strava.com/oauth/token",
                 data={
                     "client_id": self.strava_client_id,
@@ -63,30 +105,24 @@ class StravaClient:
             athlete = tokens.get("athlete", {})
             if "access_token" not in tokens or not athlete:
                 self.logger.error(
-                    f"Invalid response from Strava API: Missing access token or athlete data. {tokens}"
+                    "Invalid response from Strava API: Missing access token or athlete data. %s",
+                    log_payload(tokens),
                 )
                 raise StravaAuthCodeExchangeError(
                     "Invalid response from Strava API: Missing access token or athlete data."
                 )
             self.logger.info("Successfully exchanged Strava auth code for tokens.")
-            self.metrics.add_metric(
-                name="StravaSuccess", unit=MetricUnit.Count, value=1
-            )
-            self.metrics.flush_metrics()
+            self._emit_metric("StravaSuccess", "/oauth/token")
             return tokens, athlete
         except requests.RequestException as e:
-            self.metrics.add_metric(
-                name="StravaException", unit=MetricUnit.Count, value=1
-            )
-            self.metrics.flush_metrics()
+            self._emit_metric("StravaException", "/oauth/token")
             self.logger.error(f"Error exchanging Strava auth code: {e}")
             raise StravaAuthCodeExchangeError(f"Error exchanging Strava auth code: {e}")
 
     def get_athlete_activities(
         self, access_token, per_page=200, after=None, before=None
     ):
-        self.metrics.add_dimension(name="Endpoint", value="/api/v3/athlete/activities")
-        self.metrics.add_metric(name="StravaApiCall", unit=MetricUnit.Count, value=1)
+        self._emit_metric("StravaApiCall", "/api/v3/athlete/activities")
         self.logger.info(
             f"Fetching athlete activities with per_page={per_page}, after={after}, before={before}"
         )
@@ -119,7 +155,7 @@ class StravaClient:
             self.logger.debug(f"Requesting page {page} with params: {params}")
 
             try:
-                response = requests.get(url, headers=headers, params=params)
+                response = self._request("GET", url, headers=headers, params=params)
                 request_count += 1
 
                 self.logger.debug(
@@ -136,10 +172,7 @@ class StravaClient:
                         f"Request failed (page {page}): {response.status_code}"
                     )
                     self.logger.error(response.text)
-                    self.metrics.add_metric(
-                        name="StravaException", unit=MetricUnit.Count, value=1
-                    )
-                    self.metrics.flush_metrics()
+                    self._emit_metric("StravaException", "/api/v3/athlete/activities")
                     break
 
                 data = response.json()
@@ -157,15 +190,9 @@ class StravaClient:
                     time.sleep(15 * 60)
                     request_count = 0  # reset after wait
 
-                self.metrics.add_metric(
-                    name="StravaSuccess", unit=MetricUnit.Count, value=1
-                )
-                self.metrics.flush_metrics()
+                self._emit_metric("StravaSuccess", "/api/v3/athlete/activities")
             except requests.RequestException as e:
-                self.metrics.add_metric(
-                    name="StravaException", unit=MetricUnit.Count, value=1
-                )
-                self.metrics.flush_metrics()
+                self._emit_metric("StravaException", "/api/v3/athlete/activities")
                 self.logger.error(f"Error fetching athlete activities: {e}")
                 raise StravaAuthCodeExchangeError(
                     f"Error fetching athlete activities: {e}"
@@ -175,8 +202,7 @@ class StravaClient:
         return all_activities
 
     def get_full_activity_by_id(self, access_token, activity_id):
-        self.metrics.add_dimension(name="Endpoint", value="/api/v3/activities")
-        self.metrics.add_metric(name="StravaApiCall", unit=MetricUnit.Count, value=1)
+        self._emit_metric("StravaApiCall", "/api/v3/activities")
         url = f"https://www.strava.com/api/v3/activities/{activity_id}"
         headers = {
             "Authorization": f"Bearer {access_token}",
@@ -184,53 +210,38 @@ class StravaClient:
         }
 
         try:
-            response = requests.get(url, headers=headers)
+            response = self._request("GET", url, headers=headers)
             if response.status_code == 200:
-                self.metrics.add_metric(
-                    name="StravaSuccess", unit=MetricUnit.Count, value=1
-                )
-                self.metrics.flush_metrics()
+                self._emit_metric("StravaSuccess", "/api/v3/activities")
                 return response.json()
             elif response.status_code == 404:
-                self.metrics.add_metric(
-                    name="StravaNotFound", unit=MetricUnit.Count, value=1
-                )
-                self.metrics.flush_metrics()
+                self._emit_metric("StravaNotFound", "/api/v3/activities")
                 self.logger.error(f"Activity with ID {activity_id} not found.")
             elif response.status_code == 401:
-                self.metrics.add_metric(
-                    name="StravaUnauthorized", unit=MetricUnit.Count, value=1
-                )
-                self.metrics.flush_metrics()
+                self._emit_metric("StravaUnauthorized", "/api/v3/activities")
                 self.logger.error("Unauthorized. Check your access token.")
             else:
-                self.metrics.add_metric(
-                    name="StravaException", unit=MetricUnit.Count, value=1
-                )
-                self.metrics.flush_metrics()
+                self._emit_metric("StravaException", "/api/v3/activities")
                 self.logger.error(
                     f"Failed to retrieve activity. Status: {response.status_code}"
                 )
                 self.logger.error(response.text)
         except requests.RequestException as e:
-            self.metrics.add_metric(
-                name="StravaException", unit=MetricUnit.Count, value=1
-            )
-            self.metrics.flush_metrics()
+            self._emit_metric("StravaException", "/api/v3/activities")
             self.logger.error(f"Error fetching activity by ID: {e}")
             raise StravaAuthCodeExchangeError(f"Error fetching activity by ID: {e}")
 
         return None
 
     def refresh_access_token(self, refresh_token):
-        self.metrics.add_dimension(name="Endpoint", value="/oauth/token")
-        self.metrics.add_metric(name="StravaApiCall", unit=MetricUnit.Count, value=1)
+        self._emit_metric("StravaApiCall", "/oauth/token")
         """
         Refresh the Strava access token using the refresh token.
         Returns the new token response dict.
         """
         try:
-            response = requests.post(
+            response = self._request(
+                "POST",
                 "https://www.strava.com/oauth/token",
                 data={
                     "client_id": self.strava_client_id,
@@ -242,24 +253,17 @@ class StravaClient:
             response.raise_for_status()
             tokens = response.json()
             self.logger.info("Successfully refreshed Strava access token.")
-            self.metrics.add_metric(
-                name="StravaSuccess", unit=MetricUnit.Count, value=1
-            )
-            self.metrics.flush_metrics()
+            self._emit_metric("StravaSuccess", "/oauth/token")
             return tokens
         except requests.RequestException as e:
-            self.metrics.add_metric(
-                name="StravaException", unit=MetricUnit.Count, value=1
-            )
-            self.metrics.flush_metrics()
+            self._emit_metric("StravaException", "/oauth/token")
             self.logger.error(f"Error refreshing Strava access token: {e}")
             raise StravaAuthCodeExchangeError(
                 f"Error refreshing Strava access token: {e}"
             )
 
     def create_push_subscription(self, access_token=None):
-        self.metrics.add_dimension(name="Endpoint", value="/api/v3/push_subscriptions")
-        self.metrics.add_metric(name="StravaApiCall", unit=MetricUnit.Count, value=1)
+        self._emit_metric("StravaApiCall", "/api/v3/push_subscriptions")
         """
         Subscribe to Strava push notifications.
         See: https://www.strava.com/api/v3/push_subscriptions
@@ -277,19 +281,13 @@ class StravaClient:
             "verify_token": verify_token,
         }
         try:
-            response = requests.post(url, headers=headers, data=data)
+            response = self._request("POST", url, headers=headers, data=data)
             response.raise_for_status()
             self.logger.info("Successfully created Strava push subscription.")
-            self.metrics.add_metric(
-                name="StravaSuccess", unit=MetricUnit.Count, value=1
-            )
-            self.metrics.flush_metrics()
+            self._emit_metric("StravaSuccess", "/api/v3/push_subscriptions")
             return response.json()
         except requests.RequestException as e:
-            self.metrics.add_metric(
-                name="StravaException", unit=MetricUnit.Count, value=1
-            )
-            self.metrics.flush_metrics()
+            self._emit_metric("StravaException", "/api/v3/push_subscriptions")
             self.logger.error(f"Error creating Strava push subscription: {e}")
             if hasattr(e, "response") and e.response is not None:
                 self.logger.error(f"Response: {e.response.text}")
@@ -300,8 +298,7 @@ class StravaClient:
     def get_athlete_activities_with_token(
         self, access_token, per_page=200, next_token=None
     ):
-        self.metrics.add_dimension(name="Endpoint", value="/api/v3/athlete/activities")
-        self.metrics.add_metric(name="StravaApiCall", unit=MetricUnit.Count, value=1)
+        self._emit_metric("StravaApiCall", "/api/v3/athlete/activities")
         self.logger.info(
             f"Fetching athlete activities with per_page={per_page}, next_token={next_token}"
         )
@@ -328,7 +325,7 @@ class StravaClient:
         self.logger.debug(f"Requesting page {page} with params: {params}")
 
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = self._request("GET", url, headers=headers, params=params)
             request_count += 1
 
             self.logger.debug(
@@ -345,10 +342,7 @@ class StravaClient:
                     f"Request failed (page {page}): {response.status_code}"
                 )
                 self.logger.error(response.text)
-                self.metrics.add_metric(
-                    name="StravaException", unit=MetricUnit.Count, value=1
-                )
-                self.metrics.flush_metrics()
+                self._emit_metric("StravaException", "/api/v3/athlete/activities")
                 return [], None
 
             data = response.json()
@@ -374,10 +368,7 @@ class StravaClient:
 
             all_activities.extend(data)
 
-            self.metrics.add_metric(
-                name="StravaSuccess", unit=MetricUnit.Count, value=1
-            )
-            self.metrics.flush_metrics()
+            self._emit_metric("StravaSuccess", "/api/v3/athlete/activities")
 
             if len(data) < per_page:
                 self.logger.info(f"Last page reached at page {page}.")
@@ -386,10 +377,7 @@ class StravaClient:
                 next_token = page + 1
 
         except requests.RequestException as e:
-            self.metrics.add_metric(
-                name="StravaException", unit=MetricUnit.Count, value=1
-            )
-            self.metrics.flush_metrics()
+            self._emit_metric("StravaException", "/api/v3/athlete/activities")
             self.logger.error(f"Error fetching athlete activities: {e}")
             raise StravaAuthCodeExchangeError(f"Error fetching athlete activities: {e}")
 
@@ -12,12 +12,16 @@ from exceptions.jwt_exeptions import (
 )
 from fastapi.responses import JSONResponse
 from botocore.exceptions import ClientError
+from helpers import request_profiler
 
 
 def exceptions_decorator(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
         try:
+            profile = request_profiler.active_profile()
+            if profile is not None:
+                return profile.run(func, *args, **kwargs)
             return func(*args, **kwargs)
 
         # 4XX
@@ -3,11 +3,18 @@ import boto3
 from botocore.exceptions import ClientError
 from dynamodb.models.apple_health_workout_model import AppleHealthWorkoutModel
 from dynamodb.helpers.location_helper import LocationHelper
+from dynamodb.helpers.workout_change_log_helper import WorkoutChangeLogHelper
+from dynamodb.helpers.workout_stats_helper import WorkoutStatsHelper
+from helpers.polyline_resolution import build_polyline_variants
 import os
 from decimal import Decimal
 from datetime import datetime
 from typing import Any, List, Dict, Tuple
 from constants.general import SERVICE_NAME
+import time
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_SIZE = 100
 
 
 class AppleHealthWorkoutHelper:
@@ -23,6 +30,8 @@ class AppleHealthWorkoutHelper:
         if request_id:
             self.logger.append_keys(request_id=request_id)
         self._location_helper = LocationHelper(request_id=request_id)
+        self._change_log_helper = WorkoutChangeLogHelper(request_id=request_id)
+        self._stats_helper = WorkoutStatsHelper(request_id=request_id)
 
     @property
     def _kml_cache(self) -> Dict[str, bytes]:
@@ -44,6 +53,7 @@ class AppleHealthWorkoutHelper:
         pk = AppleHealthWorkoutModel.create_pk(user_id)
         sk = AppleHealthWorkoutModel.create_sk(workout_uuid)
         item = self.convert_floats_to_decimal(workout.dict())
+        item.update(build_polyline_variants(item.get("summary_polyline")))
         item["PK"] = pk
         item["SK"] = sk
 
@@ -52,9 +62,25 @@ class AppleHealthWorkoutHelper:
                 f"Attempting to put Apple Health workout for user_id={user_id}, workout_uuid={workout_uuid}"
             )
 
-            before_item = self.table.get_item(Key={"PK": pk, "SK": sk}).get("Item")
-            action = "update" if before_item else "create"
-            self.table.put_item(Item=item)
+            def build():
+                before_item = self.table.get_item(
+                    Key={"PK": pk, "SK": sk}, ConsistentRead=True
+                ).get("Item")
+                action = "update" if before_item else "create"
+                # Fails if another write changed the workout since it was read
+                put = {
+                    "TableName": self.table.name,
+                    "Item": item,
+                    **self._stats_helper.stats_condition("apple_health", before_item),
+                }
+                # The workout, its stats rollup deltas and its change event
+                return [{"Put": put}] + self._stats_helper.stats_updates(
+                    user_id, "apple_health", before_item, item
+                ), action
+
+            action = self._change_log_helper.transact_change(
+                user_id, "apple_health", workout_uuid, build
+            )
             self.logger.debug(
                 f"Successfully put Apple Health workout {workout_uuid} for {user_id}"
             )
@@ -91,14 +117,27 @@ class AppleHealthWorkoutHelper:
             )
             raise
 
-    def get_apple_health_workout(self, user_id: str, workout_uuid: str) -> dict | None:
+    def get_apple_health_workout(
+        self,
+        user_id: str,
+        workout_uuid: str,
+        projection_expression: str = None,
+        expression_attribute_names: dict = None,
+    ) -> dict | None:
         """
         Retrieve an Apple Health workout from DynamoDB and return as a JSON-serializable dict.
+        Optional projection_expression and expression_attribute_names can be
+        passed to fetch only specific fields.
         """
         try:
             pk = AppleHealthWorkoutModel.create_pk(user_id)
             sk = AppleHealthWorkoutModel.create_sk(workout_uuid)
-            response = self.table.get_item(Key={"PK": pk, "SK": sk})
+            get_kwargs = {"Key": {"PK": pk, "SK": sk}}
+            if projection_expression:
+                get_kwargs["ProjectionExpression"] = projection_expression
+            if expression_attribute_names:
+                get_kwargs["ExpressionAttributeNames"] = expression_attribute_names
+            response = self.table.get_item(**get_kwargs)
             item = response.get("Item")
             if not item:
                 self.logger.warning(
@@ -119,6 +158,56 @@ class AppleHealthWorkoutHelper:
             )
             return None
 
+    def batch_get_apple_health_workouts(
+        self,
+        user_id: str,
+        workout_uuids: List[str],
+        projection_expression: str = None,
+        expression_attribute_names: dict = None,
+    ) -> Dict[str, dict]:
+        """
+        Retrieve many Apple Health workouts of one user with BatchGetItem, up to
+        BATCH_GET_SIZE keys per request. Returns {workout_uuid: workout};
+        workouts that do not exist are absent. Errors are raised.
+        """
+        workouts = {}
+        sks = [
+            AppleHealthWorkoutModel.create_sk(workout_uuid)
+            for workout_uuid in dict.fromkeys(workout_uuids)
+        ]
+        for start in range(0, len(sks), BATCH_GET_SIZE):
+            request = {
+                "Keys": [
+                    {"PK": AppleHealthWorkoutModel.create_pk(user_id), "SK": sk}
+                    for sk in sks[start : start + BATCH_GET_SIZE]
+                ]
+            }
+            if projection_expression:
+                # SK maps each item back to its workout uuid
+                request["ProjectionExpression"] = f"SK, {projection_expression}"
+            if expression_attribute_names:
+                request["ExpressionAttributeNames"] = expression_attribute_names
+            request_items = {self.table.name: request}
+            attempt = 0
+            while request_items:
+                try:
+                    response = self.dynamodb.batch_get_item(RequestItems=request_items)
+                except ClientError as e:
+                    self.logger.error(
+                        f"Error batch retrieving Apple Health workouts for user_id {user_id}: {e}"
+                    )
+                    raise
+                for item in response.get("Responses", {}).get(self.table.name, []):
+                    item.pop("PK", None)
+                    workout_uuid = item.pop("SK").split("#", 1)[-1]
+                    workouts[workout_uuid] = self._decimals_to_floats(item)
+                request_items = response.get("UnprocessedKeys")
+                if request_items:
+                    # Throttled keys come back unprocessed; back off and retry them
+                    attempt += 1
+                    time.sleep(min(0.05 * 2**attempt, 1))
+        return workouts
+
     def get_all_workouts(
         self,
         user_id: str,
@@ -132,37 +221,13 @@ class AppleHealthWorkoutHelper:
         Returns a dict: { "workouts": [...], "next_token": ... }
         """
         try:
-            pk = AppleHealthWorkoutModel.create_pk(user_id)
-            sk_prefix = AppleHealthWorkoutModel.create_sk("")
-            query_kwargs = {
-                "KeyConditionExpression": boto3.dynamodb.conditions.Key("PK").eq(pk)
-                & boto3.dynamodb.conditions.Key("SK").begins_with(sk_prefix),
-                "Limit": limit,
-            }
-            if next_token:
-                query_kwargs["ExclusiveStartKey"] = next_token
-            if projection_expression:
-                query_kwargs["ProjectionExpression"] = projection_expression
-            if expression_attribute_names:
-                query_kwargs["ExpressionAttributeNames"] = expression_attribute_names
-
-            response = self.table.query(**query_kwargs)
-            items = response.get("Items", [])
-            workouts = [self._decimals_to_floats(item) for item in items]
-            result = {"workouts": workouts}
-            last_evaluated_key = response.get("LastEvaluatedKey")
-
-            if items and last_evaluated_key:
-                if next_token and last_evaluated_key == next_token:
-                    self.logger.warning(
-                        "LastEvaluatedKey is same as ExclusiveStartKey, breaking pagination loop."
-                    )
-                    result["next_token"] = None
-                else:
-                    result["next_token"] = last_evaluated_key
-            else:
-                result["next_token"] = None
-            return result
+            return self._query_workouts(
+                user_id,
+                limit=limit,
+                next_token=next_token,
+                projection_expression=projection_expression,
+                expression_attribute_names=expression_attribute_names,
+            )
         except ClientError as e:
             self.logger.error(
                 f"Error retrieving all Apple Health workouts for user_id {user_id}: {e}"
@@ -174,6 +239,108 @@ class AppleHealthWorkoutHelper:
             )
             return {"workouts": [], "next_token": None}
 
+    def _query_workouts(
+        self,
+        user_id: str,
+        limit: int = 500,
+        next_token: dict = None,
+        projection_expression: str = None,
+        expression_attribute_names: dict = None,
+    ) -> dict:
+        """
+        One page of Apple Health workouts for a user, as returned by
+        get_all_workouts. DynamoDB errors are raised.
+        """
+        pk = AppleHealthWorkoutModel.create_pk(user_id)
+        sk_prefix = AppleHealthWorkoutModel.create_sk("")
+        query_kwargs = {
+            "KeyConditionExpression": boto3.dynamodb.conditions.Key("PK").eq(pk)
+            & boto3.dynamodb.conditions.Key("SK").begins_with(sk_prefix),
+            "Limit": limit,
+        }
+        if next_token:
+            query_kwargs["ExclusiveStartKey"] = next_token
+        if projection_expression:
+            query_kwargs["ProjectionExpression"] = projection_expression
+        if expression_attribute_names:
+            query_kwargs["ExpressionAttributeNames"] = expression_attribute_names
+
+        response = self.table.query(**query_kwargs)
+        items = response.get("Items", [])
+        workouts = [self._decimals_to_floats(item) for item in items]
+        result = {"workouts": workouts}
+        last_evaluated_key = response.get("LastEvaluatedKey")
+
+        if items and last_evaluated_key:
+            if next_token and last_evaluated_key == next_token:
+                self.logger.warning(
+                    "LastEvaluatedKey is same as ExclusiveStartKey, breaking pagination loop."
+                )
+                result["next_token"] = None
+            else:
+                result["next_token"] = last_evaluated_key
+        else:
+            result["next_token"] = None
+        return result
+
+    def iter_all_workouts(
+        self,
+        user_id: str,
+        page_size: int = 500,
+        projection_expression: str = None,
+        expression_attribute_names: dict = None,
+    ):
+        """
+        Lazily yield every Apple Health workout for a user, paging DynamoDB one
+        page at a time so only a single page is held in memory. Errors are
+        raised, so a failed page never looks like the end of the workouts.
+        """
+        next_token = None
+        while True:
+            result = self._query_workouts(
+                user_id,
+                limit=page_size,
+                next_token=next_token,
+                projection_expression=projection_expression,
+                expression_attribute_names=expression_attribute_names,
+            )
+            yield from result.get("workouts", [])
+            next_token = result.get("next_token")
+            if not next_token:
+                break
+
+    def get_all_workout_locations(self, user_id: str) -> dict:
+        """
+        Returns a summary of all locations a user has worked out in, broken
+        down by workout activity type and total count. Same shape as
+        StravaWorkoutHelper.get_all_workout_locations.
+        """
+        summary: Dict[str, Dict[str, Dict[str, int]]] = {
+            "countries": {},
+            "states": {},
+        }
+        try:
+            for workout in self.iter_all_workouts(
+                user_id,
+                projection_expression="#loc, workout_activity_type",
+                expression_attribute_names={"#loc": "locations"},
+            ):
+                sport_type = workout.get("workout_activity_type") or "Unknown"
+                locations = workout.get("locations") or {}
+                for location_type in ("states", "countries"):
+                    for name, visited in (locations.get(location_type) or {}).items():
+                        if not visited:
+                            continue
+                        entry = summary[location_type].setdefault(name, {"total": 0})
+                        entry[sport_type] = entry.get(sport_type, 0) + 1
+                        entry["total"] += 1
+        except ClientError as e:
+            self.logger.error(
+                f"Error retrieving workout locations for user_id {user_id}: {e}"
+            )
+            return {"locations": {"countries": {}, "states": {}}}
+        return {"locations": summary}
+
     def get_all_workout_ids(self, user_id: str) -> List[str]:
         """
         Retrieve all Apple Health workout UUIDs for a user.
@@ -219,10 +386,32 @@ class AppleHealthWorkoutHelper:
         pk = AppleHealthWorkoutModel.create_pk(user_id)
         sk = AppleHealthWorkoutModel.create_sk(workout_uuid)
         try:
-            response = self.table.delete_item(
-                Key={"PK": pk, "SK": sk}, ReturnValues="ALL_OLD"
+
+            def build():
+                before_item = self.table.get_item(
+                    Key={"PK": pk, "SK": sk}, ConsistentRead=True
+                ).get("Item")
+                if not before_item:
+                    return [], None
+                # Delete the workout and back its stats out of the rollups
+                return [
+                    {
+                        "Delete": {
+                            "TableName": self.table.name,
+                            "Key": {"PK": pk, "SK": sk},
+                            **self._stats_helper.stats_condition(
+                                "apple_health", before_item
+                            ),
+                        }
+                    }
+                ] + self._stats_helper.stats_updates(
+                    user_id, "apple_health", before_item, None
+                ), "delete"
+
+            deleted = self._change_log_helper.transact_change(
+                user_id, "apple_health", workout_uuid, build
             )
-            if "Attributes" in response:
+            if deleted:
                 self.logger.info(
                     f"Successfully deleted Apple Health workout {workout_uuid} for user_id {user_id}"
                 )
@@ -246,13 +435,35 @@ class AppleHealthWorkoutHelper:
         """
         pk = AppleHealthWorkoutModel.create_pk(user_id)
         sk = AppleHealthWorkoutModel.create_sk(workout_uuid)
-        try:
-            self.table.update_item(
+        update = {
+            "Update": {
+                "TableName": self.table.name,
+                "Key": {"PK": pk, "SK": sk},
+                "UpdateExpression": "SET #loc = :locations",
+                # Never recreate a workout deleted since enrichment started
+                "ConditionExpression": "attribute_exists(SK)",
+                "ExpressionAttributeNames": {"#loc": "locations"},
+                "ExpressionAttributeValues": {":locations": locations},
+            }
+        }
+
+        def build():
+            exists = self.table.get_item(
                 Key={"PK": pk, "SK": sk},
-                UpdateExpression="SET #loc = :locations",
-                ExpressionAttributeNames={"#loc": "locations"},
-                ExpressionAttributeValues={":locations": locations},
+                ProjectionExpression="SK",
+                ConsistentRead=True,
+            ).get("Item")
+            return ([update], "update") if exists else ([], None)
+
+        try:
+            action = self._change_log_helper.transact_change(
+                user_id, "apple_health", workout_uuid, build
             )
+            if action is None:
+                self.logger.info(
+                    f"Workout {workout_uuid} for user {user_id} no longer exists, skipping locations"
+                )
+                return False
             self.logger.info(
                 f"Updated locations for Apple Health workout {workout_uuid}, user {user_id}"
             )
@@ -21,6 +21,57 @@ class LocationHelper:
             self.logger.append_keys(request_id=request_id)
         self._kml_cache: Dict[str, bytes] = {}
 
+    def get_geometry_index(self, kml_file_name: str) -> Tuple[List[str], Any]:
+        """
+        Return (region names, STRtree over their geometries) for a KML file,
+        building it on first use and caching it per container.
+        """
+        from lxml import etree
+        from shapely.geometry import Polygon
+        from shapely.ops import unary_union
+        from shapely.strtree import STRtree
+
+        if kml_file_name in _KML_GEOMETRY_CACHE:
+            self.logger.info(f"Using cached geometry index for {kml_file_name} (warm)")
+            return _KML_GEOMETRY_CACHE[kml_file_name]
+
+        self.logger.info(f"Building geometry index for {kml_file_name} (cold)")
+        if kml_file_name not in self._kml_cache:
+            s3 = boto3.client("s3", region_name="us-west-2")
+            bucket = "workout-tracer-kml-files-851753231474-us-west-2-an"
+            self._kml_cache[kml_file_name] = s3.get_object(
+                Bucket=bucket, Key=kml_file_name
+            )["Body"].read()
+
+        xml_tree = etree.fromstring(self._kml_cache[kml_file_name])
+        ns = {"kml": "http://www.opengis.net/kml/2.2"}
+        names = []
+        geometries = []
+        for placemark in xml_tree.findall(".//kml:Placemark", ns):
+            raw_name = placemark.findtext("kml:name", namespaces=ns)
+            name = re.sub(r"<[^>]+>", "", raw_name).strip()
+            if name in COUNTRIES:
+                name = COUNTRIES[name]
+            polys = []
+            for coord_el in placemark.findall(".//kml:coordinates", ns):
+                pts = [
+                    (float(x), float(y))
+                    for x, y, *_ in (
+                        c.split(",") for c in coord_el.text.strip().split()
+                    )
+                ]
+                if len(pts) >= 3:
+                    polys.append(Polygon(pts))
+            if polys:
+                names.append(name)
+                geometries.append(unary_union(polys))
+
+        _KML_GEOMETRY_CACHE[kml_file_name] = (names, STRtree(geometries))
+        self.logger.info(
+            f"Geometry index built for {kml_file_name}: {len(names)} regions"
+        )
+        return _KML_GEOMETRY_CACHE[kml_file_name]
+
     def get_location_badges(
         self, workout_polyline: str, kml_file_name: str
     ) -> Dict[str, bool]:
@@ -32,57 +83,13 @@ class LocationHelper:
         KML bytes are cached on the instance to avoid redundant S3 fetches within
         the same Lambda invocation.
         """
-        import polyline as polyline_lib
-        from lxml import etree
-        from shapely.geometry import LineString, Polygon
-        from shapely.ops import unary_union
-        from shapely.strtree import STRtree
+        from shapely.geometry import LineString
+        from helpers.polyline_codec import decode as decode_polyline
 
         try:
-            if kml_file_name not in _KML_GEOMETRY_CACHE:
-                self.logger.info(f"Building geometry index for {kml_file_name} (cold)")
-                if kml_file_name not in self._kml_cache:
-                    s3 = boto3.client("s3", region_name="us-west-2")
-                    bucket = "workout-tracer-kml-files-851753231474-us-west-2-an"
-                    self._kml_cache[kml_file_name] = s3.get_object(
-                        Bucket=bucket, Key=kml_file_name
-                    )["Body"].read()
-
-                xml_tree = etree.fromstring(self._kml_cache[kml_file_name])
-                ns = {"kml": "http://www.opengis.net/kml/2.2"}
-                names = []
-                geometries = []
-                for placemark in xml_tree.findall(".//kml:Placemark", ns):
-                    raw_name = placemark.findtext("kml:name", namespaces=ns)
-                    name = re.sub(r"<[^>]+>", "", raw_name).strip()
-                    if name in COUNTRIES:
-                        name = COUNTRIES[name]
-                    polys = []
-                    for coord_el in placemark.findall(".//kml:coordinates", ns):
-                        pts = [
-                            (float(x), float(y))
-                            for x, y, *_ in (
-                                c.split(",") for c in coord_el.text.strip().split()
-                            )
-                        ]
-                        if len(pts) >= 3:
-                            polys.append(Polygon(pts))
-                    if polys:
-                        names.append(name)
-                        geometries.append(unary_union(polys))
-
-                _KML_GEOMETRY_CACHE[kml_file_name] = (names, STRtree(geometries))
-                self.logger.info(
-                    f"Geometry index built for {kml_file_name}: {len(names)} regions"
-                )
-            else:
-                self.logger.info(
-                    f"Using cached geometry index for {kml_file_name} (warm)"
-                )
-
-            names, spatial_index = _KML_GEOMETRY_CACHE[kml_file_name]
-            coords = polyline_lib.decode(workout_polyline)
-            line = LineString([(lon, lat) for lat, lon in coords])
+            names, spatial_index = self.get_geometry_index(kml_file_name)
+            # (lat, lon) rows flipped to the (x, y) order shapely expects
+            line = LineString(decode_polyline(workout_polyline)[:, ::-1])
 
             results = {name: False for name in names}
             for idx in spatial_index.query(line, predicate="intersects"):
@@ -0,0 +1,299 @@
+from aws_lambda_powertools import Logger
+import boto3
+from botocore.exceptions import ClientError
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable
+from constants.general import SERVICE_NAME
+from dynamodb.helpers.apple_health_workout_helper import AppleHealthWorkoutHelper
+from dynamodb.helpers.strava_profile_helper import StravaProfileHelper
+from dynamodb.helpers.strava_workout_helper import StravaWorkoutHelper
+from dynamodb.helpers.user_profile_helper import UserProfileHelper
+from dynamodb.helpers.workout_stats_helper import WorkoutStatsHelper
+import json
+import os
+import time
+
+# Sections of the bundle item, each refreshed by the write paths that change it
+BUNDLE_SECTIONS = ("profile", "strava", "stats", "locations")
+# Sections that scan every workout to rebuild; workout writes queue these
+# instead of rebuilding them inline (see request_refresh)
+DEFERRED_SECTIONS = ("locations",)
+# Writes within this window of the first one are folded into a single rebuild
+BUNDLE_DEBOUNCE_SECONDS = int(os.getenv("BUNDLE_DEBOUNCE_SECONDS", "60"))
+
+# Profile item attributes copied into the bundle
+PROFILE_FIELDS = ("name", "user_display_id", "distance_unit", "show_workout_source")
+# Strava profile attributes copied into the bundle
+STRAVA_FIELDS = (
+    "strava_id",
+    "firstname",
+    "lastname",
+    "city",
+    "profile_medium",
+    "profile",
+)
+
+
+def _decimal_default(value: Decimal):
+    return int(value) if value == value.to_integral_value() else float(value)
+
+
+def _to_dynamo(value):
+    return json.loads(json.dumps(value, default=_decimal_default), parse_float=Decimal)
+
+
+def _from_dynamo(value):
+    return json.loads(json.dumps(value, default=_decimal_default))
+
+
+class PublicBundleHelper:
+    """
+    Helper class for the denormalized PUBLIC_BUNDLE item, which holds
+    everything a public profile page renders (profile fields, Strava name and
+    avatar, headline stats and the location summary) so it can be served
+    with a single GetItem.
+    """
+
+    def __init__(self, request_id: str = None):
+        self.dynamodb = boto3.resource("dynamodb", region_name="us-west-2")
+        table_name = os.getenv("TABLE_NAME", "WorkoutTracer-UserTable-Staging")
+        self.table = self.dynamodb.Table(table_name)
+        self.logger = Logger(service=SERVICE_NAME)
+        self.request_id = request_id
+        if request_id:
+            self.logger.append_keys(request_id=request_id)
+        self.sk = "PUBLIC_BUNDLE"
+
+    @staticmethod
+    def merge_location_summaries(
+        base: Dict[str, Dict[str, Dict[str, int]]],
+        addition: Dict[str, Dict[str, Dict[str, int]]],
+    ) -> None:
+        """Merge location summary dicts in-place into base."""
+        for location_type in ("states", "countries"):
+            for name, sport_counts in (addition.get(location_type) or {}).items():
+                entry = base[location_type].setdefault(name, {"total": 0})
+                for sport, count in sport_counts.items():
+                    entry[sport] = entry.get(sport, 0) + count
+
+    def get_combined_locations(self, user_id: str) -> dict:
+        """Location summary across Strava and Apple Health workouts."""
+        strava_locations = StravaWorkoutHelper(
+            request_id=self.request_id
+        ).get_all_workout_locations(user_id)
+        ah_locations = AppleHealthWorkoutHelper(
+            request_id=self.request_id
+        ).get_all_workout_locations(user_id)
+
+        combined = strava_locations.get("locations", {"countries": {}, "states": {}})
+        self.merge_location_summaries(combined, ah_locations.get("locations", {}))
+        return {"locations": combined}
+
+    def _build_profile(self, user_id: str) -> dict:
+        item = self.table.get_item(
+            Key={"PK": f"USER#{user_id}", "SK": "USER_PROFILE"}
+        ).get("Item")
+        return {field: (item or {}).get(field) for field in PROFILE_FIELDS}
+
+    def _build_strava(self, user_id: str) -> dict:
+        strava_profile = StravaProfileHelper(
+            request_id=self.request_id
+        ).get_strava_profile(user_id)
+        return {field: (strava_profile or {}).get(field) for field in STRAVA_FIELDS}
+
+    def _build_stats(self, user_id: str) -> dict:
+        """Headline all-time totals across sources plus per-type rollups."""
+        stats_helper = WorkoutStatsHelper(request_id=self.request_id)
+        by_type: Dict[str, dict] = {}
+        for source in ("strava", "apple_health"):
+            for stats in stats_helper.get_stats(user_id, source):
+                entry = by_type.setdefault(
+                    stats["type"],
+                    {key: 0 for key in stats if key != "type"},
+                )
+                for key, value in stats.items():
+                    if key != "type":
+                        entry[key] = entry.get(key, 0) + value
+        totals = {
+            key: sum(entry.get(key, 0) for entry in by_type.values())
+            for key in ("count", "total_distance", "total_moving_time")
+        }
+        return {
+            "total_workouts": totals["count"],
+            "total_distance": totals["total_distance"],
+            "total_moving_time": totals["total_moving_time"],
+            "by_type": [
+                {"type": workout_type, **entry}
+                for workout_type, entry in sorted(by_type.items())
+            ],
+        }
+
+    def _build_locations(self, user_id: str) -> dict:
+        return self.get_combined_locations(user_id)["locations"]
+
+    def refresh(self, user_id: str, sections: Iterable[str] = BUNDLE_SECTIONS) -> dict:
+        """
+        Rebuild the given bundle sections and write them onto the bundle item,
+        leaving the other sections untouched. Returns the rebuilt sections.
+        """
+        builders = {
+            "profile": self._build_profile,
+            "strava": self._build_strava,
+            "stats": self._build_stats,
+            "locations": self._build_locations,
+        }
+        updated = {section: builders[section](user_id) for section in sections}
+        if not updated:
+            return {}
+
+        expr_attr_names = {"#updated_at": "updated_at"}
+        expr_attr_values = {":updated_at": datetime.utcnow().isoformat()}
+        update_expr = ["#updated_at = :updated_at"]
+        for section, value in updated.items():
+            expr_attr_names[f"#{section}"] = section
+            expr_attr_values[f":{section}"] = _to_dynamo(value)
+            update_expr.append(f"#{section} = :{section}")
+
+        try:
+            self.table.update_item(
+                Key={"PK": f"USER#{user_id}", "SK": self.sk},
+                UpdateExpression="SET " + ", ".join(update_expr),
+                ExpressionAttributeNames=expr_attr_names,
+                ExpressionAttributeValues=expr_attr_values,
+            )
+            self.logger.debug(
+                f"Refreshed public bundle sections {list(updated)} for {user_id}"
+            )
+        except ClientError as e:
+            self.logger.error(f"Error refreshing public bundle for {user_id}: {e}")
+            raise
+        return updated
+
+    def safe_refresh(self, user_id: str, sections: Iterable[str] = BUNDLE_SECTIONS):
+        """
+        refresh() for write paths: failures are logged and swallowed so the
+        write itself still succeeds; the read path rebuilds missing sections.
+        """
+        try:
+            self.refresh(user_id, sections)
+        except Exception as e:
+            self.logger.error(f"Failed to refresh public bundle for {user_id}: {e}")
+
+    def request_refresh(self, user_id: str, sections: Iterable[str]):
+        """
+        Refresh for workout write paths. Only public bundles are served, so
+        private users are skipped; going public rebuilds every section.
+        Cheap sections are rebuilt inline. DEFERRED_SECTIONS are queued on
+        BUNDLE_SQS_QUEUE_URL once per debounce window and rebuilt by the
+        refresh_public_bundles lambda, so an import or backfill scans the
+        workouts once rather than once per workout. Without a queue they are
+        dropped from the item and get_bundle rebuilds them on the next read.
+        Failures are logged and swallowed like safe_refresh.
+        """
+        try:
+            if not UserProfileHelper(request_id=self.request_id).get_public_flag(
+                user_id
+            ):
+                self.logger.debug(f"User {user_id} is not public, skipping bundle")
+                return
+        except ClientError as e:
+            self.logger.error(f"Failed to refresh public bundle for {user_id}: {e}")
+            return
+
+        sections = list(sections)
+        inline = [section for section in sections if section not in DEFERRED_SECTIONS]
+        deferred = [section for section in sections if section in DEFERRED_SECTIONS]
+        if inline:
+            self.safe_refresh(user_id, inline)
+        if not deferred:
+            return
+        try:
+            queue_url = os.getenv("BUNDLE_SQS_QUEUE_URL")
+            if queue_url:
+                self._queue_refresh(queue_url, user_id, deferred)
+            else:
+                self._drop_sections(user_id, deferred)
+        except Exception as e:
+            self.logger.error(
+                f"Failed to queue public bundle refresh for {user_id}: {e}"
+            )
+
+    def _queue_refresh(self, queue_url: str, user_id: str, sections: list):
+        now = int(time.time())
+        try:
+            self.table.update_item(
+                Key={"PK": f"USER#{user_id}", "SK": self.sk},
+                UpdateExpression="SET pending_until = :until",
+                ConditionExpression="attribute_not_exists(pending_until) OR pending_until < :now",
+                ExpressionAttributeValues={
+                    ":until": now + BUNDLE_DEBOUNCE_SECONDS,
+                    ":now": now,
+                },
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                self.logger.debug(f"Bundle refresh already pending for {user_id}")
+                return
+            raise
+        # If sending fails the marker expires with the window, so a later
+        # write retries
+        boto3.client("sqs").send_message(
+            QueueUrl=queue_url,
+            MessageBody=json.dumps({"user_id": user_id, "sections": sections}),
+            DelaySeconds=min(BUNDLE_DEBOUNCE_SECONDS, 900),
+        )
+        self.logger.info(f"Queued public bundle refresh {sections} for {user_id}")
+
+    def _drop_sections(self, user_id: str, sections: list):
+        self.table.update_item(
+            Key={"PK": f"USER#{user_id}", "SK": self.sk},
+            UpdateExpression="REMOVE "
+            + ", ".join(f"#{section}" for section in sections),
+            ExpressionAttributeNames={f"#{section}": section for section in sections},
+        )
+        self.logger.debug(f"Dropped public bundle sections {sections} for {user_id}")
+
+    def claim_refresh(self, user_id: str):
+        """
+        Clear the pending marker before rebuilding, so writes that land during
+        the rebuild queue another one.
+        """
+        try:
+            self.table.update_item(
+                Key={"PK": f"USER#{user_id}", "SK": self.sk},
+                UpdateExpression="REMOVE pending_until",
+            )
+        except ClientError as e:
+            self.logger.error(f"Error claiming bundle refresh for {user_id}: {e}")
+            raise
+
+    def get_bundle(self, user_id: str) -> dict:
+        """
+        Return the bundle for a user, building and storing any section that is
+        missing (e.g. for users whose bundle predates a write path).
+        """
+        try:
+            item = (
+                self.table.get_item(Key={"PK": f"USER#{user_id}", "SK": self.sk}).get(
+                    "Item"
+                )
+                or {}
+            )
+        except ClientError as e:
+            self.logger.error(f"Error fetching public bundle for {user_id}: {e}")
+            raise
+
+        bundle = {
+            section: item[section] for section in BUNDLE_SECTIONS if section in item
+        }
+        missing = [section for section in BUNDLE_SECTIONS if section not in item]
+        if missing:
+            self.logger.info(
+                f"Backfilling public bundle sections {missing} for {user_id}"
+            )
+            bundle.update(_to_dynamo(self.refresh(user_id, missing)))
+            bundle["updated_at"] = datetime.utcnow().isoformat()
+        else:
+            bundle["updated_at"] = item.get("updated_at")
+        return _from_dynamo(bundle)
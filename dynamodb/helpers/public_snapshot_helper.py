@@ -0,0 +1,134 @@
+from aws_lambda_powertools import Logger
+import boto3
+from botocore.exceptions import ClientError
+from datetime import datetime
+from constants.general import SERVICE_NAME
+import json
+import os
+import time
+
+# Users whose public pages are published as static snapshots (comma separated)
+SNAPSHOT_USER_IDS = {
+    user_id.strip()
+    for user_id in os.getenv("SNAPSHOT_USER_IDS", "").split(",")
+    if user_id.strip()
+}
+# Writes within this window of the first one are folded into a single rebuild
+SNAPSHOT_DEBOUNCE_SECONDS = int(os.getenv("SNAPSHOT_DEBOUNCE_SECONDS", "60"))
+
+
+class PublicSnapshotHelper:
+    """
+    Helper class for debouncing static public snapshot rebuilds.
+    State lives in a per-user SNAPSHOT_STATE item: `pending_until` marks a
+    queued rebuild, `published_seq` is the change log version last published
+    and is cleared when the snapshots are removed.
+    """
+
+    def __init__(self, request_id: str = None):
+        self.dynamodb = boto3.resource("dynamodb", region_name="us-west-2")
+        table_name = os.getenv("TABLE_NAME", "WorkoutTracer-UserTable-Staging")
+        self.table = self.dynamodb.Table(table_name)
+        self.logger = Logger(service=SERVICE_NAME)
+        if request_id:
+            self.logger.append_keys(request_id=request_id)
+        self.sk = "SNAPSHOT_STATE"
+
+    @staticmethod
+    def is_opted_in(user_id: str) -> bool:
+        return str(user_id) in SNAPSHOT_USER_IDS
+
+    def request_publish(self, user_id: str, force: bool = False) -> bool:
+        """
+        Queue a snapshot rebuild for an opted-in user, delayed by the debounce
+        window. Only the first write of a burst enqueues; later writes see the
+        pending marker and return False. Failures are logged and swallowed.
+        `force` skips the debounce and republishes even if no workout changed,
+        for profile changes such as going private that must apply right away.
+        """
+        queue_url = os.getenv("SNAPSHOT_SQS_QUEUE_URL")
+        if not queue_url or not self.is_opted_in(user_id):
+            return False
+        if force:
+            return self._send(queue_url, user_id, force=True, delay=0)
+        now = int(time.time())
+        try:
+            self.table.update_item(
+                Key={"PK": f"USER#{user_id}", "SK": self.sk},
+                UpdateExpression="SET pending_until = :until",
+                ConditionExpression="attribute_not_exists(pending_until) OR pending_until < :now",
+                ExpressionAttributeValues={
+                    ":until": now + SNAPSHOT_DEBOUNCE_SECONDS,
+                    ":now": now,
+                },
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                self.logger.debug(f"Snapshot rebuild already pending for {user_id}")
+                return False
+            self.logger.error(f"Error marking snapshot pending for {user_id}: {e}")
+            return False
+        # If sending fails the marker expires with the window, so a later
+        # write retries
+        return self._send(queue_url, user_id, delay=min(SNAPSHOT_DEBOUNCE_SECONDS, 900))
+
+    def _send(
+        self, queue_url: str, user_id: str, force: bool = False, delay: int = 0
+    ) -> bool:
+        body = {"user_id": user_id}
+        if force:
+            body["force"] = True
+        try:
+            boto3.client("sqs").send_message(
+                QueueUrl=queue_url,
+                MessageBody=json.dumps(body),
+                DelaySeconds=delay,
+            )
+            self.logger.info(f"Queued snapshot rebuild for user {user_id}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to queue snapshot rebuild for {user_id}: {e}")
+            return False
+
+    def claim(self, user_id: str) -> int | None:
+        """
+        Clear the pending marker before rendering, so writes that land during
+        the rebuild queue another one. Returns the last published version.
+        """
+        try:
+            response = self.table.update_item(
+                Key={"PK": f"USER#{user_id}", "SK": self.sk},
+                UpdateExpression="REMOVE pending_until",
+                ReturnValues="ALL_OLD",
+            )
+            published_seq = response.get("Attributes", {}).get("published_seq")
+            return int(published_seq) if published_seq is not None else None
+        except ClientError as e:
+            self.logger.error(f"Error claiming snapshot rebuild for {user_id}: {e}")
+            raise
+
+    def mark_published(self, user_id: str, seq: int, manifest_key: str):
+        try:
+            self.table.update_item(
+                Key={"PK": f"USER#{user_id}", "SK": self.sk},
+                UpdateExpression="SET published_seq = :seq, manifest_key = :key, published_at = :at",
+                ExpressionAttributeValues={
+                    ":seq": seq,
+                    ":key": manifest_key,
+                    ":at": datetime.utcnow().isoformat(),
+                },
+            )
+        except ClientError as e:
+            self.logger.error(f"Error recording snapshot for {user_id}: {e}")
+            raise
+
+    def mark_unpublished(self, user_id: str):
+        try:
+            self.table.update_item(
+                Key={"PK": f"USER#{user_id}", "SK": self.sk},
+                UpdateExpression="SET unpublished_at = :at REMOVE published_seq, manifest_key",
+                ExpressionAttributeValues={":at": datetime.utcnow().isoformat()},
+            )
+        except ClientError as e:
+            self.logger.error(f"Error recording snapshot removal for {user_id}: {e}")
+            raise
@@ -3,7 +3,6 @@ import boto3
 from botocore.exceptions import ClientError
 from dynamodb.helpers.strava_profile_helper import StravaProfileHelper
 from dynamodb.models.strava_credentials_model import StravaCredentialsModel
-from cryptography.fernet import Fernet
 import os
 from datetime import datetime
 import base64
@@ -2,12 +2,17 @@ from aws_lambda_powertools import Logger
 import boto3
 from botocore.exceptions import ClientError
 from dynamodb.models.strava_profile_model import StravaAthleteModel
+from helpers.lookup_cache import LookupCache
+from helpers.log_payload import log_payload
 import os
 import base64
 from decimal import Decimal
 from datetime import datetime
 from typing import Any
 
+# strava_id -> user_id (None when no user has linked that athlete)
+_STRAVA_ID_CACHE = LookupCache("strava_id")
+
 
 class StravaProfileHelper:
     """
@@ -109,11 +114,14 @@ class StravaProfileHelper:
             before_item = self.table.get_item(
                 Key={"PK": f"USER#{user_id}", "SK": self.sk}
             ).get("Item")
-            self.logger.info(f"Fetched before_item for audit: {before_item}")
+            self.logger.debug(
+                "Fetched before_item for audit: %s", log_payload(before_item)
+            )
             try:
                 before = StravaAthleteModel(**before_item) if before_item else None
-                self.logger.info(
-                    f"Parsed before_item into StravaAthleteModel: {before}"
+                self.logger.debug(
+                    "Parsed before_item into StravaAthleteModel: %s",
+                    log_payload(before),
                 )
             except Exception as parse_exc:
                 self.logger.error(
@@ -122,7 +130,11 @@ class StravaProfileHelper:
                 before = None
 
             self.table.put_item(Item=item)
-            self.logger.info(f"Created/Updated Strava profile for {user_id}: {item}")
+            if strava_id is not None:
+                _STRAVA_ID_CACHE.invalidate(int(strava_id))
+            self.logger.info(
+                "Created/Updated Strava profile for %s: %s", user_id, log_payload(item)
+            )
             return profile
         except ClientError as e:
             self.logger.error(
@@ -218,7 +230,9 @@ class StravaProfileHelper:
             )
             updated_item = response.get("Attributes")
             self.logger.info(
-                f"Updated Strava profile for user_id: {user_id}: {updated_item}"
+                "Updated Strava profile for user_id: %s: %s",
+                user_id,
+                log_payload(updated_item),
             )
             if updated_item:
                 after = StravaAthleteModel(**updated_item)
@@ -244,7 +258,11 @@ class StravaProfileHelper:
         Find the user_id for a given strava_id. Assumes 1-1 mapping.
         Uses DynamoDB Scan and extracts user_id from DynamoDB attribute types.
         Returns the user_id if found, otherwise None.
+        Results, including misses, are cached per container (see helpers.lookup_cache).
         """
+        cached = _STRAVA_ID_CACHE.get(int(strava_id))
+        if not _STRAVA_ID_CACHE.is_missing(cached):
+            return cached
         try:
             scan_kwargs = {
                 "FilterExpression": "strava_id = :sid AND SK = :sk",
@@ -265,13 +283,15 @@ class StravaProfileHelper:
                     user_id = item.get("user_id")
                     # DynamoDB returns attribute types, so extract the string value
                     if isinstance(user_id, dict) and "S" in user_id:
-                        return user_id["S"]
-                    elif isinstance(user_id, str):
+                        user_id = user_id["S"]
+                    if isinstance(user_id, str):
+                        _STRAVA_ID_CACHE.set(int(strava_id), user_id)
                         return user_id
                 last_evaluated_key = response.get("LastEvaluatedKey")
                 if not last_evaluated_key:
                     break
             self.logger.warning(f"No user found for strava_id: {strava_id}")
+            _STRAVA_ID_CACHE.set(int(strava_id), None)
             return None
         except ClientError as e:
             self.logger.error(
@@ -3,11 +3,19 @@ import boto3
 from botocore.exceptions import ClientError
 from dynamodb.models.strava_workout_model import StravaWorkoutModel
 from dynamodb.helpers.location_helper import LocationHelper
+from dynamodb.helpers.workout_change_log_helper import WorkoutChangeLogHelper
+from dynamodb.helpers.workout_stats_helper import WorkoutStatsHelper
+from helpers.polyline_resolution import build_polyline_variants
+from helpers.log_payload import log_payload
 import os
 from decimal import Decimal
 from datetime import datetime
 from typing import Any, List, Dict, Tuple
 from constants.general import SERVICE_NAME
+import time
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_SIZE = 100
 
 
 class StravaWorkoutHelper:
@@ -24,6 +32,8 @@ class StravaWorkoutHelper:
             self.logger.append_keys(request_id=request_id)
         self.sk = "STRAVA_WORKOUT"
         self._location_helper = LocationHelper(request_id=request_id)
+        self._change_log_helper = WorkoutChangeLogHelper(request_id=request_id)
+        self._stats_helper = WorkoutStatsHelper(request_id=request_id)
 
     @property
     def _kml_cache(self) -> Dict[str, bytes]:
@@ -45,6 +55,10 @@ class StravaWorkoutHelper:
 
         sk = f"{self.sk}#{workout_id}"
         item = self.convert_floats_to_decimal(workout.dict())
+        if item.get("map"):
+            item["map"].update(
+                build_polyline_variants(item["map"].get("summary_polyline"))
+            )
         item["PK"] = f"USER#{user_id}"
         item["SK"] = sk
 
@@ -52,13 +66,27 @@ class StravaWorkoutHelper:
             self.logger.info(
                 f"Attempting to put workout for user_id={user_id}, workout_id={workout_id}"
             )
-            self.logger.debug(f"Incoming workout_data: {workout_data}")
+            self.logger.debug("Incoming workout_data: %s", log_payload(workout_data))
 
-            before_item = self.table.get_item(
-                Key={"PK": f"USER#{user_id}", "SK": sk}
-            ).get("Item")
-            action = "update" if before_item else "create"
-            self.table.put_item(Item=item)
+            def build():
+                before_item = self.table.get_item(
+                    Key={"PK": f"USER#{user_id}", "SK": sk}, ConsistentRead=True
+                ).get("Item")
+                action = "update" if before_item else "create"
+                # Fails if another write changed the workout since it was read
+                put = {
+                    "TableName": self.table.name,
+                    "Item": item,
+                    **self._stats_helper.stats_condition("strava", before_item),
+                }
+                # The workout, its stats rollup deltas and its change event
+                return [{"Put": put}] + self._stats_helper.stats_updates(
+                    user_id, "strava", before_item, item
+                ), action
+
+            action = self._change_log_helper.transact_change(
+                user_id, "strava", workout_id, build
+            )
             self.logger.debug(
                 f"Sucessfully Put Strava workout {workout_id} for {user_id}"
             )
@@ -83,25 +111,42 @@ class StravaWorkoutHelper:
             return workout, action
         except ClientError as e:
             self.logger.error(f"Error putting Strava workout for {user_id}: {e}")
-            self.logger.error(f"Workout data that caused error: {workout_data}")
-            self.logger.error(f"Item that caused error: {item}")
+            self.logger.error(
+                "Workout data that caused error: %s", log_payload(workout_data)
+            )
+            self.logger.error("Item that caused error: %s", log_payload(item))
             raise
         except Exception as e:
             self.logger.error(
                 f"Unexpected error in put_strava_workout for user_id: {user_id}: {e}"
             )
-            self.logger.error(f"Workout data that caused error: {workout_data}")
-            self.logger.error(f"Item that caused error: {item}")
+            self.logger.error(
+                "Workout data that caused error: %s", log_payload(workout_data)
+            )
+            self.logger.error("Item that caused error: %s", log_payload(item))
             raise
 
-    def get_strava_workout(self, user_id: str, workout_id: int = None) -> dict | None:
+    def get_strava_workout(
+        self,
+        user_id: str,
+        workout_id: int = None,
+        projection_expression: str = None,
+        expression_attribute_names: dict = None,
+    ) -> dict | None:
         """
         Retrieve Strava workout from DynamoDB and return as a JSON-serializable dict.
         If workout_id is provided, fetch that specific workout.
+        Optional projection_expression and expression_attribute_names can be
+        passed to fetch only specific fields.
         """
         try:
             sk = f"{self.sk}#{workout_id}" if workout_id else self.sk
-            response = self.table.get_item(Key={"PK": f"USER#{user_id}", "SK": sk})
+            get_kwargs = {"Key": {"PK": f"USER#{user_id}", "SK": sk}}
+            if projection_expression:
+                get_kwargs["ProjectionExpression"] = projection_expression
+            if expression_attribute_names:
+                get_kwargs["ExpressionAttributeNames"] = expression_attribute_names
+            response = self.table.get_item(**get_kwargs)
             item = response.get("Item")
             if not item:
                 self.logger.warning(
@@ -122,6 +167,79 @@ class StravaWorkoutHelper:
             )
             return None
 
+    def batch_get_strava_workouts(
+        self,
+        user_id: str,
+        workout_ids: List[int],
+        projection_expression: str = None,
+        expression_attribute_names: dict = None,
+    ) -> Dict[int, dict]:
+        """
+        Retrieve many Strava workouts of one user with BatchGetItem, up to
+        BATCH_GET_SIZE keys per request. Returns {workout_id: workout};
+        workouts that do not exist are absent. Errors are raised.
+        """
+        workouts = {}
+        sks = [f"{self.sk}#{workout_id}" for workout_id in dict.fromkeys(workout_ids)]
+        for start in range(0, len(sks), BATCH_GET_SIZE):
+            request = {
+                "Keys": [
+                    {"PK": f"USER#{user_id}", "SK": sk}
+                    for sk in sks[start : start + BATCH_GET_SIZE]
+                ]
+            }
+            if projection_expression:
+                # SK maps each item back to its workout id
+                request["ProjectionExpression"] = f"SK, {projection_expression}"
+            if expression_attribute_names:
+                request["ExpressionAttributeNames"] = expression_attribute_names
+            request_items = {self.table.name: request}
+            attempt = 0
+            while request_items:
+                try:
+                    response = self.dynamodb.batch_get_item(RequestItems=request_items)
+                except ClientError as e:
+                    self.logger.error(
+                        f"Error batch retrieving Strava workouts for user_id {user_id}: {e}"
+                    )
+                    raise
+                for item in response.get("Responses", {}).get(self.table.name, []):
+                    item.pop("PK", None)
+                    workout_id = int(item.pop("SK").split("#")[-1])
+                    workouts[workout_id] = self._decimals_to_floats(item)
+                request_items = response.get("UnprocessedKeys")
+                if request_items:
+                    # Throttled keys come back unprocessed; back off and retry them
+                    attempt += 1
+                    time.sleep(min(0.05 * 2**attempt, 1))
+        return workouts
+
+    def iter_all_workouts(
+        self,
+        user_id: str,
+        page_size: int = 500,
+        projection_expression: str = None,
+        expression_attribute_names: dict = None,
+    ):
+        """
+        Lazily yield every Strava workout for a user, paging DynamoDB one
+        page at a time so only a single page is held in memory. Errors are
+        raised, so a failed page never looks like the end of the workouts.
+        """
+        next_token = None
+        while True:
+            result = self._query_workouts(
+                user_id,
+                limit=page_size,
+                next_token=next_token,
+                projection_expression=projection_expression,
+                expression_attribute_names=expression_attribute_names,
+            )
+            yield from result.get("workouts", [])
+            next_token = result.get("next_token")
+            if not next_token:
+                break
+
     def get_all_workout_ids(self, user_id: str) -> List[int]:
         """
         Retrieve all Strava workout IDs for a user.
@@ -236,43 +354,13 @@ class StravaWorkoutHelper:
         passed to fetch only specific fields.
         """
         try:
-            query_kwargs = {
-                "KeyConditionExpression": boto3.dynamodb.conditions.Key("PK").eq(
-                    f"USER#{user_id}"
-                )
-                & boto3.dynamodb.conditions.Key("SK").begins_with(f"{self.sk}#"),
-                "Limit": limit,
-            }
-            if next_token:
-                query_kwargs["ExclusiveStartKey"] = next_token
-            if projection_expression:
-                query_kwargs["ProjectionExpression"] = projection_expression
-            if expression_attribute_names:
-                query_kwargs["ExpressionAttributeNames"] = expression_attribute_names
-
-            response = self.table.query(**query_kwargs)
-            items = response.get("Items", [])
-            workouts = [self._decimals_to_floats(item) for item in items]
-            result = {"workouts": workouts}
-            last_evaluated_key = response.get("LastEvaluatedKey")
-
-            # Debug logging
-            self.logger.debug(f"ExclusiveStartKey: {next_token}")
-            self.logger.debug(f"LastEvaluatedKey: {last_evaluated_key}")
-
-            # Only return next_token if there are items AND a LastEvaluatedKey
-            if items and last_evaluated_key:
-                # Guard: If LastEvaluatedKey is same as ExclusiveStartKey, break loop
-                if next_token and last_evaluated_key == next_token:
-                    self.logger.warning(
-                        "LastEvaluatedKey is same as ExclusiveStartKey, breaking pagination loop."
-                    )
-                    result["next_token"] = None
-                else:
-                    result["next_token"] = last_evaluated_key
-            else:
-                result["next_token"] = None
-            return result
+            return self._query_workouts(
+                user_id,
+                limit=limit,
+                next_token=next_token,
+                projection_expression=projection_expression,
+                expression_attribute_names=expression_attribute_names,
+            )
         except ClientError as e:
             self.logger.error(
                 f"Error retrieving all Strava workouts for user_id {user_id}: {e}"
@@ -284,17 +372,88 @@ class StravaWorkoutHelper:
             )
             return {"workouts": [], "next_token": None}
 
+    def _query_workouts(
+        self,
+        user_id: str,
+        limit: int = 500,
+        next_token: dict = None,
+        projection_expression: str = None,
+        expression_attribute_names: dict = None,
+    ) -> dict:
+        """
+        One page of Strava workouts for a user, as returned by
+        get_all_workouts. DynamoDB errors are raised.
+        """
+        query_kwargs = {
+            "KeyConditionExpression": boto3.dynamodb.conditions.Key("PK").eq(
+                f"USER#{user_id}"
+            )
+            & boto3.dynamodb.conditions.Key("SK").begins_with(f"{self.sk}#"),
+            "Limit": limit,
+        }
+        if next_token:
+            query_kwargs["ExclusiveStartKey"] = next_token
+        if projection_expression:
+            query_kwargs["ProjectionExpression"] = projection_expression
+        if expression_attribute_names:
+            query_kwargs["ExpressionAttributeNames"] = expression_attribute_names
+
+        response = self.table.query(**query_kwargs)
+        items = response.get("Items", [])
+        workouts = [self._decimals_to_floats(item) for item in items]
+        result = {"workouts": workouts}
+        last_evaluated_key = response.get("LastEvaluatedKey")
+
+        # Debug logging
+        self.logger.debug(f"ExclusiveStartKey: {next_token}")
+        self.logger.debug(f"LastEvaluatedKey: {last_evaluated_key}")
+
+        # Only return next_token if there are items AND a LastEvaluatedKey
+        if items and last_evaluated_key:
+            # Guard: If LastEvaluatedKey is same as ExclusiveStartKey, break loop
+            if next_token and last_evaluated_key == next_token:
+                self.logger.warning(
+                    "LastEvaluatedKey is same as ExclusiveStartKey, breaking pagination loop."
+                )
+                result["next_token"] = None
+            else:
+                result["next_token"] = last_evaluated_key
+        else:
+            result["next_token"] = None
+        return result
+
     def delete_strava_workout(self, user_id: str, workout_id: int) -> bool:
         """
         Delete a Strava workout from DynamoDB.
         Returns True if deletion was successful, False otherwise.
         """
         sk = f"{self.sk}#{workout_id}"
+        key = {"PK": f"USER#{user_id}", "SK": sk}
         try:
-            response = self.table.delete_item(
-                Key={"PK": f"USER#{user_id}", "SK": sk}, ReturnValues="ALL_OLD"
+
+            def build():
+                before_item = self.table.get_item(Key=key, ConsistentRead=True).get(
+                    "Item"
+                )
+                if not before_item:
+                    return [], None
+                # Delete the workout and back its stats out of the rollups
+                return [
+                    {
+                        "Delete": {
+                            "TableName": self.table.name,
+                            "Key": key,
+                            **self._stats_helper.stats_condition("strava", before_item),
+                        }
+                    }
+                ] + self._stats_helper.stats_updates(
+                    user_id, "strava", before_item, None
+                ), "delete"
+
+            deleted = self._change_log_helper.transact_change(
+                user_id, "strava", workout_id, build
             )
-            if "Attributes" in response:
+            if deleted:
                 self.logger.info(
                     f"Successfully deleted Strava workout {workout_id} for user_id {user_id}"
                 )
@@ -330,13 +489,35 @@ class StravaWorkoutHelper:
         `locations` should be a dict like {"states": {...}, "countries": {...}}.
         """
         sk = f"{self.sk}#{workout_id}"
-        try:
-            self.table.update_item(
+        update = {
+            "Update": {
+                "TableName": self.table.name,
+                "Key": {"PK": f"USER#{user_id}", "SK": sk},
+                "UpdateExpression": "SET #loc = :locations",
+                # Never recreate a workout deleted since enrichment started
+                "ConditionExpression": "attribute_exists(SK)",
+                "ExpressionAttributeNames": {"#loc": "locations"},
+                "ExpressionAttributeValues": {":locations": locations},
+            }
+        }
+
+        def build():
+            exists = self.table.get_item(
                 Key={"PK": f"USER#{user_id}", "SK": sk},
-                UpdateExpression="SET #loc = :locations",
-                ExpressionAttributeNames={"#loc": "locations"},
-                ExpressionAttributeValues={":locations": locations},
+                ProjectionExpression="SK",
+                ConsistentRead=True,
+            ).get("Item")
+            return ([update], "update") if exists else ([], None)
+
+        try:
+            action = self._change_log_helper.transact_change(
+                user_id, "strava", workout_id, build
             )
+            if action is None:
+                self.logger.info(
+                    f"Workout {workout_id} for user {user_id} no longer exists, skipping locations"
+                )
+                return False
             self.logger.info(
                 f"Updated locations for workout {workout_id}, user {user_id}"
             )
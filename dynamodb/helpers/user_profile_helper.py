@@ -4,8 +4,15 @@ from botocore.exceptions import ClientError
 from dynamodb.models.user_profile_model import UserProfileModel
 from datetime import datetime
 from dynamodb.helpers.audit_actions_helper import AuditActions, AuditActionHelper
+from helpers.lookup_cache import LookupCache
+from helpers.log_payload import log_payload
 import os
 
+# display_id -> profile dict from the GSI (None when no such user)
+_DISPLAY_ID_CACHE = LookupCache("display_id")
+# user_id -> public_profile flag (None when no profile)
+_PUBLIC_FLAG_CACHE = LookupCache("public_flag")
+
 
 class UserProfileHelper:
     """
@@ -23,8 +30,21 @@ class UserProfileHelper:
         self.audit_sk = "USER_PROFILE_AUDIT"
         self.audit_action_helper = AuditActionHelper(request_id=request_id)
 
+    @staticmethod
+    def invalidate_cached_lookups(user_id: str, display_id: int = None):
+        """Drop this container's cached lookups for a user after a profile write."""
+        _PUBLIC_FLAG_CACHE.invalidate(user_id)
+        if display_id is not None:
+            _DISPLAY_ID_CACHE.invalidate(int(display_id))
+
     def get_user_by_display_id(self, display_id: int) -> dict | None:
-        """Look up a user profile by user_display_id via GSI. Returns the profile dict or None."""
+        """
+        Look up a user profile by user_display_id via GSI. Returns the profile dict or None.
+        Results, including misses, are cached per container (see helpers.lookup_cache).
+        """
+        cached = _DISPLAY_ID_CACHE.get(int(display_id))
+        if not _DISPLAY_ID_CACHE.is_missing(cached):
+            return dict(cached) if cached else None
         try:
             response = self.table.query(
                 IndexName="UserDisplayIdIndex",
@@ -42,7 +62,7 @@ class UserProfileHelper:
                     if pk_value.startswith("USER#")
                     else pk_value
                 )
-                return {
+                profile = {
                     "user_id": user_id_value,
                     "name": item.get("name"),
                     "email": item.get("email"),
@@ -52,11 +72,35 @@ class UserProfileHelper:
                     "created_at": item.get("created_at"),
                     "show_workout_source": item.get("show_workout_source", False),
                 }
+                _DISPLAY_ID_CACHE.set(int(display_id), profile)
+                return dict(profile)
+            _DISPLAY_ID_CACHE.set(int(display_id), None)
             return None
         except ClientError as e:
+            # Not cached: a transient error must not look like "no such user"
             self.logger.error(f"Error looking up user by display_id {display_id}: {e}")
             return None
 
+    def get_public_flag(self, user_id: str) -> bool | None:
+        """
+        Return a user's public_profile flag with a single GetItem, or None if
+        the user has no profile. Cached per container like display id lookups.
+        """
+        cached = _PUBLIC_FLAG_CACHE.get(user_id)
+        if not _PUBLIC_FLAG_CACHE.is_missing(cached):
+            return cached
+        try:
+            item = self.table.get_item(
+                Key={"PK": f"USER#{user_id}", "SK": self.sk},
+                ProjectionExpression="public_profile",
+            ).get("Item")
+        except ClientError as e:
+            self.logger.error(f"Error fetching public flag for {user_id}: {e}")
+            raise
+        public_flag = bool(item.get("public_profile", False)) if item else None
+        _PUBLIC_FLAG_CACHE.set(user_id, public_flag)
+        return public_flag
+
     def create_user_profile(
         self, user_id: str, email: str, name: str, provider: str = "Cognito"
     ):
@@ -90,7 +134,11 @@ class UserProfileHelper:
 
         try:
             self.table.put_item(Item=item)
-            self.logger.info(f"Created user profile for {user_id}: {item}")
+            # The collision checks above cached this display id as unknown
+            self.invalidate_cached_lookups(user_id, profile.user_display_id)
+            self.logger.info(
+                "Created user profile for %s: %s", user_id, log_payload(item)
+            )
             self.audit_action_helper.create_audit_record(
                 user_id=user_id,
                 sk=self.audit_sk,
@@ -254,11 +302,14 @@ class UserProfileHelper:
                 ReturnValues="ALL_NEW",
             )
             self.logger.info(
-                f"Updated user profile fields for {user_id}: {response.get('Attributes')}"
+                "Updated user profile fields for %s: %s",
+                user_id,
+                log_payload(response.get("Attributes")),
             )
             if "Attributes" in response:
                 attrs = response["Attributes"]
                 after = UserProfileModel(**attrs)
+                self.invalidate_cached_lookups(user_id, after.user_display_id)
                 # Audit: before and after as UserProfileModel
                 self.audit_action_helper.create_audit_record(
                     user_id=user_id,
@@ -325,7 +376,7 @@ class UserProfileHelper:
                 items = page.get("Items", [])
                 self.logger.info(f"Fetched {len(items)} items from DynamoDB scan")
                 for item in items:
-                    self.logger.info(f"Processing item: {item}")
+                    self.logger.debug("Processing item: %s", log_payload(item))
                     profile = {
                         "user_id": item["PK"]["S"].replace("USER#", ""),
                         "name": item.get("name", {}).get("S"),
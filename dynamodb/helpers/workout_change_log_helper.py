@@ -0,0 +1,243 @@
+from aws_lambda_powertools import Logger
+import boto3
+from botocore.exceptions import ClientError
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, List, Dict, Tuple
+from constants.general import SERVICE_NAME
+from dynamodb.helpers.public_snapshot_helper import PublicSnapshotHelper
+from helpers.metrics_emitter import emit_metric
+import os
+import random
+import time
+
+SEQ_WIDTH = 12
+# A workout write that keeps losing to concurrent writes of the same user fails after this
+CHANGE_WRITE_ATTEMPTS = int(os.getenv("CHANGE_WRITE_ATTEMPTS", "5"))
+CHANGE_RETRY_BASE_SECONDS = 0.05
+
+
+class WorkoutChangeLogHelper:
+    """
+    Helper class for the per-user workout change log.
+    Every workout create/update/delete is appended as an item with a
+    monotonically increasing sequence number so clients can sync deltas.
+    The event is written in the same transaction as the workout itself.
+    """
+
+    def __init__(self, request_id: str = None):
+        self.dynamodb = boto3.resource("dynamodb", region_name="us-west-2")
+        table_name = os.getenv("TABLE_NAME", "WorkoutTracer-UserTable-Staging")
+        self.table = self.dynamodb.Table(table_name)
+        self.logger = Logger(service=SERVICE_NAME)
+        self.request_id = request_id
+        if request_id:
+            self.logger.append_keys(request_id=request_id)
+        self.sk = "WORKOUT_CHANGE"
+        self.seq_sk = "WORKOUT_CHANGE_SEQ"
+
+    def _create_sk(self, seq: int) -> str:
+        return f"{self.sk}#{seq:0{SEQ_WIDTH}d}"
+
+    def _change_items(
+        self, user_id: str, seq: int, source: str, workout_id, action: str
+    ) -> List[dict]:
+        """
+        TransactWriteItems entries that advance the user's sequence counter
+        from seq - 1 to seq and append the change event under seq. The
+        counter condition makes concurrent writers of one user conflict.
+        """
+        return [
+            {
+                "Update": {
+                    "TableName": self.table.name,
+                    "Key": {"PK": f"USER#{user_id}", "SK": self.seq_sk},
+                    "UpdateExpression": "SET seq = :seq",
+                    "ConditionExpression": (
+                        "attribute_not_exists(seq) OR seq = :previous"
+                        if seq == 1
+                        else "seq = :previous"
+                    ),
+                    "ExpressionAttributeValues": {":seq": seq, ":previous": seq - 1},
+                }
+            },
+            {
+                "Put": {
+                    "TableName": self.table.name,
+                    "Item": {
+                        "PK": f"USER#{user_id}",
+                        "SK": self._create_sk(seq),
+                        "seq": seq,
+                        "source": source,
+                        "workout_id": workout_id,
+                        "action": action,
+                        "timestamp": datetime.utcnow().isoformat(),
+                    },
+                }
+            },
+        ]
+
+    def transact_change(
+        self,
+        user_id: str,
+        source: str,
+        workout_id,
+        build: Callable[[], Tuple[List[dict], str | None]],
+    ) -> str | None:
+        """
+        Write a workout change and its change event in one transaction, so the
+        sequence number (and every cache keyed on it) only moves when the
+        workout does. `build()` reads whatever the write depends on and returns
+        (TransactWriteItems entries, action); an action of None means there
+        is nothing to write. `action` is "create", "update" or "delete" and
+        `source` is "strava" or "apple_health".
+        When a condition fails because of a concurrent write, `build()` is
+        called again and the transaction retried, up to
+        CHANGE_WRITE_ATTEMPTS times. Returns the action written, or None when
+        `build()` had nothing to write. Errors are raised.
+        """
+        for attempt in range(1, CHANGE_WRITE_ATTEMPTS + 1):
+            # Read seq before build() so any write landing after build()'s
+            # reads moves seq and fails the counter condition
+            seq = self.get_latest_seq(user_id, consistent_read=True) + 1
+            items, action = build()
+            if action is None:
+                return None
+            try:
+                self.dynamodb.meta.client.transact_write_items(
+                    TransactItems=items
+                    + self._change_items(user_id, seq, source, workout_id, action)
+                )
+            except ClientError as e:
+                if not self._is_write_conflict(e) or attempt == CHANGE_WRITE_ATTEMPTS:
+                    emit_metric("WorkoutChangeWriteFailed", {"Source": source})
+                    raise
+                emit_metric("WorkoutChangeWriteConflict", {"Source": source})
+                self.logger.info(
+                    f"Concurrent write to {source} workout {workout_id}, user {user_id}; "
+                    f"retrying (attempt {attempt})"
+                )
+                time.sleep(random.uniform(0, CHANGE_RETRY_BASE_SECONDS * 2**attempt))
+                continue
+
+            self.logger.debug(
+                f"Recorded {action} change seq={seq} for {source} workout {workout_id}, user {user_id}"
+            )
+            if PublicSnapshotHelper.is_opted_in(user_id):
+                PublicSnapshotHelper(request_id=self.request_id).request_publish(
+                    user_id
+                )
+            return action
+
+    @staticmethod
+    def _is_write_conflict(error: ClientError) -> bool:
+        """True when a transaction was cancelled by a failed condition or a concurrent transaction."""
+        if error.response["Error"]["Code"] != "TransactionCanceledException":
+            return False
+        return any(
+            reason.get("Code") in ("ConditionalCheckFailed", "TransactionConflict")
+            for reason in error.response.get("CancellationReasons", [])
+        )
+
+    def get_latest_seq(self, user_id: str, consistent_read: bool = False) -> int:
+        """
+        Return the user's latest change sequence number (0 if none).
+        Doubles as a cheap data version for caches of derived workout data.
+        """
+        try:
+            item = self.table.get_item(
+                Key={"PK": f"USER#{user_id}", "SK": self.seq_sk},
+                ProjectionExpression="seq",
+                ConsistentRead=consistent_read,
+            ).get("Item")
+            return int(item["seq"]) if item and "seq" in item else 0
+        except ClientError as e:
+            self.logger.error(f"Error fetching change seq for user {user_id}: {e}")
+            raise
+
+    def bump_seq(self, user_id: str, expected: int) -> bool:
+        """
+        Advance the user's data version without recording a change event, for
+        writes of derived data (e.g. stats rollups) that versioned caches
+        depend on. Only applies while seq is still `expected`; returns False
+        when a workout write got there first.
+        """
+        try:
+            self.table.update_item(
+                Key={"PK": f"USER#{user_id}", "SK": self.seq_sk},
+                UpdateExpression="SET seq = :seq",
+                ConditionExpression=(
+                    "attribute_not_exists(seq) OR seq = :previous"
+                    if expected == 0
+                    else "seq = :previous"
+                ),
+                ExpressionAttributeValues={":seq": expected + 1, ":previous": expected},
+            )
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return False
+            self.logger.error(f"Error bumping change seq for user {user_id}: {e}")
+            raise
+
+    def get_changes(
+        self, user_id: str, since: int = 0, limit: int = 500, source: str = None
+    ) -> dict:
+        """
+        Retrieve up to 'limit' change events with a sequence number greater than 'since'.
+        Returns a dict: { "changes": [...], "next_since": ..., "has_more": ... }
+        `next_since` is the sequence number to pass on the next call.
+        If `source` is given only events for that source are returned.
+        """
+        try:
+            query_kwargs = {
+                "KeyConditionExpression": boto3.dynamodb.conditions.Key("PK").eq(
+                    f"USER#{user_id}"
+                )
+                & boto3.dynamodb.conditions.Key("SK").between(
+                    self._create_sk(since + 1), self._create_sk(10**SEQ_WIDTH - 1)
+                ),
+                "Limit": limit,
+            }
+            response = self.table.query(**query_kwargs)
+            items = response.get("Items", [])
+            # Filter by source here rather than with a FilterExpression so
+            # next_since still advances past events for other sources.
+            changes = [
+                {
+                    "seq": int(item["seq"]),
+                    "source": item.get("source"),
+                    "workout_id": self._normalize_id(item.get("workout_id")),
+                    "action": item.get("action"),
+                    "timestamp": item.get("timestamp"),
+                }
+                for item in items
+                if not source or item.get("source") == source
+            ]
+            last_evaluated_key = response.get("LastEvaluatedKey")
+            next_since = int(items[-1]["seq"]) if items else since
+            return {
+                "changes": changes,
+                "next_since": next_since,
+                "has_more": bool(last_evaluated_key),
+            }
+        except ClientError as e:
+            self.logger.error(f"Error retrieving changes for user_id {user_id}: {e}")
+            raise
+
+    @staticmethod
+    def latest_per_workout(changes: List[dict]) -> List[dict]:
+        """
+        Collapse a list of change events so only the newest event per
+        (source, workout_id) remains, preserving sequence order.
+        """
+        latest: Dict[tuple, dict] = {}
+        for change in changes:
+            latest[(change["source"], change["workout_id"])] = change
+        return sorted(latest.values(), key=lambda c: c["seq"])
+
+    @staticmethod
+    def _normalize_id(value):
+        if isinstance(value, Decimal):
+            return int(value)
+        return value
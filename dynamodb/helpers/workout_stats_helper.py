@@ -0,0 +1,423 @@
+from aws_lambda_powertools import Logger
+import boto3
+from botocore.exceptions import ClientError
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Iterable, List, Dict, Tuple
+from constants.general import SERVICE_NAME
+from dynamodb.helpers.workout_change_log_helper import WorkoutChangeLogHelper
+from dynamodb.models.workout_summary import SUMMARY_SOURCE_FIELDS, WorkoutSummary
+import os
+
+# Aggregate attribute -> raw workout attribute, per source
+STATS_SOURCE_FIELDS = {
+    "strava": {
+        "type": "type",
+        "start_date": "start_date_local",
+        "total_distance": "distance",
+        "total_elevation_gain": "total_elevation_gain",
+        "total_moving_time": "moving_time",
+        "total_elapsed_time": "elapsed_time",
+    },
+    "apple_health": {
+        "type": "workout_activity_type",
+        "start_date": "start_date",
+        "total_distance": "total_distance",
+        "total_elevation_gain": "elevation_ascended",
+        "total_moving_time": "duration",
+        "total_elapsed_time": "duration",
+    },
+}
+
+# Projection needed to recompute rollups from raw workouts, per source
+STATS_PROJECTIONS = {
+    "strava": (
+        "#t, distance, total_elevation_gain, moving_time, elapsed_time, "
+        "start_date_local",
+        {"#t": "type"},
+    ),
+    "apple_health": (
+        "workout_activity_type, total_distance, elevation_ascended, #d, " "start_date",
+        {"#d": "duration"},
+    ),
+}
+
+STATS_TOTAL_FIELDS = (
+    "total_distance",
+    "total_elevation_gain",
+    "total_moving_time",
+    "total_elapsed_time",
+)
+
+ALL_TIME_BUCKET = "ALL"
+
+# A seeding rebuild that keeps racing workout writes gives up after this
+STATS_SEED_ATTEMPTS = 3
+
+# Time bucket period -> (SK prefix, strftime format of the bucket label)
+STATS_PERIODS = {
+    "day": ("D", "%Y-%m-%d"),
+    "week": ("W", "%G-%V"),
+    "month": ("M", "%Y-%m"),
+}
+
+
+class WorkoutStatsHelper:
+    """
+    Helper class for precomputed workout stats rollups.
+    Each rollup item holds count and totals for one source and workout type,
+    stored under SK 'STATS#{bucket}#{source}#{type}', and is kept current by
+    applying old/new deltas in the same transaction as the workout write.
+    Buckets are 'ALL' plus one day, ISO week and month bucket per workout,
+    e.g. 'STATS#W#2026-41#strava#Run'.
+    """
+
+    def __init__(self, request_id: str = None):
+        self.dynamodb = boto3.resource("dynamodb", region_name="us-west-2")
+        table_name = os.getenv("TABLE_NAME", "WorkoutTracer-UserTable-Staging")
+        self.table = self.dynamodb.Table(table_name)
+        self.logger = Logger(service=SERVICE_NAME)
+        if request_id:
+            self.logger.append_keys(request_id=request_id)
+        self.sk = "STATS"
+        self.seeded_sk = "STATS_SEEDED"
+        self.request_id = request_id
+
+    def create_sk(self, bucket: str, source: str, workout_type: str) -> str:
+        return f"{self.sk}#{bucket}#{source}#{workout_type}"
+
+    def _buckets(self, start_date) -> List[str]:
+        """
+        Return the rollup buckets a workout contributes to. Workouts without a
+        parseable start date only count towards the all-time bucket.
+        """
+        buckets = [ALL_TIME_BUCKET]
+        if not start_date:
+            return buckets
+        try:
+            day = datetime.strptime(str(start_date)[:10], "%Y-%m-%d")
+        except ValueError:
+            self.logger.warning(f"Unparseable start_date for stats: {start_date}")
+            return buckets
+        for prefix, label_format in STATS_PERIODS.values():
+            buckets.append(f"{prefix}#{day.strftime(label_format)}")
+        return buckets
+
+    def _workout_contributions(
+        self, source: str, workout: dict | None
+    ) -> Dict[Tuple[str, str], Dict[str, Decimal]]:
+        """
+        Map a raw workout item to {(bucket, type): {"count": 1, totals...}}.
+        Returns an empty dict for None. Every bucket shares one values dict,
+        so callers must treat it as read-only.
+        """
+        if not workout:
+            return {}
+        summary = WorkoutSummary.from_item(source, workout)
+        workout_type = summary.workout_type or "unknown"
+        values = {
+            "count": Decimal(1),
+            "total_distance": self._to_decimal(summary.distance),
+            "total_elevation_gain": self._to_decimal(summary.elevation_gain),
+            "total_moving_time": self._to_decimal(summary.moving_time),
+            "total_elapsed_time": self._to_decimal(summary.elapsed_time),
+        }
+        return {
+            (bucket, workout_type): values
+            for bucket in self._buckets(summary.start_date)
+        }
+
+    def stats_updates(
+        self, user_id: str, source: str, before: dict | None, after: dict | None
+    ) -> List[dict]:
+        """
+        Build TransactWriteItems 'Update' entries that move the rollups from
+        the `before` workout to the `after` workout. Either may be None for
+        creates and deletes. Rollups whose delta is zero are skipped.
+        """
+        deltas: Dict[Tuple[str, str], Dict[str, Decimal]] = {}
+        for sign, workout in ((-1, before), (1, after)):
+            for key, values in self._workout_contributions(source, workout).items():
+                entry = deltas.setdefault(
+                    key, {name: Decimal(0) for name in ("count",) + STATS_TOTAL_FIELDS}
+                )
+                for name, value in values.items():
+                    entry[name] += sign * value
+
+        updates = []
+        for (bucket, workout_type), delta in deltas.items():
+            if not any(delta.values()):
+                continue
+            updates.append(
+                {
+                    "Update": {
+                        "TableName": self.table.name,
+                        "Key": {
+                            "PK": f"USER#{user_id}",
+                            "SK": self.create_sk(bucket, source, workout_type),
+                        },
+                        "UpdateExpression": (
+                            "SET #b = :bucket, #s = :source, workout_type = :type "
+                            "ADD #c :count, total_distance :total_distance, "
+                            "total_elevation_gain :total_elevation_gain, "
+                            "total_moving_time :total_moving_time, "
+                            "total_elapsed_time :total_elapsed_time"
+                        ),
+                        "ExpressionAttributeNames": {
+                            "#b": "bucket",
+                            "#s": "source",
+                            "#c": "count",
+                        },
+                        "ExpressionAttributeValues": {
+                            ":bucket": bucket,
+                            ":source": source,
+                            ":type": workout_type,
+                            **{f":{name}": value for name, value in delta.items()},
+                        },
+                    }
+                }
+            )
+        return updates
+
+    def stats_condition(self, source: str, before: dict | None) -> dict:
+        """
+        Condition for the workout Put or Delete whose rollup deltas were built
+        from `before` by stats_updates: the stored workout must still match
+        `before` in every attribute the rollups read, or still be absent for
+        a create. A concurrent write in between fails the condition instead
+        of having its delta applied twice. Returns the keys to merge into the
+        TransactWriteItems entry.
+        """
+        if not before:
+            return {"ConditionExpression": "attribute_not_exists(SK)"}
+        clauses = ["attribute_exists(SK)"]
+        names, values = {}, {}
+        for index, field in enumerate(dict.fromkeys(SUMMARY_SOURCE_FIELDS[source])):
+            name = f"#stat{index}"
+            names[name] = field
+            if field not in before:
+                clauses.append(f"attribute_not_exists({name})")
+            elif before[field] is None:
+                clauses.append(f"attribute_type({name}, :null_type)")
+                values[":null_type"] = "NULL"
+            else:
+                clauses.append(f"{name} = :stat{index}")
+                values[f":stat{index}"] = before[field]
+        condition = {
+            "ConditionExpression": " AND ".join(clauses),
+            "ExpressionAttributeNames": names,
+        }
+        if values:
+            condition["ExpressionAttributeValues"] = values
+        return condition
+
+    def get_stats(
+        self, user_id: str, source: str, bucket: str = ALL_TIME_BUCKET
+    ) -> List[dict]:
+        """
+        Return the rollups for a source and bucket as a list of dicts:
+        [{"type", "total_distance", "total_elevation_gain", "total_moving_time",
+          "total_elapsed_time", "count"}, ...]
+        Types whose count has dropped to zero are omitted.
+        """
+        try:
+            query_kwargs = {
+                "KeyConditionExpression": boto3.dynamodb.conditions.Key("PK").eq(
+                    f"USER#{user_id}"
+                )
+                & boto3.dynamodb.conditions.Key("SK").begins_with(
+                    f"{self.sk}#{bucket}#{source}#"
+                ),
+            }
+            items = []
+            while True:
+                response = self.table.query(**query_kwargs)
+                items.extend(response.get("Items", []))
+                last_key = response.get("LastEvaluatedKey")
+                if not last_key:
+                    break
+                query_kwargs["ExclusiveStartKey"] = last_key
+            return [self._to_stats(item) for item in items if item.get("count")]
+        except ClientError as e:
+            self.logger.error(
+                f"Error retrieving stats for user_id {user_id}, bucket {bucket}: {e}"
+            )
+            raise
+
+    def get_stats_range(
+        self,
+        user_id: str,
+        period: str,
+        start: str = None,
+        end: str = None,
+        source: str = None,
+    ) -> List[dict]:
+        """
+        Return every rollup for a period ("day", "week" or "month") whose
+        bucket label falls between `start` and `end` inclusive, in one query.
+        Labels are "2026-10-12" for days, "2026-41" for ISO weeks and
+        "2026-10" for months; omit either bound for an open range.
+        Returns a list of {"bucket", "stats": [...]} in bucket order, where each
+        stats entry carries its source.
+        """
+        prefix = f"{self.sk}#{STATS_PERIODS[period][0]}#"
+        lower = f"{prefix}{start}" if start else prefix
+        # "~" sorts after every character used in labels, sources and types
+        upper = f"{prefix}{end}#~" if end else f"{prefix}~"
+        try:
+            query_kwargs = {
+                "KeyConditionExpression": boto3.dynamodb.conditions.Key("PK").eq(
+                    f"USER#{user_id}"
+                )
+                & boto3.dynamodb.conditions.Key("SK").between(lower, upper),
+            }
+            buckets: Dict[str, List[dict]] = {}
+            while True:
+                response = self.table.query(**query_kwargs)
+                for item in response.get("Items", []):
+                    if not item.get("count"):
+                        continue
+                    if source and item.get("source") != source:
+                        continue
+                    label = item["SK"][len(prefix) :].split("#", 1)[0]
+                    stats = self._to_stats(item)
+                    stats["source"] = item.get("source")
+                    buckets.setdefault(label, []).append(stats)
+                last_key = response.get("LastEvaluatedKey")
+                if not last_key:
+                    break
+                query_kwargs["ExclusiveStartKey"] = last_key
+            return [
+                {"bucket": label, "stats": stats} for label, stats in buckets.items()
+            ]
+        except ClientError as e:
+            self.logger.error(
+                f"Error retrieving {period} stats for user_id {user_id}: {e}"
+            )
+            raise
+
+    def rebuild_stats(
+        self, user_id: str, source: str, workouts: Iterable[dict]
+    ) -> List[dict]:
+        """
+        Recompute every rollup for a source from raw workouts and overwrite
+        the stored items. Deltas written concurrently with a rebuild are lost,
+        so go through seed_stats, which detects that and repeats the rebuild.
+        `workouts` is fully read before anything is written, so a failed read
+        leaves the stored rollups untouched. Returns the all-time stats.
+        """
+        totals: Dict[Tuple[str, str], Dict[str, Decimal]] = {}
+        for workout in workouts:
+            for key, values in self._workout_contributions(source, workout).items():
+                entry = totals.setdefault(
+                    key, {name: Decimal(0) for name in ("count",) + STATS_TOTAL_FIELDS}
+                )
+                for name, value in values.items():
+                    entry[name] += value
+
+        try:
+            existing_keys = []
+            query_kwargs = {
+                "KeyConditionExpression": boto3.dynamodb.conditions.Key("PK").eq(
+                    f"USER#{user_id}"
+                )
+                & boto3.dynamodb.conditions.Key("SK").begins_with(f"{self.sk}#"),
+                "FilterExpression": boto3.dynamodb.conditions.Attr("source").eq(source),
+                "ProjectionExpression": "PK, SK",
+            }
+            while True:
+                response = self.table.query(**query_kwargs)
+                existing_keys.extend(response.get("Items", []))
+                last_key = response.get("LastEvaluatedKey")
+                if not last_key:
+                    break
+                query_kwargs["ExclusiveStartKey"] = last_key
+
+            with self.table.batch_writer(overwrite_by_pkeys=["PK", "SK"]) as batch:
+                for key in existing_keys:
+                    batch.delete_item(Key={"PK": key["PK"], "SK": key["SK"]})
+                for (bucket, workout_type), values in totals.items():
+                    batch.put_item(
+                        Item={
+                            "PK": f"USER#{user_id}",
+                            "SK": self.create_sk(bucket, source, workout_type),
+                            "bucket": bucket,
+                            "source": source,
+                            "workout_type": workout_type,
+                            **values,
+                        }
+                    )
+            self.logger.info(
+                f"Rebuilt {len(totals)} {source} stats rollups for user_id {user_id}"
+            )
+        except ClientError as e:
+            self.logger.error(f"Error rebuilding stats for user_id {user_id}: {e}")
+            raise
+
+        return [
+            self._to_stats({"workout_type": workout_type, "bucket": bucket, **values})
+            for (bucket, workout_type), values in totals.items()
+            if bucket == ALL_TIME_BUCKET
+        ]
+
+    def seed_stats(
+        self,
+        user_id: str,
+        source: str,
+        load_workouts: Callable[[], Iterable[dict]],
+        force: bool = False,
+    ) -> List[dict] | None:
+        """
+        Rebuild a source's rollups once per user and record a STATS_SEEDED
+        marker, so backfills can be re-run safely. Users already seeded are
+        skipped (returns None) unless `force` is set, e.g. after changing
+        bucket definitions. If the user's change sequence moves while the
+        rebuild runs, a concurrent write may have been overwritten, so the
+        rebuild is repeated from a fresh read of `load_workouts()`. A finished
+        rebuild bumps the sequence, so responses cached under the old one
+        (e.g. /miles4manny/stats) are not served. Returns the all-time stats.
+        """
+        marker_key = {"PK": f"USER#{user_id}", "SK": f"{self.seeded_sk}#{source}"}
+        if not force and self.table.get_item(Key=marker_key).get("Item"):
+            self.logger.info(f"{source} stats already seeded for user_id {user_id}")
+            return None
+
+        change_log_helper = WorkoutChangeLogHelper(request_id=self.request_id)
+        for attempt in range(1, STATS_SEED_ATTEMPTS + 1):
+            seq = change_log_helper.get_latest_seq(user_id, consistent_read=True)
+            stats = self.rebuild_stats(user_id, source, load_workouts())
+            if change_log_helper.bump_seq(user_id, seq):
+                self.table.put_item(
+                    Item={
+                        **marker_key,
+                        "seq": seq + 1,
+                        "seeded_at": datetime.utcnow().isoformat(),
+                    }
+                )
+                return stats
+            self.logger.warning(
+                f"Workouts changed while seeding {source} stats for user_id "
+                f"{user_id}, rebuilding (attempt {attempt})"
+            )
+        raise RuntimeError(
+            f"Workouts kept changing while seeding {source} stats for user_id {user_id}"
+        )
+
+    @staticmethod
+    def _to_stats(item: dict) -> dict:
+        return {
+            "type": item.get("workout_type"),
+            "total_distance": float(item.get("total_distance", 0)),
+            "total_elevation_gain": float(item.get("total_elevation_gain", 0)),
+            "total_moving_time": int(item.get("total_moving_time", 0)),
+            "total_elapsed_time": int(item.get("total_elapsed_time", 0)),
+            "count": int(item.get("count", 0)),
+        }
+
+    @staticmethod
+    def _to_decimal(value) -> Decimal:
+        if value is None:
+            return Decimal(0)
+        if isinstance(value, Decimal):
+            return value
+        return Decimal(str(value))
@@ -38,6 +38,9 @@ class AppleHealthWorkoutModel(BaseModel):
 
     # Route
     summary_polyline: Optional[str] = None
+    # Simplified variants of summary_polyline, precomputed on write
+    summary_polyline_low: Optional[str] = None
+    summary_polyline_medium: Optional[str] = None
     start_latlng: Optional[List[float]] = None
 
     # Location enrichment
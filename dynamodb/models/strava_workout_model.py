@@ -5,6 +5,9 @@ from pydantic import BaseModel, Field
 class StravaMapModel(BaseModel):
     id: Optional[str] = None
     summary_polyline: Optional[str] = None
+    # Simplified variants of summary_polyline, precomputed on write
+    summary_polyline_low: Optional[str] = None
+    summary_polyline_medium: Optional[str] = None
     polyline: Optional[str] = None
     resource_state: Optional[int] = None
 
@@ -0,0 +1,132 @@
+from typing import Any, NamedTuple, Optional
+
+# Raw workout attribute for each WorkoutSummary field, in field order, per source
+SUMMARY_SOURCE_FIELDS = {
+    "strava": (
+        "type",
+        "start_date_local",
+        "distance",
+        "total_elevation_gain",
+        "moving_time",
+        "elapsed_time",
+    ),
+    "apple_health": (
+        "workout_activity_type",
+        "start_date",
+        "total_distance",
+        "elevation_ascended",
+        "duration",
+        "duration",
+    ),
+}
+
+
+class WorkoutSummary(NamedTuple):
+    """
+    The handful of workout attributes aggregation paths read, in a
+    source-independent shape. Values are kept as stored (Decimal straight from
+    boto3, float after _decimals_to_floats) so rollups stay exact.
+    """
+
+    workout_type: Optional[str]
+    start_date: Optional[str]
+    distance: Any
+    elevation_gain: Any
+    moving_time: Any
+    elapsed_time: Any
+
+    @classmethod
+    def from_item(cls, source: str, item: dict) -> "WorkoutSummary":
+        return cls._make(map(item.get, SUMMARY_SOURCE_FIELDS[source]))
+
+
+def _float_or_none(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+class AppleHealthWorkoutSummary:
+    """
+    Read-side view of an Apple Health workout item with only the attributes
+    to_strava_format needs. Built without validation, so use it for items
+    read back from the table; AppleHealthWorkoutModel still guards writes.
+    """
+
+    __slots__ = (
+        "workout_uuid",
+        "name",
+        "workout_activity_type",
+        "start_date",
+        "total_distance",
+        "elevation_ascended",
+        "duration",
+        "total_energy_burned",
+        "summary_polyline",
+        "locations",
+    )
+
+    def __init__(
+        self,
+        workout_uuid: str,
+        name: Optional[str] = None,
+        workout_activity_type: Optional[str] = None,
+        start_date: Optional[str] = None,
+        total_distance: Optional[float] = None,
+        elevation_ascended: Optional[float] = None,
+        duration: Optional[float] = None,
+        total_energy_burned: Optional[float] = None,
+        summary_polyline: Optional[str] = None,
+        locations: Optional[dict] = None,
+    ):
+        self.workout_uuid = workout_uuid
+        self.name = name
+        self.workout_activity_type = workout_activity_type
+        self.start_date = start_date
+        self.total_distance = total_distance
+        self.elevation_ascended = elevation_ascended
+        self.duration = duration
+        self.total_energy_burned = total_energy_burned
+        self.summary_polyline = summary_polyline
+        self.locations = locations
+
+    @classmethod
+    def from_item(cls, item: dict) -> "AppleHealthWorkoutSummary":
+        get = item.get
+        return cls(
+            item["workout_uuid"],
+            get("name"),
+            get("workout_activity_type"),
+            get("start_date"),
+            _float_or_none(get("total_distance")),
+            _float_or_none(get("elevation_ascended")),
+            _float_or_none(get("duration")),
+            _float_or_none(get("total_energy_burned")),
+            get("summary_polyline"),
+            get("locations"),
+        )
+
+    def to_strava_format(self) -> dict:
+        """Same output as AppleHealthWorkoutModel.to_strava_format."""
+        locations = self.locations or {}
+        return {
+            "id": self.workout_uuid,
+            "name": self.name,
+            "type": self.workout_activity_type,
+            "sport_type": self.workout_activity_type,
+            "start_date": self.start_date,
+            "start_date_local": self.start_date,
+            "distance": self.total_distance,
+            "total_elevation_gain": self.elevation_ascended,
+            "moving_time": int(self.duration) if self.duration else None,
+            "elapsed_time": int(self.duration) if self.duration else None,
+            "kilojoules": (
+                (self.total_energy_burned / 0.239006)
+                if self.total_energy_burned
+                else None
+            ),
+            "map": {"summary_polyline": self.summary_polyline},
+            "locations": {
+                "states": dict(locations.get("states") or {}),
+                "countries": dict(locations.get("countries") or {}),
+            },
+            "source": "apple_health",
+        }
@@ -1,92 +1,109 @@
-from endpoints.workout_tracer import home
-from endpoints.user import (
-    get_user_profile,
-    get_requestors_profile,
-    update_user_profile,
-    get_public_users,
-)
-from endpoints.health import (
-    import_health_workouts,
-    get_health_workouts,
-    get_health_workout_ids,
-    delete_health_workout,
-)
-from endpoints.public import (
-    get_public_workouts,
-    get_public_profile,
-    get_public_workout_locations as public_workout_locations,
-)
-from endpoints.strava import (
-    get_requestor_strava_profile,
-    get_strava_profile,
-    update_strava_callback,
-    identify_strava_workouts,
-    update_strava_workout,
-    get_strava_workouts,
-    strava_webhook_verification,
-    strava_webhook_event,
-    miles_for_manny,
-    miles_for_manny_stats,
-    get_workout_locations,
-)
+import importlib
+from typing import Dict, List, Tuple
+from aws_lambda_powertools import Logger
+from constants.general import SERVICE_NAME
+
+logger = Logger(service=SERVICE_NAME)
+
+# URL prefix -> (OpenAPI tag, endpoint modules in registration order)
+ROUTE_GROUPS: Dict[str, Tuple[str, List[str]]] = {
+    "": ("General", ["endpoints.workout_tracer.home"]),
+    "/applehealth": (
+        "AppleHealth",
+        [
+            "endpoints.health.import_health_workouts",
+            "endpoints.health.get_health_workouts",
+            "endpoints.health.get_health_workout_ids",
+            "endpoints.health.delete_health_workout",
+        ],
+    ),
+    "/public": (
+        "Public",
+        [
+            "endpoints.public.get_public_workouts",
+            "endpoints.public.get_public_profile",
+            "endpoints.public.get_public_profile_bundle",
+            "endpoints.public.get_public_workout_locations",
+            "endpoints.public.get_public_workout_changes",
+            "endpoints.public.get_public_route_tiles",
+            "endpoints.public.get_public_heatmap",
+            "endpoints.public.get_public_heatmap_tiles",
+        ],
+    ),
+    "/strava": (
+        "Strava",
+        [
+            "endpoints.strava.get_requestor_strava_profile",
+            "endpoints.strava.get_strava_profile",
+            "endpoints.strava.identify_strava_workouts",
+            "endpoints.strava.update_strava_callback",
+            "endpoints.strava.update_strava_workout",
+            # "endpoints.strava.batch_update_strava_workout",
+            "endpoints.strava.get_strava_workouts",
+            "endpoints.strava.get_strava_workout_changes",
+            # "endpoints.strava.update_all_strava_workouts",
+            "endpoints.strava.strava_webhook_verification",
+            "endpoints.strava.strava_webhook_event",
+            "endpoints.strava.miles_for_manny",
+            "endpoints.strava.miles_for_manny_stats",
+            "endpoints.strava.get_workout_locations",
+        ],
+    ),
+    "/user": (
+        "User",
+        [
+            "endpoints.user.get_user_profile",
+            "endpoints.user.update_user_profile",
+            "endpoints.user.get_requestors_profile",
+            "endpoints.user.get_public_users",
+            "endpoints.user.get_workout_stats",
+            "endpoints.user.get_workout_analytics",
+            "endpoints.user.get_workout_rolling_stats",
+            "endpoints.user.export_workouts",
+        ],
+    ),
+}
+
+
+def include_route_group(app, prefix: str):
+    """Import one group's endpoint modules and register their routers."""
+    tag, module_names = ROUTE_GROUPS[prefix]
+    for module_name in module_names:
+        module = importlib.import_module(module_name)
+        if prefix:
+            app.include_router(module.router, prefix=prefix, tags=[tag])
+        else:
+            app.include_router(module.router, tags=[tag])
 
 
 def get_all_routes(app):
     """Register all routers to the FastAPI app."""
+    for prefix in ROUTE_GROUPS:
+        include_route_group(app, prefix)
+    return app
 
-    # General
-    app.include_router(home.router, tags=["General"])
-
-    # Apple Health
-    app.include_router(
-        import_health_workouts.router, prefix="/applehealth", tags=["AppleHealth"]
-    )
-    app.include_router(
-        get_health_workouts.router, prefix="/applehealth", tags=["AppleHealth"]
-    )
-    app.include_router(
-        get_health_workout_ids.router, prefix="/applehealth", tags=["AppleHealth"]
-    )
-    app.include_router(
-        delete_health_workout.router, prefix="/applehealth", tags=["AppleHealth"]
-    )
 
-    # Public
-    app.include_router(get_public_workouts.router, prefix="/public", tags=["Public"])
-    app.include_router(get_public_profile.router, prefix="/public", tags=["Public"])
-    app.include_router(
-        public_workout_locations.router, prefix="/public", tags=["Public"]
-    )
+class LazyRouteLoader:
+    """
+    Registers each route group on the first request under its prefix, so a
+    cold start only imports the endpoints (and their dependencies) that the
+    request needs. Paths outside every group, such as /docs and
+    /openapi.json, load everything.
+    """
 
-    # Strava
-    app.include_router(
-        get_requestor_strava_profile.router, prefix="/strava", tags=["Strava"]
-    )
-    app.include_router(get_strava_profile.router, prefix="/strava", tags=["Strava"])
-    app.include_router(
-        identify_strava_workouts.router, prefix="/strava", tags=["Strava"]
-    )
-    app.include_router(update_strava_callback.router, prefix="/strava", tags=["Strava"])
-    app.include_router(update_strava_workout.router, prefix="/strava", tags=["Strava"])
-    # app.include_router(
-    #     batch_update_strava_workout.router, prefix="/strava", tags=["Strava"]
-    # )
-    app.include_router(get_strava_workouts.router, prefix="/strava", tags=["Strava"])
-    # app.include_router(
-    #     update_all_strava_workouts.router, prefix="/strava", tags=["Strava"]
-    # )
-    app.include_router(
-        strava_webhook_verification.router, prefix="/strava", tags=["Strava"]
-    )
-    app.include_router(strava_webhook_event.router, prefix="/strava", tags=["Strava"])
-    app.include_router(miles_for_manny.router, prefix="/strava", tags=["Strava"])
-    app.include_router(miles_for_manny_stats.router, prefix="/strava", tags=["Strava"])
-    app.include_router(get_workout_locations.router, prefix="/strava", tags=["Strava"])
+    def __init__(self, app):
+        self.app = app
+        self._loaded = set()
 
-    # User
-    app.include_router(get_user_profile.router, prefix="/user", tags=["User"])
-    app.include_router(update_user_profile.router, prefix="/user", tags=["User"])
-    app.include_router(get_requestors_profile.router, prefix="/user", tags=["User"])
-    app.include_router(get_public_users.router, prefix="/user", tags=["User"])
+    def ensure_loaded(self, path: str):
+        prefix = "/" + path.split("/", 2)[1] if path != "/" else ""
+        prefixes = [prefix] if prefix in ROUTE_GROUPS else list(ROUTE_GROUPS)
+        for group in prefixes:
+            if group not in self._loaded:
+                include_route_group(self.app, group)
+                self._loaded.add(group)
+                logger.info(f"Loaded route group '{group or '/'}' for {path}")
 
-    return app
+    def load_all(self):
+        for group in ROUTE_GROUPS:
+            self.ensure_loaded(group or "/")
@@ -3,17 +3,13 @@ from fastapi.responses import JSONResponse
 from aws_lambda_powertools import Logger
 from decorators.exceptions_decorator import exceptions_decorator
 from dynamodb.helpers.apple_health_workout_helper import AppleHealthWorkoutHelper
-from aws_lambda_powertools.metrics import Metrics, MetricUnit
-import os
+from dynamodb.helpers.public_bundle_helper import PublicBundleHelper
+from helpers import response_cache
+from helpers.metrics_emitter import emit_metric
 
 logger = Logger(service="workout-tracer-api")
 router = APIRouter()
 
-stage = os.environ.get("STAGE", "dev")
-metrics = Metrics(
-    namespace=f"WorkoutTracer-{stage.upper()}", service="workout-tracer-api"
-)
-
 
 @router.delete(
     "/workout/{workout_uuid}",
@@ -36,9 +32,11 @@ def delete_health_workout(request: Request, workout_uuid: str):
     )
 
     if deleted:
-        metrics.add_dimension(name="SourceType", value="AppleHealth")
-        metrics.add_metric(name="WorkoutDeleted", unit=MetricUnit.Count, value=1)
-        metrics.flush_metrics()
+        response_cache.invalidate(user_id)
+        PublicBundleHelper(request_id=request.state.request_id).request_refresh(
+            user_id, ["stats", "locations"]
+        )
+        emit_metric("WorkoutDeleted", {"SourceType": "AppleHealth"})
         return JSONResponse(
             content={"message": f"Workout {workout_uuid} deleted successfully."},
             status_code=200,
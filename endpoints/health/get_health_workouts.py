@@ -3,6 +3,11 @@ from fastapi.responses import JSONResponse
 from aws_lambda_powertools import Logger
 from decorators.exceptions_decorator import exceptions_decorator
 from dynamodb.helpers.apple_health_workout_helper import AppleHealthWorkoutHelper
+from helpers.field_selection import (
+    APPLE_HEALTH_WORKOUT_FIELDS,
+    compile_projection,
+    parse_fields,
+)
 import base64
 import json
 import urllib.parse
@@ -24,6 +29,10 @@ def get_health_workouts(
         500, ge=1, le=500, description="Number of workouts to return (max 500)"
     ),
     next_token: str = Query(None, description="Token for fetching the next page"),
+    fields: str = Query(
+        None,
+        description="Comma separated fields to return, e.g. workout_uuid,start_date,total_distance",
+    ),
 ):
     user_id = getattr(request.state, "user_token", None)
     if not user_id:
@@ -31,6 +40,10 @@ def get_health_workouts(
         return JSONResponse(
             content={"error": "User ID not found in request."}, status_code=400
         )
+    try:
+        selected_fields = parse_fields(fields, APPLE_HEALTH_WORKOUT_FIELDS)
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
 
     helper = AppleHealthWorkoutHelper(request_id=request.state.request_id)
 
@@ -50,19 +63,26 @@ def get_health_workouts(
     # Project only the fields needed for dashboard display.
     # "name" and "locations" are not reserved words in DynamoDB but we alias
     # "name" to be safe since it is a reserved word.
+    projection_expression = (
+        "workout_uuid, #n, workout_activity_type, start_date, "
+        "total_distance, duration, total_energy_burned, elevation_ascended, "
+        "summary_polyline, average_speed, average_heartrate, max_heartrate, "
+        "locations"
+    )
+    expression_attribute_names = {
+        "#n": "name",
+    }
+    if selected_fields:
+        projection_expression, expression_attribute_names = compile_projection(
+            selected_fields
+        )
+
     result = helper.get_all_workouts(
         user_id=user_id,
         limit=limit,
         next_token=dynamo_next_token,
-        projection_expression=(
-            "workout_uuid, #n, workout_activity_type, start_date, "
-            "total_distance, duration, total_energy_burned, elevation_ascended, "
-            "summary_polyline, average_speed, average_heartrate, max_heartrate, "
-            "locations"
-        ),
-        expression_attribute_names={
-            "#n": "name",
-        },
+        projection_expression=projection_expression,
+        expression_attribute_names=expression_attribute_names,
     )
 
     workouts = result.get("workouts", [])
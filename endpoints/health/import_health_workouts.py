@@ -3,17 +3,14 @@ from fastapi.responses import JSONResponse
 from aws_lambda_powertools import Logger
 from decorators.exceptions_decorator import exceptions_decorator
 from dynamodb.helpers.apple_health_workout_helper import AppleHealthWorkoutHelper
-from aws_lambda_powertools.metrics import Metrics, MetricUnit
+from dynamodb.helpers.public_bundle_helper import PublicBundleHelper
+from helpers import response_cache
+from helpers.metrics_emitter import emit_metric
 from typing import List
-import os
 
 logger = Logger(service="workout-tracer-api")
 router = APIRouter()
 
-stage = os.environ.get("STAGE", "dev")
-metrics = Metrics(
-    namespace=f"WorkoutTracer-{stage.upper()}", service="workout-tracer-api"
-)
 
 MAX_BATCH_SIZE = 100
 
@@ -57,22 +54,20 @@ def import_health_workouts(request: Request, payloads: List[dict]):
             )
             if action == "create":
                 created += 1
-                metrics.add_dimension(name="SourceType", value="AppleHealth")
-                metrics.add_metric(
-                    name="WorkoutCreated", unit=MetricUnit.Count, value=1
-                )
-                metrics.flush_metrics()
+                emit_metric("WorkoutCreated", {"SourceType": "AppleHealth"})
             elif action == "update":
                 updated += 1
-                metrics.add_dimension(name="SourceType", value="AppleHealth")
-                metrics.add_metric(
-                    name="WorkoutUpdated", unit=MetricUnit.Count, value=1
-                )
-                metrics.flush_metrics()
+                emit_metric("WorkoutUpdated", {"SourceType": "AppleHealth"})
         except Exception as e:
             errors += 1
             logger.error(f"Failed to import workout for user_id={user_id}: {e}")
 
+    if created or updated:
+        response_cache.invalidate(user_id)
+        PublicBundleHelper(request_id=request.state.request_id).request_refresh(
+            user_id, ["stats"]
+        )
+
     return JSONResponse(
         content={"created": created, "updated": updated, "errors": errors},
         status_code=200,
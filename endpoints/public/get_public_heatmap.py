@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Request, Query, Response
+from fastapi.responses import JSONResponse
+from aws_lambda_powertools import Logger
+from decorators.exceptions_decorator import exceptions_decorator
+from dynamodb.helpers.user_profile_helper import UserProfileHelper
+
+logger = Logger(service="workout-tracer-api")
+router = APIRouter()
+
+
+@router.get(
+    "/heatmap/{user_display_id}",
+    summary="Get a heatmap image of all of a public user's routes",
+    response_description="Square PNG framing every route",
+    tags=["Public"],
+)
+@exceptions_decorator
+def get_public_heatmap(
+    user_display_id: int,
+    request: Request,
+    size: int = Query(512, ge=64, le=1024, description="Image width and height"),
+    source: str = Query(
+        None, description="Routes to include: strava, apple_health or all (default)"
+    ),
+):
+    """
+    Heatmap Image Endpoint
+    Returns:
+        A PNG accumulated server-side from every decoded route point.
+    """
+    from helpers.route_heatmap import get_heatmap_image, heatmap_sources
+
+    requestor_id = getattr(request.state, "user_token", None)
+    if not requestor_id:
+        return JSONResponse(
+            content={"error": "User ID not found in request."}, status_code=400
+        )
+
+    sources = heatmap_sources(source)
+    if not sources:
+        return JSONResponse(
+            content={
+                "error": f"Invalid source '{source}'. Use strava, apple_health or all."
+            },
+            status_code=400,
+        )
+
+    user_profile_helper = UserProfileHelper(request_id=request.state.request_id)
+    user_profile = user_profile_helper.get_user_by_display_id(user_display_id)
+
+    if not user_profile or not user_profile.get("public_profile", False):
+        logger.warning(
+            f"User profile with user_display_id {user_display_id} not found or not public."
+        )
+        return JSONResponse(
+            content={"error": "User profile not found."}, status_code=404
+        )
+
+    version, png = get_heatmap_image(
+        user_profile.get("user_id"),
+        size,
+        sources,
+        request_id=request.state.request_id,
+    )
+
+    etag = f'"{version}-{"+".join(sources)}-{size}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    return Response(content=png, media_type="image/png", headers={"ETag": etag})
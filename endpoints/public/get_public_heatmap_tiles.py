@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Request, Query, Response
+from fastapi.responses import JSONResponse
+from aws_lambda_powertools import Logger
+from decorators.exceptions_decorator import exceptions_decorator
+from dynamodb.helpers.user_profile_helper import UserProfileHelper
+
+logger = Logger(service="workout-tracer-api")
+router = APIRouter()
+
+
+@router.get(
+    "/heatmap/{user_display_id}/{z}/{x}/{y}",
+    summary="Get one PNG heatmap tile of a public user's routes",
+    response_description="256x256 PNG Web Mercator XYZ tile",
+    tags=["Public"],
+)
+@exceptions_decorator
+def get_public_heatmap_tile(
+    user_display_id: int,
+    z: int,
+    x: int,
+    y: int,
+    request: Request,
+    source: str = Query(
+        None, description="Routes to include: strava, apple_health or all (default)"
+    ),
+):
+    """
+    Heatmap Tile Endpoint
+    Tiles carry an ETag of the user's data version.
+    """
+    from helpers.route_heatmap import get_heatmap_tile, heatmap_sources
+    from helpers.route_tiles import MAX_TILE_ZOOM
+
+    requestor_id = getattr(request.state, "user_token", None)
+    if not requestor_id:
+        return JSONResponse(
+            content={"error": "User ID not found in request."}, status_code=400
+        )
+
+    if not 0 <= z <= MAX_TILE_ZOOM or not (0 <= x < 2**z and 0 <= y < 2**z):
+        return JSONResponse(
+            content={"error": f"Invalid tile {z}/{x}/{y}."}, status_code=400
+        )
+
+    sources = heatmap_sources(source)
+    if not sources:
+        return JSONResponse(
+            content={
+                "error": f"Invalid source '{source}'. Use strava, apple_health or all."
+            },
+            status_code=400,
+        )
+
+    user_profile_helper = UserProfileHelper(request_id=request.state.request_id)
+    user_profile = user_profile_helper.get_user_by_display_id(user_display_id)
+
+    if not user_profile or not user_profile.get("public_profile", False):
+        logger.warning(
+            f"User profile with user_display_id {user_display_id} not found or not public."
+        )
+        return JSONResponse(
+            content={"error": "User profile not found."}, status_code=404
+        )
+
+    version, png = get_heatmap_tile(
+        user_profile.get("user_id"),
+        z,
+        x,
+        y,
+        sources,
+        request_id=request.state.request_id,
+    )
+
+    etag = f'"{version}-{"+".join(sources)}-{z}-{x}-{y}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    return Response(content=png, media_type="image/png", headers={"ETag": etag})
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from aws_lambda_powertools import Logger
+from decorators.exceptions_decorator import exceptions_decorator
+from dynamodb.helpers.public_bundle_helper import PublicBundleHelper
+from dynamodb.helpers.user_profile_helper import UserProfileHelper
+
+logger = Logger(service="workout-tracer-api")
+router = APIRouter()
+
+
+@router.get(
+    "/profile_bundle/{user_display_id}",
+    summary="Get everything a public profile page renders in one call",
+    response_description="Public profile, Strava profile, headline stats and location summary",
+    tags=["Public"],
+)
+@exceptions_decorator
+def get_public_profile_bundle(user_display_id: int, request: Request):
+    """
+    Public Profile Bundle Endpoint
+    Serves the denormalized PUBLIC_BUNDLE item with one GSI query (to resolve
+    the display id and public flag) plus one GetItem.
+    """
+    requestor_id = getattr(request.state, "user_token", None)
+    if not requestor_id:
+        return JSONResponse(
+            content={"error": "User ID not found in request."}, status_code=400
+        )
+
+    user_profile_helper = UserProfileHelper(request_id=request.state.request_id)
+    user_profile = user_profile_helper.get_user_by_display_id(user_display_id)
+
+    if not user_profile or not user_profile.get("public_profile", False):
+        logger.warning(
+            f"User profile with user_display_id {user_display_id} not found or not public."
+        )
+        return JSONResponse(
+            content={"error": "User profile not found."}, status_code=404
+        )
+
+    bundle_helper = PublicBundleHelper(request_id=request.state.request_id)
+    bundle = bundle_helper.get_bundle(user_profile.get("user_id"))
+    return JSONResponse(content=bundle, status_code=200)
@@ -0,0 +1,77 @@
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import JSONResponse
+from aws_lambda_powertools import Logger
+from decorators.exceptions_decorator import exceptions_decorator
+from dynamodb.helpers.user_profile_helper import UserProfileHelper
+from dynamodb.helpers.workout_change_log_helper import WorkoutChangeLogHelper
+
+logger = Logger(service="workout-tracer-api")
+router = APIRouter()
+
+
+@router.get(
+    "/tiles/{user_display_id}/{z}/{x}/{y}",
+    summary="Get one GeoJSON tile of a public user's routes",
+    response_description="GeoJSON FeatureCollection of route segments clipped to the tile",
+    tags=["Public"],
+)
+@exceptions_decorator
+def get_public_route_tile(
+    user_display_id: int, z: int, x: int, y: int, request: Request
+):
+    """
+    Route Tile Endpoint
+    Serves Web Mercator XYZ tiles of a user's simplified routes so maps only
+    fetch what is visible. Tiles carry an ETag of the user's data version.
+    """
+    # shapely lives in the heavy layer; only pay for the import when this route is hit
+    from helpers.route_tiles import MAX_TILE_ZOOM, get_route_tile
+
+    requestor_id = getattr(request.state, "user_token", None)
+    if not requestor_id:
+        return JSONResponse(
+            content={"error": "User ID not found in request."}, status_code=400
+        )
+
+    if not 0 <= z <= MAX_TILE_ZOOM or not (0 <= x < 2**z and 0 <= y < 2**z):
+        return JSONResponse(
+            content={"error": f"Invalid tile {z}/{x}/{y}."}, status_code=400
+        )
+
+    user_profile_helper = UserProfileHelper(request_id=request.state.request_id)
+    user_profile = user_profile_helper.get_user_by_display_id(user_display_id)
+
+    if not user_profile or not user_profile.get("public_profile", False):
+        logger.warning(
+            f"User profile with user_display_id {user_display_id} not found or not public."
+        )
+        return JSONResponse(
+            content={"error": "User profile not found."}, status_code=404
+        )
+
+    user_id = user_profile.get("user_id")
+    show_source = bool(user_profile.get("show_workout_source", False))
+    # The ETag needs only the data version, so a revalidation skips the tile
+    version = WorkoutChangeLogHelper(
+        request_id=request.state.request_id
+    ).get_latest_seq(user_id)
+    etag = f'"{user_display_id}-{version}-{int(show_source)}-{z}-{x}-{y}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    _, tile = get_route_tile(
+        user_id,
+        z,
+        x,
+        y,
+        include_source=show_source,
+        request_id=request.state.request_id,
+        version=version,
+    )
+
+    return JSONResponse(
+        content=tile,
+        status_code=200,
+        media_type="application/geo+json",
+        headers={"ETag": etag},
+    )
@@ -0,0 +1,114 @@
+from fastapi import APIRouter, Request, Query
+from fastapi.responses import JSONResponse
+from aws_lambda_powertools import Logger
+from decorators.exceptions_decorator import exceptions_decorator
+from dynamodb.helpers.strava_workout_helper import StravaWorkoutHelper
+from dynamodb.helpers.apple_health_workout_helper import AppleHealthWorkoutHelper
+from dynamodb.helpers.user_profile_helper import UserProfileHelper
+from dynamodb.helpers.workout_change_log_helper import WorkoutChangeLogHelper
+from dynamodb.models.workout_summary import AppleHealthWorkoutSummary
+from endpoints.public.get_public_workouts import (
+    STRAVA_PROJECTION,
+    STRAVA_EXPR_NAMES,
+    AH_PROJECTION,
+    AH_EXPR_NAMES,
+)
+from helpers.polyline_resolution import select_polyline_variant
+
+logger = Logger(service="workout-tracer-api")
+router = APIRouter()
+
+
+@router.get(
+    "/workouts/changes/{user_display_id}",
+    summary="Get public workout changes for a user since a sequence number",
+    response_description="Workouts from all sources created, updated or deleted since the given sequence",
+    tags=["Public"],
+)
+@exceptions_decorator
+def get_public_workout_changes(
+    user_display_id: int,
+    request: Request,
+    since: int = Query(0, ge=0, description="Last sequence number already synced"),
+    limit: int = Query(
+        500, ge=1, le=500, description="Number of change events to read (max 500)"
+    ),
+):
+    requestor_id = getattr(request.state, "user_token", None)
+    if not requestor_id:
+        return JSONResponse(
+            content={"error": "User ID not found in request."}, status_code=400
+        )
+
+    user_profile_helper = UserProfileHelper(request_id=request.state.request_id)
+    user_profile = user_profile_helper.get_user_by_display_id(user_display_id)
+
+    if not user_profile or not user_profile.get("public_profile", False):
+        logger.warning(
+            f"User profile with user_display_id {user_display_id} not found or not public."
+        )
+        return JSONResponse(
+            content={"error": "User profile not found."}, status_code=404
+        )
+
+    user_id = user_profile.get("user_id")
+    show_source = user_profile.get("show_workout_source", False)
+
+    change_log_helper = WorkoutChangeLogHelper(request_id=request.state.request_id)
+    result = change_log_helper.get_changes(user_id=user_id, since=since, limit=limit)
+
+    strava_helper = StravaWorkoutHelper(request_id=request.state.request_id)
+    ah_helper = AppleHealthWorkoutHelper(request_id=request.state.request_id)
+    changes = WorkoutChangeLogHelper.latest_per_workout(result["changes"])
+
+    # One BatchGetItem per 100 changed workouts of each source
+    live = [change for change in changes if change["action"] != "delete"]
+    strava_workouts = strava_helper.batch_get_strava_workouts(
+        user_id,
+        [c["workout_id"] for c in live if c["source"] != "apple_health"],
+        projection_expression=STRAVA_PROJECTION,
+        expression_attribute_names=STRAVA_EXPR_NAMES,
+    )
+    ah_workouts = ah_helper.batch_get_apple_health_workouts(
+        user_id,
+        [c["workout_id"] for c in live if c["source"] == "apple_health"],
+        projection_expression=AH_PROJECTION,
+        expression_attribute_names=AH_EXPR_NAMES,
+    )
+
+    upserted = []
+    deleted = []
+    for change in changes:
+        workout_id = change["workout_id"]
+        workout = None
+        if change["action"] != "delete":
+            if change["source"] == "apple_health":
+                raw = ah_workouts.get(workout_id)
+                if raw:
+                    workout = AppleHealthWorkoutSummary.from_item(
+                        raw
+                    ).to_strava_format()
+            else:
+                workout = strava_workouts.get(workout_id)
+                if workout and "source" not in workout:
+                    workout["source"] = "strava"
+                if workout:
+                    select_polyline_variant(workout.get("map"), "full")
+
+        if workout:
+            if not show_source:
+                workout.pop("source", None)
+            upserted.append(workout)
+        else:
+            deleted.append(workout_id)
+
+    return JSONResponse(
+        content={
+            "since": since,
+            "next_since": result["next_since"],
+            "has_more": result["has_more"],
+            "upserted": upserted,
+            "deleted": deleted,
+        },
+        status_code=200,
+    )
@@ -2,57 +2,17 @@ from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 from aws_lambda_powertools import Logger
 from decorators.exceptions_decorator import exceptions_decorator
-from dynamodb.helpers.strava_workout_helper import StravaWorkoutHelper
-from dynamodb.helpers.apple_health_workout_helper import AppleHealthWorkoutHelper
+from dynamodb.helpers.public_bundle_helper import PublicBundleHelper
 from dynamodb.helpers.user_profile_helper import UserProfileHelper
-from typing import Dict
+from helpers import response_cache
 
 logger = Logger(service="workout-tracer-api")
 router = APIRouter()
 
 
-def _merge_location_summaries(
-    base: Dict[str, Dict[str, Dict[str, int]]],
-    addition: Dict[str, Dict[str, Dict[str, int]]],
-) -> None:
-    """Merge location summary dicts in-place into base."""
-    for location_type in ("states", "countries"):
-        for name, sport_counts in (addition.get(location_type) or {}).items():
-            entry = base[location_type].setdefault(name, {"total": 0})
-            for sport, count in sport_counts.items():
-                entry[sport] = entry.get(sport, 0) + count
-
-
-def _get_apple_health_locations(
-    ah_helper: AppleHealthWorkoutHelper, user_id: str
-) -> dict:
-    """Aggregate locations from Apple Health workouts, mirroring Strava pattern."""
-    summary: Dict[str, Dict[str, Dict[str, int]]] = {
-        "countries": {},
-        "states": {},
-    }
-    next_token = None
-    while True:
-        result = ah_helper.get_all_workouts(
-            user_id,
-            next_token=next_token,
-            projection_expression="#loc, workout_activity_type",
-            expression_attribute_names={"#loc": "locations"},
-        )
-        for workout in result.get("workouts", []):
-            sport_type = workout.get("workout_activity_type") or "Unknown"
-            locations = workout.get("locations") or {}
-            for location_type in ("states", "countries"):
-                for name, visited in (locations.get(location_type) or {}).items():
-                    if not visited:
-                        continue
-                    entry = summary[location_type].setdefault(name, {"total": 0})
-                    entry[sport_type] = entry.get(sport_type, 0) + 1
-                    entry["total"] += 1
-        next_token = result.get("next_token")
-        if not next_token:
-            break
-    return {"locations": summary}
+def build_combined_locations(request_id: str, user_id: str) -> dict:
+    """Location summary across Strava and Apple Health workouts."""
+    return PublicBundleHelper(request_id=request_id).get_combined_locations(user_id)
 
 
 @router.get(
@@ -81,17 +41,11 @@ def get_public_workout_locations(user_display_id: int, request: Request):
         )
 
     user_id = user_profile.get("user_id")
-
-    # Get Strava workout locations
-    strava_helper = StravaWorkoutHelper(request_id=request.state.request_id)
-    strava_locations = strava_helper.get_all_workout_locations(user_id)
-
-    # Get Apple Health workout locations
-    ah_helper = AppleHealthWorkoutHelper(request_id=request.state.request_id)
-    ah_locations = _get_apple_health_locations(ah_helper, user_id)
-
-    # Merge both summaries
-    combined = strava_locations.get("locations", {"countries": {}, "states": {}})
-    _merge_location_summaries(combined, ah_locations.get("locations", {}))
-
-    return JSONResponse(content={"locations": combined}, status_code=200)
+    content = response_cache.get_or_build(
+        "/public/workout_locations",
+        {},
+        lambda: build_combined_locations(request.state.request_id, user_id),
+        owner_id=user_id,
+        request_id=request.state.request_id,
+    )
+    return JSONResponse(content=content, status_code=200)
@@ -5,8 +5,21 @@ from decorators.exceptions_decorator import exceptions_decorator
 from dynamodb.helpers.strava_workout_helper import StravaWorkoutHelper
 from dynamodb.helpers.apple_health_workout_helper import AppleHealthWorkoutHelper
 from dynamodb.helpers.user_profile_helper import UserProfileHelper
-from dynamodb.models.apple_health_workout_model import AppleHealthWorkoutModel
-from cryptography.fernet import Fernet
+from dynamodb.models.workout_summary import AppleHealthWorkoutSummary
+from helpers import response_cache
+from helpers.field_selection import (
+    STRAVA_WORKOUT_FIELDS,
+    apple_health_fields_for,
+    compile_projection,
+    parse_fields,
+    select_fields,
+)
+from helpers.polyline_resolution import (
+    POLYLINE_DETAIL_LEVELS,
+    polyline_variant_field,
+    select_polyline_variant,
+)
+from helpers.lazy_import import lazy_import
 import base64
 import boto3
 import json
@@ -16,11 +29,14 @@ import urllib.parse
 logger = Logger(service="workout-tracer-api")
 router = APIRouter()
 
+# Only encrypted pagination tokens need cryptography; defer it past cold start
+fernet = lazy_import("cryptography.fernet")
+
 # Cache the Fernet key so we only fetch from Secrets Manager once per Lambda container
 _pagination_token_key_cache: str | None = None
 
 
-def _get_pagination_token_key() -> str | None:
+def get_pagination_token_key() -> str | None:
     """Retrieve the Fernet pagination token key from Secrets Manager, cached per container."""
     global _pagination_token_key_cache
     if _pagination_token_key_cache is not None:
@@ -68,15 +84,55 @@ AH_PROJECTION = (
 AH_EXPR_NAMES = {"#n": "name", "#s": "source", "#d": "duration"}
 
 
+def _projections_for_fields(detail: str, fields: tuple) -> tuple:
+    """
+    Projections for an explicit fields= selection of Strava-format names.
+    Apple Health attributes are read only for the fields they normalize to.
+    """
+    strava_subpaths = None
+    ah_fields = apple_health_fields_for(fields)
+    if detail != "full":
+        variant = polyline_variant_field(detail)
+        strava_subpaths = {"map": ["summary_polyline", variant]}
+        if "summary_polyline" in ah_fields:
+            ah_fields += (variant,)
+    strava_projection, strava_names = compile_projection(fields, strava_subpaths)
+    ah_projection, ah_names = compile_projection(ah_fields)
+    return strava_projection, strava_names, ah_projection, ah_names
+
+
+def _projections_for_detail(detail: str, fields: tuple = None) -> tuple:
+    """
+    Return (strava projection, strava names, apple health projection,
+    apple health names) that read only the polyline variant for `detail`,
+    and only the requested `fields` when a selection was made.
+    """
+    if fields:
+        return _projections_for_fields(detail, fields)
+    if detail == "full":
+        return STRAVA_PROJECTION, STRAVA_EXPR_NAMES, AH_PROJECTION, AH_EXPR_NAMES
+    variant = polyline_variant_field(detail)
+    strava_projection = STRAVA_PROJECTION.replace("#m,", "#m.summary_polyline, #m.#v,")
+    ah_projection = AH_PROJECTION.replace(
+        "summary_polyline,", f"summary_polyline, {variant},"
+    )
+    return (
+        strava_projection,
+        {**STRAVA_EXPR_NAMES, "#v": variant},
+        ah_projection,
+        AH_EXPR_NAMES,
+    )
+
+
 def _encode_next_token(token_dict: dict, encrypt: bool) -> str | None:
     """Encode a dual-cursor pagination token as base64 or Fernet-encrypted string."""
     if not token_dict.get("strava_next") and not token_dict.get("apple_health_next"):
         return None
     payload = json.dumps(token_dict)
     if encrypt:
-        key = _get_pagination_token_key()
+        key = get_pagination_token_key()
         if key:
-            f = Fernet(key.encode() if isinstance(key, str) else key)
+            f = fernet.Fernet(key.encode() if isinstance(key, str) else key)
             return f.encrypt(payload.encode()).decode()
     return base64.urlsafe_b64encode(payload.encode()).decode()
 
@@ -85,9 +141,9 @@ def _decode_next_token(token: str, decrypt: bool) -> dict:
     """Decode a dual-cursor pagination token."""
     try:
         if decrypt:
-            key = _get_pagination_token_key()
+            key = get_pagination_token_key()
             if key:
-                f = Fernet(key.encode() if isinstance(key, str) else key)
+                f = fernet.Fernet(key.encode() if isinstance(key, str) else key)
                 try:
                     payload = f.decrypt(token.encode()).decode()
                     return json.loads(payload)
@@ -100,48 +156,19 @@ def _decode_next_token(token: str, decrypt: bool) -> dict:
         return {}
 
 
-@router.get(
-    "/workouts/{user_display_id}",
-    summary="Get public workouts for a user by user_display_id",
-    response_description="Paginated list of public workouts from all sources",
-    tags=["Public"],
-)
-@exceptions_decorator
-def get_public_workouts(
-    user_display_id: int,
-    request: Request,
-    limit: int = Query(
-        500, ge=1, le=500, description="Number of workouts to return (max 500)"
-    ),
-    next_token: str = Query(None, description="Token for fetching the next page"),
-):
-    requestor_id = getattr(request.state, "user_token", None)
-    if not requestor_id:
-        return JSONResponse(
-            content={"error": "User ID not found in request."}, status_code=400
-        )
-
-    user_profile_helper = UserProfileHelper(request_id=request.state.request_id)
-    user_profile = user_profile_helper.get_user_by_display_id(user_display_id)
-
-    if not user_profile:
-        logger.warning(
-            f"User profile with user_display_id {user_display_id} not found."
-        )
-        return JSONResponse(
-            content={"error": "User profile not found."}, status_code=404
-        )
-
-    if not user_profile.get("public_profile", False):
-        logger.warning(
-            f"User profile with user_display_id {user_display_id} is not public."
-        )
-        return JSONResponse(
-            content={"error": "User profile not found."}, status_code=404
-        )
-
-    user_id = user_profile.get("user_id")
-    show_source = user_profile.get("show_workout_source", False)
+def build_workouts_page(
+    request_id: str,
+    user_id: str,
+    show_source: bool,
+    limit: int,
+    next_token: str,
+    detail: str,
+    fields: tuple = None,
+) -> dict:
+    """
+    Build one page of a user's merged Strava and Apple Health workouts,
+    trimmed to `fields` (Strava-format names) when given.
+    """
     encrypt_token = not show_source
 
     # Decode dual-cursor token
@@ -152,17 +179,21 @@ def get_public_workouts(
     strava_next = cursors.get("strava_next")
     ah_next = cursors.get("apple_health_next")
 
+    strava_projection, strava_names, ah_projection, ah_names = _projections_for_detail(
+        detail, fields
+    )
+
     # Split limit roughly evenly between sources
     half_limit = max(limit // 2, 1)
 
     # Fetch Strava workouts
-    strava_helper = StravaWorkoutHelper(request_id=request.state.request_id)
+    strava_helper = StravaWorkoutHelper(request_id=request_id)
     strava_result = strava_helper.get_all_workouts(
         user_id=user_id,
         limit=half_limit,
         next_token=strava_next,
-        projection_expression=STRAVA_PROJECTION,
-        expression_attribute_names=STRAVA_EXPR_NAMES,
+        projection_expression=strava_projection,
+        expression_attribute_names=strava_names,
     )
     strava_workouts = strava_result.get("workouts", [])
     strava_returned_next = strava_result.get("next_token")
@@ -171,15 +202,16 @@ def get_public_workouts(
     for w in strava_workouts:
         if "source" not in w:
             w["source"] = "strava"
+        select_polyline_variant(w.get("map"), detail)
 
     # Fetch Apple Health workouts
-    ah_helper = AppleHealthWorkoutHelper(request_id=request.state.request_id)
+    ah_helper = AppleHealthWorkoutHelper(request_id=request_id)
     ah_result = ah_helper.get_all_workouts(
         user_id=user_id,
         limit=half_limit,
         next_token=ah_next,
-        projection_expression=AH_PROJECTION,
-        expression_attribute_names=AH_EXPR_NAMES,
+        projection_expression=ah_projection,
+        expression_attribute_names=ah_names,
     )
     ah_workouts_raw = ah_result.get("workouts", [])
     ah_returned_next = ah_result.get("next_token")
@@ -187,11 +219,11 @@ def get_public_workouts(
     # Normalize Apple Health workouts to Strava format
     ah_workouts = []
     for raw in ah_workouts_raw:
-        model = AppleHealthWorkoutModel(**raw)
-        ah_workouts.append(model.to_strava_format())
+        select_polyline_variant(raw, detail)
+        ah_workouts.append(AppleHealthWorkoutSummary.from_item(raw).to_strava_format())
 
     # Merge both lists
-    all_workouts = strava_workouts + ah_workouts
+    all_workouts = [select_fields(w, fields) for w in strava_workouts + ah_workouts]
 
     # Strip source field if user doesn't want it shown
     if not show_source:
@@ -205,11 +237,94 @@ def get_public_workouts(
     }
     encoded_next_token = _encode_next_token(new_token_dict, encrypt=encrypt_token)
 
-    return JSONResponse(
-        content={
+    return {
+        "limit": limit,
+        "next_token": encoded_next_token,
+        "workouts": all_workouts,
+    }
+
+
+@router.get(
+    "/workouts/{user_display_id}",
+    summary="Get public workouts for a user by user_display_id",
+    response_description="Paginated list of public workouts from all sources",
+    tags=["Public"],
+)
+@exceptions_decorator
+def get_public_workouts(
+    user_display_id: int,
+    request: Request,
+    limit: int = Query(
+        500, ge=1, le=500, description="Number of workouts to return (max 500)"
+    ),
+    next_token: str = Query(None, description="Token for fetching the next page"),
+    detail: str = Query(
+        "full",
+        description="Polyline detail: low (country zoom), medium (city zoom) or full",
+    ),
+    fields: str = Query(
+        None,
+        description="Comma separated fields to return, e.g. id,start_date,distance",
+    ),
+):
+    requestor_id = getattr(request.state, "user_token", None)
+    if not requestor_id:
+        return JSONResponse(
+            content={"error": "User ID not found in request."}, status_code=400
+        )
+    if detail not in POLYLINE_DETAIL_LEVELS:
+        return JSONResponse(
+            content={
+                "error": f"Invalid detail '{detail}'. Use one of: {', '.join(POLYLINE_DETAIL_LEVELS)}."
+            },
+            status_code=400,
+        )
+    try:
+        selected_fields = parse_fields(fields, STRAVA_WORKOUT_FIELDS)
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+
+    user_profile_helper = UserProfileHelper(request_id=request.state.request_id)
+    user_profile = user_profile_helper.get_user_by_display_id(user_display_id)
+
+    if not user_profile:
+        logger.warning(
+            f"User profile with user_display_id {user_display_id} not found."
+        )
+        return JSONResponse(
+            content={"error": "User profile not found."}, status_code=404
+        )
+
+    if not user_profile.get("public_profile", False):
+        logger.warning(
+            f"User profile with user_display_id {user_display_id} is not public."
+        )
+        return JSONResponse(
+            content={"error": "User profile not found."}, status_code=404
+        )
+
+    user_id = user_profile.get("user_id")
+    show_source = user_profile.get("show_workout_source", False)
+
+    content = response_cache.get_or_build(
+        "/public/workouts",
+        {
             "limit": limit,
-            "next_token": encoded_next_token,
-            "workouts": all_workouts,
+            "next_token": next_token,
+            "detail": detail,
+            "show_source": show_source,
+            "fields": selected_fields,
         },
-        status_code=200,
+        lambda: build_workouts_page(
+            request.state.request_id,
+            user_id,
+            show_source,
+            limit,
+            next_token,
+            detail,
+            selected_fields,
+        ),
+        owner_id=user_id,
+        request_id=request.state.request_id,
     )
+    return JSONResponse(content=content, status_code=200)
@@ -36,9 +36,9 @@ def get_public_strava_profile(strava_id: int, request: Request):
 
     # Check if user profile is public
     user_profile_helper = UserProfileHelper(request_id=request.state.request_id)
-    user_profile = user_profile_helper.get_user_profile(requested_user_profile_id)
+    is_public = user_profile_helper.get_public_flag(requested_user_profile_id)
 
-    if not user_profile or not user_profile.get("public_profile", False):
+    if not is_public:
         logger.warning(
             f"User profile with user_id {requested_user_profile_id} is not public or does not exist."
         )
@@ -46,7 +46,7 @@ def get_public_strava_profile(strava_id: int, request: Request):
             content={"error": "User profile not found."}, status_code=404
         )
 
-    user_id = user_profile.get("user_id")
+    user_id = requested_user_profile_id
     logger.info(f"Fetching Strava profile for user_id: {user_id}")
 
     athlete = strava_profile_helper.get_strava_profile(user_id=user_id)
@@ -5,6 +5,10 @@ from decorators.exceptions_decorator import exceptions_decorator
 from dynamodb.helpers.strava_workout_helper import StravaWorkoutHelper
 from dynamodb.helpers.user_profile_helper import UserProfileHelper
 from dynamodb.helpers.strava_profile_helper import StravaProfileHelper
+from endpoints.strava.get_strava_workout_changes import (
+    STRAVA_PROJECTION,
+    STRAVA_EXPR_NAMES,
+)
 import base64
 import json
 import urllib.parse
@@ -89,16 +93,8 @@ def get_public_strava_workouts(
         user_id=user_id,
         limit=limit,
         next_token=dynamo_next_token,
-        projection_expression=(
-            "id, #n, #t, sport_type, start_date, start_date_local, "
-            "distance, total_elevation_gain, moving_time, elapsed_time, "
-            "kilojoules, #m, locations"
-        ),
-        expression_attribute_names={
-            "#n": "name",
-            "#t": "type",
-            "#m": "map",
-        },
+        projection_expression=STRAVA_PROJECTION,
+        expression_attribute_names=STRAVA_EXPR_NAMES,
     )
     workouts = result.get("workouts", [])
     returned_next_token = result.get("next_token")
@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Request, Query
+from fastapi.responses import JSONResponse
+from aws_lambda_powertools import Logger
+from decorators.exceptions_decorator import exceptions_decorator
+from dynamodb.helpers.strava_workout_helper import StravaWorkoutHelper
+from dynamodb.helpers.workout_change_log_helper import WorkoutChangeLogHelper
+from helpers.field_selection import (
+    STRAVA_LIST_FIELDS,
+    STRAVA_MAP_FIELDS,
+    compile_projection,
+)
+
+logger = Logger(service="workout-tracer-api")
+router = APIRouter()
+
+# Same fields as /workouts so synced records match a full page
+STRAVA_PROJECTION, STRAVA_EXPR_NAMES = compile_projection(
+    STRAVA_LIST_FIELDS, {"map": STRAVA_MAP_FIELDS}
+)
+
+
+@router.get(
+    "/workouts/changes",
+    summary="Get workout changes since a sequence number",
+    response_description="Strava workouts created, updated or deleted since the given sequence",
+)
+@exceptions_decorator
+def get_strava_workout_changes(
+    request: Request,
+    since: int = Query(0, ge=0, description="Last sequence number already synced"),
+    limit: int = Query(
+        500, ge=1, le=500, description="Number of change events to read (max 500)"
+    ),
+):
+    user_id = getattr(request.state, "user_token", None)
+    logger.info(
+        f"Received request for workout changes: user_id={user_id}, since={since}, limit={limit}"
+    )
+    if not user_id:
+        logger.warning("User ID not found in request state.")
+        return JSONResponse(
+            content={"error": "User ID not found in request."}, status_code=400
+        )
+
+    change_log_helper = WorkoutChangeLogHelper(request_id=request.state.request_id)
+    result = change_log_helper.get_changes(
+        user_id=user_id, since=since, limit=limit, source="strava"
+    )
+
+    workout_helper = StravaWorkoutHelper(request_id=request.state.request_id)
+    changes = WorkoutChangeLogHelper.latest_per_workout(result["changes"])
+    # One BatchGetItem per 100 changed workouts instead of a GetItem each
+    workouts = workout_helper.batch_get_strava_workouts(
+        user_id,
+        [c["workout_id"] for c in changes if c["action"] != "delete"],
+        projection_expression=STRAVA_PROJECTION,
+        expression_attribute_names=STRAVA_EXPR_NAMES,
+    )
+    upserted = []
+    deleted = []
+    for change in changes:
+        if change["action"] == "delete":
+            deleted.append(change["workout_id"])
+            continue
+        workout = workouts.get(change["workout_id"])
+        if workout:
+            upserted.append(workout)
+        else:
+            # Deleted after this event was written; the delete event follows later.
+            deleted.append(change["workout_id"])
+
+    return JSONResponse(
+        content={
+            "since": since,
+            "next_since": result["next_since"],
+            "has_more": result["has_more"],
+            "upserted": upserted,
+            "deleted": deleted,
+        },
+        status_code=200,
+    )
@@ -3,6 +3,13 @@ from fastapi.responses import JSONResponse
 from aws_lambda_powertools import Logger
 from decorators.exceptions_decorator import exceptions_decorator
 from dynamodb.helpers.strava_workout_helper import StravaWorkoutHelper
+from helpers.field_selection import (
+    STRAVA_LIST_FIELDS,
+    STRAVA_MAP_FIELDS,
+    STRAVA_WORKOUT_FIELDS,
+    compile_projection,
+    parse_fields,
+)
 import base64
 import json
 import urllib.parse
@@ -23,6 +30,10 @@ def get_strava_workouts(
         500, ge=1, le=500, description="Number of workouts to return (max 500)"
     ),
     next_token: str = Query(None, description="Token for fetching the next page"),
+    fields: str = Query(
+        None,
+        description="Comma separated fields to return, e.g. id,start_date,distance",
+    ),
 ):
     user_id = getattr(request.state, "user_token", None)
     logger.info(
@@ -33,6 +44,10 @@ def get_strava_workouts(
         return JSONResponse(
             content={"error": "User ID not found in request."}, status_code=400
         )
+    try:
+        selected_fields = parse_fields(fields, STRAVA_WORKOUT_FIELDS)
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
 
     workout_helper = StravaWorkoutHelper(request_id=request.state.request_id)
 
@@ -53,21 +68,18 @@ def get_strava_workouts(
 
     # Only fetch fields needed by the website — avoids returning heavy nested
     # objects like segment_efforts, splits_metric/standard, laps, photos, etc.
-    # "name", "type", and "map" are DynamoDB reserved words so they need aliases.
+    # The map is narrowed to its response keys so the stored polyline
+    # variants are neither read nor returned.
+    projection_expression, expression_attribute_names = compile_projection(
+        selected_fields or STRAVA_LIST_FIELDS, {"map": STRAVA_MAP_FIELDS}
+    )
+
     result = workout_helper.get_all_workouts(
         user_id=user_id,
         limit=limit,
         next_token=dynamo_next_token,
-        projection_expression=(
-            "id, #n, #t, sport_type, start_date, start_date_local, "
-            "distance, total_elevation_gain, moving_time, elapsed_time, "
-            "kilojoules, #m, locations"
-        ),
-        expression_attribute_names={
-            "#n": "name",
-            "#t": "type",
-            "#m": "map",
-        },
+        projection_expression=projection_expression,
+        expression_attribute_names=expression_attribute_names,
     )
     workouts = result.get("workouts", [])
     returned_next_token = result.get("next_token")
@@ -23,12 +23,11 @@ def get_workout_locations(user_id: str, request: Request):
         )
 
     user_profile_helper = UserProfileHelper(request_id=request.state.request_id)
-    user_profile = user_profile_helper.get_user_profile(user_id)
+    is_public = user_profile_helper.get_public_flag(user_id)
 
-    if not user_profile:
+    if is_public is None:
         return JSONResponse(content={"error": "User not found."}, status_code=404)
 
-    is_public = user_profile.get("public_profile", False)
     is_own_account = requestor_id == user_id
 
     if not is_public and not is_own_account:
@@ -5,6 +5,13 @@ from decorators.exceptions_decorator import exceptions_decorator
 from dynamodb.helpers.strava_workout_helper import StravaWorkoutHelper
 from dynamodb.helpers.user_profile_helper import UserProfileHelper
 from dynamodb.helpers.strava_profile_helper import StravaProfileHelper
+from helpers import response_cache
+from helpers.field_selection import compile_projection, parse_fields
+from helpers.polyline_resolution import (
+    POLYLINE_DETAIL_LEVELS,
+    polyline_variant_field,
+    select_polyline_variant,
+)
 import base64
 import json
 import urllib.parse
@@ -13,54 +20,31 @@ import os
 logger = Logger(service="workout-tracer-api")
 router = APIRouter()
 
-
-@router.get(
-    "/miles4manny",
-    summary="Get all Manny's workouts",
-    response_description="Paginated list of Strava workouts",
+# Fields miles4manny exposes; anything else stays private
+MILES_FOR_MANNY_FIELDS = (
+    "type",
+    "sport_type",
+    "distance",
+    "total_elevation_gain",
+    "map",
+    "moving_time",
+    "elapsed_time",
 )
-@exceptions_decorator
-def miles_for_manny(
-    request: Request,
-    limit: int = Query(
-        500, ge=1, le=500, description="Number of workouts to return (max 500)"
-    ),
-    next_token: str = Query(None, description="Token for fetching the next page"),
-):
-    stage = os.getenv("STAGE", "dev").lower()
 
-    if stage == "prod":
-        strava_id = "82708380"
-    elif stage == "staging":
-        strava_id = "106347208"
-    elif stage == "dev":
-        strava_id = "106347208"
 
-    else:
-        logger.error(f"Unknown STAGE value: {stage}")
-        return JSONResponse(
-            content={"error": "Server configuration error."}, status_code=500
-        )
-
-    strava_profile_helper = StravaProfileHelper(request_id=request.state.request_id)
-
-    requested_user_profile_id = strava_profile_helper.get_user_id_by_strava_id(
-        strava_id
-    )
-
-    if not requested_user_profile_id:
-        logger.warning(
-            f"User profile with strava_id {strava_id} not found for user_id {user_id}."
-        )
-        return JSONResponse(
-            content={"error": "User profile not found."}, status_code=404
-        )
-
-    user_profile_helper = UserProfileHelper(request_id=request.state.request_id)
-    user_profile = user_profile_helper.get_user_profile(requested_user_profile_id)
-    user_id = user_profile.get("user_id")
-
-    workout_helper = StravaWorkoutHelper(request_id=request.state.request_id)
+def _get_workouts_page(
+    request_id: str,
+    user_id: str,
+    limit: int,
+    next_token: str,
+    detail: str,
+    fields: tuple = None,
+) -> dict:
+    """
+    Build one page of the scrubbed miles4manny workout list, trimmed to
+    `fields` when given.
+    """
+    workout_helper = StravaWorkoutHelper(request_id=request_id)
     logger.info(f"Fetching workouts for user_id={user_id}")
 
     dynamo_next_token = None
@@ -80,32 +64,38 @@ def miles_for_manny(
             )
             dynamo_next_token = None
 
+    # Only read the fields returned below, and just the requested polyline variant.
+    # map is always read since workouts without a route are skipped.
+    projected_fields = tuple(
+        dict.fromkeys((fields or MILES_FOR_MANNY_FIELDS) + ("map",))
+    )
+    map_subpaths = None
+    if detail != "full":
+        map_subpaths = {"map": ["summary_polyline", polyline_variant_field(detail)]}
+    projection_expression, expression_attribute_names = compile_projection(
+        projected_fields, map_subpaths
+    )
+
     result = workout_helper.get_all_workouts(
-        user_id=user_id, limit=limit, next_token=dynamo_next_token
+        user_id=user_id,
+        limit=limit,
+        next_token=dynamo_next_token,
+        projection_expression=projection_expression,
+        expression_attribute_names=expression_attribute_names,
     )
     workouts = result.get("workouts", [])
 
-    # Only return workout type, distance info, and map data
+    # Only return workout type, distance info, and map data, built straight
+    # from the item rather than via a full scrubbed dict per workout
+    output_fields = fields or MILES_FOR_MANNY_FIELDS
     scrubbed_workouts = []
     for workout in workouts:
         # Ignore workouts without a non-empty summary_polyline
-        summary_polyline = (
-            workout.get("map", {}).get("summary_polyline")
-            if workout.get("map")
-            else None
-        )
-        if not summary_polyline:
+        workout_map = workout.get("map")
+        if not workout_map or not workout_map.get("summary_polyline"):
             continue
-        scrubbed_workout = {
-            "type": workout.get("type"),
-            "sport_type": workout.get("sport_type"),
-            "distance": workout.get("distance"),
-            "total_elevation_gain": workout.get("total_elevation_gain"),
-            "map": workout.get("map"),
-            "moving_time": workout.get("moving_time"),
-            "elapsed_time": workout.get("elapsed_time"),
-        }
-        scrubbed_workouts.append(scrubbed_workout)
+        select_polyline_variant(workout_map, detail)
+        scrubbed_workouts.append({field: workout.get(field) for field in output_fields})
 
     returned_next_token = result.get("next_token")
 
@@ -131,11 +121,96 @@ def miles_for_manny(
         new_next_token = None
         logger.info("No new token, this is the last page.")
 
-    return JSONResponse(
-        content={
+    return {
+        "limit": limit,
+        "next_token": new_next_token,
+        "workouts": scrubbed_workouts,
+    }
+
+
+@router.get(
+    "/miles4manny",
+    summary="Get all Manny's workouts",
+    response_description="Paginated list of Strava workouts",
+)
+@exceptions_decorator
+def miles_for_manny(
+    request: Request,
+    limit: int = Query(
+        500, ge=1, le=500, description="Number of workouts to return (max 500)"
+    ),
+    next_token: str = Query(None, description="Token for fetching the next page"),
+    detail: str = Query(
+        "full",
+        description="Polyline detail: low (country zoom), medium (city zoom) or full",
+    ),
+    fields: str = Query(
+        None, description="Comma separated fields to return, e.g. type,distance,map"
+    ),
+):
+    if detail not in POLYLINE_DETAIL_LEVELS:
+        return JSONResponse(
+            content={
+                "error": f"Invalid detail '{detail}'. Use one of: {', '.join(POLYLINE_DETAIL_LEVELS)}."
+            },
+            status_code=400,
+        )
+    try:
+        selected_fields = parse_fields(fields, MILES_FOR_MANNY_FIELDS)
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+
+    stage = os.getenv("STAGE", "dev").lower()
+
+    if stage == "prod":
+        strava_id = "82708380"
+    elif stage == "staging":
+        strava_id = "106347208"
+    elif stage == "dev":
+        strava_id = "106347208"
+
+    else:
+        logger.error(f"Unknown STAGE value: {stage}")
+        return JSONResponse(
+            content={"error": "Server configuration error."}, status_code=500
+        )
+
+    strava_profile_helper = StravaProfileHelper(request_id=request.state.request_id)
+
+    requested_user_profile_id = strava_profile_helper.get_user_id_by_strava_id(
+        strava_id
+    )
+
+    if not requested_user_profile_id:
+        logger.warning(
+            f"User profile with strava_id {strava_id} not found for user_id {user_id}."
+        )
+        return JSONResponse(
+            content={"error": "User profile not found."}, status_code=404
+        )
+
+    user_profile_helper = UserProfileHelper(request_id=request.state.request_id)
+    user_profile = user_profile_helper.get_user_profile(requested_user_profile_id)
+    user_id = user_profile.get("user_id")
+
+    # Every visitor sees the same pages, so serve them from the response cache
+    content = response_cache.get_or_build(
+        "/strava/miles4manny",
+        {
             "limit": limit,
-            "next_token": new_next_token,
-            "workouts": scrubbed_workouts,
+            "next_token": next_token,
+            "detail": detail,
+            "fields": selected_fields,
         },
-        status_code=200,
+        lambda: _get_workouts_page(
+            request.state.request_id,
+            user_id,
+            limit,
+            next_token,
+            detail,
+            selected_fields,
+        ),
+        owner_id=user_id,
+        request_id=request.state.request_id,
     )
+    return JSONResponse(content=content, status_code=200)
@@ -2,18 +2,32 @@ from fastapi import APIRouter, Request, Query
 from fastapi.responses import JSONResponse
 from aws_lambda_powertools import Logger
 from decorators.exceptions_decorator import exceptions_decorator
-from dynamodb.helpers.strava_workout_helper import StravaWorkoutHelper
 from dynamodb.helpers.user_profile_helper import UserProfileHelper
 from dynamodb.helpers.strava_profile_helper import StravaProfileHelper
-import base64
-import json
-import urllib.parse
+from dynamodb.helpers.workout_stats_helper import WorkoutStatsHelper
+from helpers import response_cache
 import os
 
 logger = Logger(service="workout-tracer-api")
 router = APIRouter()
 
 
+def build_stats(request_id: str, user_id: str) -> dict:
+    """
+    Build the miles4manny stats payload from the strava rollups. Read only:
+    rollups of workouts stored before they existed are seeded by the
+    rebuild_workout_stats Lambda.
+    """
+    logger.info(f"Fetching stats rollups for user_id={user_id}")
+    stats_helper = WorkoutStatsHelper(request_id=request_id)
+    stats_list = stats_helper.get_stats(user_id, "strava")
+
+    return {
+        "stats": stats_list,
+        "total_workouts": sum(stats["count"] for stats in stats_list),
+    }
+
+
 @router.get(
     "/miles4manny/stats",
     summary="Get all Manny's workouts",
@@ -56,75 +70,11 @@ def miles_for_manny_stats(
     user_profile = user_profile_helper.get_user_profile(requested_user_profile_id)
     user_id = user_profile.get("user_id")
 
-    workout_helper = StravaWorkoutHelper(request_id=request.state.request_id)
-    logger.info(f"Fetching workouts for user_id={user_id}")
-
-    limit = 1000
-    dynamo_next_token = None
-    all_workouts = []
-    while True:
-        result = workout_helper.get_all_workouts(
-            user_id=user_id, limit=limit, next_token=dynamo_next_token
-        )
-        workouts = result.get("workouts", [])
-        # Only return workout type, distance info, and map data
-        for workout in workouts:
-            scrubbed_workout = {
-                "type": workout.get("type"),
-                "sport_type": workout.get("sport_type"),
-                "distance": workout.get("distance"),
-                "total_elevation_gain": workout.get("total_elevation_gain"),
-                "moving_time": workout.get("moving_time"),
-                "elapsed_time": workout.get("elapsed_time"),
-            }
-            all_workouts.append(scrubbed_workout)
-        returned_next_token = result.get("next_token")
-        logger.info(f"Returned next_token from DynamoDB: {returned_next_token}")
-        if returned_next_token:
-            if isinstance(returned_next_token, dict):
-                new_next_token = base64.urlsafe_b64encode(
-                    json.dumps(returned_next_token).encode()
-                ).decode()
-                dynamo_next_token = returned_next_token
-            else:
-                logger.warning(
-                    f"Returned next_token is not a dict: {returned_next_token}"
-                )
-                new_next_token = None
-                break
-        else:
-            new_next_token = None
-            logger.info("No new token, this is the last page.")
-            break
-
-    # Aggregate stats by unique type
-    stats_by_type = {}
-    for workout in all_workouts:
-        wtype = workout.get("type") or "unknown"
-        if wtype not in stats_by_type:
-            stats_by_type[wtype] = {
-                "type": wtype,
-                "total_distance": 0.0,
-                "total_elevation_gain": 0.0,
-                "total_moving_time": 0,
-                "total_elapsed_time": 0,
-                "count": 0,
-            }
-        stats_by_type[wtype]["total_distance"] += workout.get("distance") or 0.0
-        stats_by_type[wtype]["total_elevation_gain"] += (
-            workout.get("total_elevation_gain") or 0.0
-        )
-        stats_by_type[wtype]["total_moving_time"] += workout.get("moving_time") or 0
-        stats_by_type[wtype]["total_elapsed_time"] += workout.get("elapsed_time") or 0
-        stats_by_type[wtype]["count"] += 1
-
-    # Convert to list for response
-    stats_list = list(stats_by_type.values())
-
-    return JSONResponse(
-        content={
-            "stats": stats_list,
-            "total_workouts": len(all_workouts),
-        },
-        status_code=200,
+    content = response_cache.get_or_build(
+        "/strava/miles4manny/stats",
+        {},
+        lambda: build_stats(request.state.request_id, user_id),
+        owner_id=user_id,
+        request_id=request.state.request_id,
     )
+    return JSONResponse(content=content, status_code=200)
@@ -12,16 +12,14 @@ from clients.strava_client import StravaClient
 from dynamodb.helpers.strava_profile_helper import StravaProfileHelper
 from dynamodb.helpers.strava_workout_helper import StravaWorkoutHelper
 from dynamodb.helpers.strava_credentials_helper import StravaCredentialsHelper
-from aws_lambda_powertools.metrics import Metrics, MetricUnit
+from dynamodb.helpers.public_bundle_helper import PublicBundleHelper
+from helpers import response_cache
+from helpers.log_payload import log_payload
+from helpers.metrics_emitter import emit_metric
 
 logger = Logger(service="workout-tracer-api")
 router = APIRouter()
 
-stage = os.environ.get("STAGE", "dev")
-metrics = Metrics(
-    namespace=f"WorkoutTracer-{stage.upper()}", service="workout-tracer-api"
-)
-
 
 class StravaWebhookEvent(BaseModel):
     aspect_type: str
@@ -43,9 +41,13 @@ def strava_webhook_event(payload: StravaWebhookEvent, request: Request):
     strava_client = StravaClient(request_id=request.state.request_id)
 
     logger.info(
-        f"Strava webhook verification request: method={request.method}, url={request.url}, headers={dict(request.headers)}, query_params={dict(request.query_params)}"
+        "Strava webhook verification request: method=%s, path=%s, headers=%s, query_params=%s",
+        request.method,
+        request.url.path,
+        log_payload(request.headers),
+        log_payload(request.query_params),
     )
-    logger.info(f"Received Strava webhook event: {payload.dict()}")
+    logger.info("Received Strava webhook event: %s", log_payload(payload))
 
     strava_id = payload.owner_id
     logger.info(f"Strava ID from payload: {strava_id}")
@@ -80,16 +82,12 @@ def strava_webhook_event(payload: StravaWebhookEvent, request: Request):
                 logger.info(
                     f"Deleted Strava workout {workout_id} for user_id {user_id}"
                 )
-                metrics.add_dimension(name="EventType", value="delete")
-                metrics.add_metric(
-                    name="WebhookEventCount", unit=MetricUnit.Count, value=1
+                response_cache.invalidate(user_id)
+                PublicBundleHelper(request_id=request.state.request_id).request_refresh(
+                    user_id, ["stats", "locations"]
                 )
-                metrics.flush_metrics()
-                metrics.add_dimension(name="SourceType", value="Strava")
-                metrics.add_metric(
-                    name="WorkoutDeleted", unit=MetricUnit.Count, value=1
-                )
-                metrics.flush_metrics()
+                emit_metric("WebhookEventCount", {"EventType": "delete"})
+                emit_metric("WorkoutDeleted", {"SourceType": "Strava"})
                 return JSONResponse(
                     content={
                         "message": f"Workout {workout_id} deleted for user {user_id}."
@@ -167,23 +165,16 @@ def strava_webhook_event(payload: StravaWebhookEvent, request: Request):
                 logger.info(
                     f"{action.capitalize()}d Strava workout {workout_id} for user_id {user_id}"
                 )
-                metrics.add_dimension(name="EventType", value=payload.aspect_type)
-                metrics.add_metric(
-                    name="WebhookEventCount", unit=MetricUnit.Count, value=1
+                response_cache.invalidate(user_id)
+                # Locations are refreshed once the enrichment lambda tags the workout
+                PublicBundleHelper(request_id=request.state.request_id).request_refresh(
+                    user_id, ["stats"]
                 )
-                metrics.flush_metrics()
+                emit_metric("WebhookEventCount", {"EventType": payload.aspect_type})
                 if action == "create":
-                    metrics.add_dimension(name="SourceType", value="Strava")
-                    metrics.add_metric(
-                        name="WorkoutCreated", unit=MetricUnit.Count, value=1
-                    )
-                    metrics.flush_metrics()
+                    emit_metric("WorkoutCreated", {"SourceType": "Strava"})
                 elif action == "update":
-                    metrics.add_dimension(name="SourceType", value="Strava")
-                    metrics.add_metric(
-                        name="WorkoutUpdated", unit=MetricUnit.Count, value=1
-                    )
-                    metrics.flush_metrics()
+                    emit_metric("WorkoutUpdated", {"SourceType": "Strava"})
             except Exception as e:
                 logger.error(
                     f"Failed to {payload.aspect_type} workout {workout_id} for user {user_id}: {e}"
@@ -222,7 +213,11 @@ def strava_webhook_event(payload: StravaWebhookEvent, request: Request):
                 "workout": StravaWorkoutHelper.serialize_model(workout),
                 "action": action,
             }
-            logger.info(f"Returning response for workout {workout_id}: {response_data}")
+            logger.info(
+                "Returning response for workout %s: %s",
+                workout_id,
+                log_payload(response_data),
+            )
             return JSONResponse(
                 content=response_data,
                 status_code=200,
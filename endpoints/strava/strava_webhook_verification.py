@@ -9,6 +9,7 @@ import json
 from datetime import datetime
 import pytz
 from clients.strava_client import StravaClient
+from helpers.log_payload import log_payload
 from dynamodb.helpers.strava_profile_helper import StravaProfileHelper
 
 logger = Logger(service="workout-tracer-api")
@@ -23,7 +24,11 @@ router = APIRouter()
 def strava_webhook_verification(request: Request):
     # Print useful request info for debugging
     logger.info(
-        f"Strava webhook verification request: method={request.method}, url={request.url}, headers={dict(request.headers)}, query_params={dict(request.query_params)}"
+        "Strava webhook verification request: method=%s, path=%s, headers=%s, query_params=%s",
+        request.method,
+        request.url.path,
+        log_payload(request.headers),
+        log_payload(request.query_params),
     )
 
     strava_client = StravaClient(request_id=request.state.request_id)
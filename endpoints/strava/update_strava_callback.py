@@ -8,6 +8,8 @@ from clients.strava_client import StravaClient, StravaAuthCodeExchangeError
 from dynamodb.models.strava_profile_model import StravaAthleteModel
 from dynamodb.models.strava_credentials_model import StravaCredentialsModel
 from dynamodb.helpers.strava_workout_helper import StravaWorkoutHelper
+from dynamodb.helpers.public_bundle_helper import PublicBundleHelper
+from helpers.log_payload import log_payload
 
 from pydantic import BaseModel, Field
 import requests
@@ -18,7 +20,6 @@ import boto3
 import pytz
 import json
 
-
 logger = Logger(service="workout-tracer-api")
 router = APIRouter()
 
@@ -31,6 +32,7 @@ def handle_existing_profile(strava_profile_helper, athlete_data, user_id, logger
     logger.info(f"Updating Strava profile for user_id: {user_id}")
     strava_profile_helper.update_strava_profile(**athlete_data)
     logger.info(f"Successfully updated Strava profile for user_id: {user_id}")
+    PublicBundleHelper().safe_refresh(user_id, ["strava"])
     return JSONResponse(
         content={
             "message": f"Strava tokens and profile updated successfully",
@@ -53,6 +55,7 @@ def handle_new_profile(
     logger.info(f"Creating new Strava profile for user_id: {user_id}")
     strava_profile_helper.create_strava_profile(**athlete_data)
     logger.info(f"Successfully created Strava profile for user_id: {user_id}")
+    PublicBundleHelper().safe_refresh(user_id, ["strava"])
 
     onboarding_lambda_name = os.getenv("STRAVA_ONBOARDING_LAMBDA_ARN")
     lambda_client = boto3.client("lambda")
@@ -148,20 +151,24 @@ def update_strava_callback(
 
     if not athlete_data or "id" not in athlete_data:
         logger.warning(
-            f"Strava athlete data missing or incomplete in response. Response: {athlete_data}"
+            "Strava athlete data missing or incomplete in response. Response: %s",
+            log_payload(athlete_data),
         )
         return JSONResponse(
             content={"error": "Strava athlete data missing or incomplete."},
             status_code=400,
         )
 
-    logger.info(f"Strava tokens and athlete data received: {athlete_data}")
+    logger.info(
+        "Strava tokens and athlete data received: %s", log_payload(athlete_data)
+    )
 
     athlete_data["strava_id"] = athlete_data.pop("id")
     athlete_data["user_id"] = user_id
 
     logger.info(
-        f"Mapped athlete_data['id'] to 'strava_id' and set 'user_id': {athlete_data}"
+        "Mapped athlete_data['id'] to 'strava_id' and set 'user_id': %s",
+        log_payload(athlete_data),
     )
 
     try:
@@ -10,20 +10,14 @@ from dynamodb.models.strava_credentials_model import StravaCredentialsModel
 from pydantic import BaseModel, Field
 import requests
 from datetime import datetime, timedelta
-import os
 import decimal
 from dynamodb.helpers.strava_workout_helper import StravaWorkoutHelper
-from aws_lambda_powertools.metrics import Metrics, MetricUnit
+from helpers.metrics_emitter import emit_metric
 import pytz
 
 logger = Logger(service="workout-tracer-api")
 router = APIRouter()
 
-stage = os.environ.get("STAGE", "dev")
-metrics = Metrics(
-    namespace=f"WorkoutTracer-{stage.upper()}", service="workout-tracer-api"
-)
-
 
 @router.post(
     "/strava/update_workout/{activity_id}",
@@ -78,18 +72,10 @@ def update_workout(activity_id: int, request: Request = None):
             )
             if action == "create":
                 create_count += 1
-                metrics.add_dimension(name="SourceType", value="Strava")
-                metrics.add_metric(
-                    name="WorkoutCreated", unit=MetricUnit.Count, value=1
-                )
-                metrics.flush_metrics()
+                emit_metric("WorkoutCreated", {"SourceType": "Strava"})
             elif action == "update":
                 update_count += 1
-                metrics.add_dimension(name="SourceType", value="Strava")
-                metrics.add_metric(
-                    name="WorkoutUpdated", unit=MetricUnit.Count, value=1
-                )
-                metrics.flush_metrics()
+                emit_metric("WorkoutUpdated", {"SourceType": "Strava"})
         except Exception as e:
             error_count += 1
             logger.error(f"Failed to store activity for user_id {user_id}: {e}")
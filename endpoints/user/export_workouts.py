@@ -0,0 +1,156 @@
+from fastapi import APIRouter, Request, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from aws_lambda_powertools import Logger
+from exceptions.user_exceptions import InvalidUserIdException
+from decorators.exceptions_decorator import exceptions_decorator
+from dynamodb.helpers.strava_workout_helper import StravaWorkoutHelper
+from dynamodb.helpers.apple_health_workout_helper import AppleHealthWorkoutHelper
+from dynamodb.models.apple_health_workout_model import AppleHealthWorkoutModel
+from dynamodb.models.strava_workout_model import StravaWorkoutModel
+from helpers.field_selection import compile_projection, parse_fields
+from helpers.polyline_resolution import (
+    POLYLINE_TOLERANCES,
+    polyline_variant_field,
+    select_polyline_variant,
+)
+import itertools
+import json
+import zlib
+
+logger = Logger(service="workout-tracer-api")
+router = APIRouter()
+
+EXPORT_SOURCES = ("strava", "apple_health")
+# Flush to the client once this many bytes of NDJSON have accumulated
+EXPORT_CHUNK_BYTES = 64 * 1024
+# Simplified polylines are an internal read optimization, not workout data
+INTERNAL_FIELDS = {polyline_variant_field(level) for level in POLYLINE_TOLERANCES}
+# Attributes fields= may name: any stored workout attribute of either source
+EXPORT_FIELDS = tuple(
+    field
+    for field in dict.fromkeys(
+        (*StravaWorkoutModel.model_fields, *AppleHealthWorkoutModel.model_fields)
+    )
+    if field not in INTERNAL_FIELDS
+)
+
+
+def _iter_ndjson(helpers: dict, user_id: str, fields: tuple | None):
+    """
+    Yield one NDJSON line per workout, paging DynamoDB lazily. A failed page
+    raises instead of silently ending the export.
+    """
+    projection_expression, expression_attribute_names = (
+        compile_projection(fields) if fields else (None, None)
+    )
+    exported = 0
+    for source, helper in helpers.items():
+        for workout in helper.iter_all_workouts(
+            user_id,
+            projection_expression=projection_expression,
+            expression_attribute_names=expression_attribute_names,
+        ):
+            workout.pop("PK", None)
+            workout.pop("SK", None)
+            # Apple Health keeps the variants top level, Strava inside map
+            select_polyline_variant(workout, "full")
+            select_polyline_variant(workout.get("map"), "full")
+            workout["source"] = source
+            exported += 1
+            yield json.dumps(workout, separators=(",", ":")).encode() + b"\n"
+    logger.info(f"Exported {exported} workouts for user_id={user_id}")
+
+
+def _iter_chunks(lines, compress: bool):
+    """Group lines into ~EXPORT_CHUNK_BYTES chunks, gzip-compressing if asked."""
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = []
+    size = 0
+    try:
+        for line in lines:
+            buffer.append(line)
+            size += len(line)
+            if size >= EXPORT_CHUNK_BYTES:
+                chunk = b"".join(buffer)
+                buffer, size = [], 0
+                chunk = compressor.compress(chunk) if compressor else chunk
+                if chunk:
+                    yield chunk
+        chunk = b"".join(buffer)
+        if compressor:
+            chunk = compressor.compress(chunk) + compressor.flush()
+        if chunk:
+            yield chunk
+    except Exception as e:
+        # Headers are already sent, so the client sees a truncated stream
+        logger.error(f"Workout export failed mid-stream: {e}")
+        raise
+
+
+@router.get(
+    "/workouts/export",
+    summary="Export the user's full workout history as NDJSON",
+    response_description="One JSON workout per line, streamed",
+)
+@exceptions_decorator
+def export_workouts(
+    request: Request,
+    fields: str = Query(
+        None, description="Comma separated workout fields to include (default: all)"
+    ),
+    source: str = Query(
+        None, description="Only export one source: strava or apple_health"
+    ),
+    gzip: bool = Query(False, description="Gzip-compress the stream"),
+):
+    """
+    Workout Export Endpoint
+    Returns:
+        A streamed NDJSON response; memory use does not grow with history size.
+    """
+    logger.append_keys(request_id=request.state.request_id)
+
+    token_user_id = getattr(request.state, "user_token", None)
+    if not token_user_id:
+        logger.warning("Token User ID could not be extracted from JWT.")
+        raise InvalidUserIdException("Token User ID is required.")
+
+    if source and source not in EXPORT_SOURCES:
+        return JSONResponse(
+            content={
+                "error": f"Invalid source '{source}'. Use one of: {', '.join(EXPORT_SOURCES)}."
+            },
+            status_code=400,
+        )
+
+    try:
+        field_list = parse_fields(fields, EXPORT_FIELDS)
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+
+    helpers = {}
+    if source in (None, "strava"):
+        helpers["strava"] = StravaWorkoutHelper(request_id=request.state.request_id)
+    if source in (None, "apple_health"):
+        helpers["apple_health"] = AppleHealthWorkoutHelper(
+            request_id=request.state.request_id
+        )
+
+    logger.info(
+        f"Starting workout export for user_id={token_user_id}, source={source}, fields={field_list}, gzip={gzip}"
+    )
+    headers = {"Content-Disposition": 'attachment; filename="workouts.ndjson"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    chunks = _iter_chunks(
+        _iter_ndjson(helpers, token_user_id, field_list), compress=gzip
+    )
+    # Produce the first chunk before the headers go out, so a failure on the
+    # first pages is a proper error response rather than an empty 200
+    first_chunk = next(chunks, b"")
+    return StreamingResponse(
+        itertools.chain([first_chunk], chunks),
+        media_type="application/x-ndjson",
+        headers=headers,
+    )
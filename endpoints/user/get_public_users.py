@@ -10,34 +10,16 @@ from decorators.exceptions_decorator import exceptions_decorator
 from helpers.jwt import decode_jwt
 from dynamodb.helpers.user_profile_helper import UserProfileHelper
 from dynamodb.helpers.strava_profile_helper import StravaProfileHelper
+from helpers import response_cache
 
 logger = Logger(service="workout-tracer-api")
 router = APIRouter()
 
 
-@router.get(
-    "/public_users",
-    summary="Get all public users",
-    response_description="List of public users",
-)
-@exceptions_decorator
-def get_public_users(request: Request):
-    """
-    Get User Profile Endpoint
-    Returns:
-        A JSON response containing the user's profile information.
-    """
-    logger.append_keys(request_id=request.state.request_id)
-    logger.info("Getting request for user profile.")
-
-    token_user_id = getattr(request.state, "user_token", None)
-
-    if not token_user_id:
-        logger.warning("Token User ID could not be extracted from JWT.")
-        raise InvalidUserIdException("Token User ID is required.")
-
-    user_helper = UserProfileHelper(request_id=request.state.request_id)
-    strava_profile_helper = StravaProfileHelper(request_id=request.state.request_id)
+def _get_public_users(request_id: str) -> dict:
+    """Build the public user list with each user's Strava profile summary."""
+    user_helper = UserProfileHelper(request_id=request_id)
+    strava_profile_helper = StravaProfileHelper(request_id=request_id)
     public_users = user_helper.get_public_profiles()
 
     profile_return = []
@@ -72,4 +54,34 @@ def get_public_users(request: Request):
 
         profile_return.append(public_user)
 
-    return JSONResponse(content={"public_users": profile_return}, status_code=200)
+    return {"public_users": profile_return}
+
+
+@router.get(
+    "/public_users",
+    summary="Get all public users",
+    response_description="List of public users",
+)
+@exceptions_decorator
+def get_public_users(request: Request):
+    """
+    Get User Profile Endpoint
+    Returns:
+        A JSON response containing the user's profile information.
+    """
+    logger.append_keys(request_id=request.state.request_id)
+    logger.info("Getting request for user profile.")
+
+    token_user_id = getattr(request.state, "user_token", None)
+
+    if not token_user_id:
+        logger.warning("Token User ID could not be extracted from JWT.")
+        raise InvalidUserIdException("Token User ID is required.")
+
+    content = response_cache.get_or_build(
+        "/user/public_users",
+        {},
+        lambda: _get_public_users(request.state.request_id),
+        request_id=request.state.request_id,
+    )
+    return JSONResponse(content=content, status_code=200)
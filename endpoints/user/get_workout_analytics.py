@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Request, Query
+from fastapi.responses import JSONResponse
+from aws_lambda_powertools import Logger
+from exceptions.user_exceptions import InvalidUserIdException
+from decorators.exceptions_decorator import exceptions_decorator
+
+logger = Logger(service="workout-tracer-api")
+router = APIRouter()
+
+
+@router.get(
+    "/stats/analytics",
+    summary="Group the user's workouts and aggregate them",
+    response_description="Count, totals and optional percentiles per group",
+)
+@exceptions_decorator
+def get_workout_analytics(
+    request: Request,
+    group_by: str = Query("sport", description="Group by: sport, week, month or year"),
+    sport: str = Query(None, description="Only include workouts of this type"),
+    percentiles: str = Query(
+        None, description="Comma separated percentiles to compute, e.g. 50,90"
+    ),
+):
+    """
+    Workout Analytics Endpoint
+    Returns:
+        A JSON response with one entry per group.
+    """
+    from helpers.workout_analytics import (
+        GROUP_BY_KEYS,
+        load_workout_columns,
+        group_by as group_workouts,
+    )
+
+    logger.append_keys(request_id=request.state.request_id)
+
+    token_user_id = getattr(request.state, "user_token", None)
+    if not token_user_id:
+        logger.warning("Token User ID could not be extracted from JWT.")
+        raise InvalidUserIdException("Token User ID is required.")
+
+    if group_by not in GROUP_BY_KEYS:
+        return JSONResponse(
+            content={
+                "error": f"Invalid group_by '{group_by}'. Use one of: {', '.join(GROUP_BY_KEYS)}."
+            },
+            status_code=400,
+        )
+
+    percentile_values = None
+    if percentiles:
+        try:
+            percentile_values = [float(q) for q in percentiles.split(",")]
+        except ValueError:
+            percentile_values = None
+        if not percentile_values or not all(0 <= q <= 100 for q in percentile_values):
+            return JSONResponse(
+                content={"error": "percentiles must be numbers between 0 and 100."},
+                status_code=400,
+            )
+
+    columns = load_workout_columns(token_user_id, request_id=request.state.request_id)
+    groups = group_workouts(
+        columns, group_by, sport=sport, percentiles=percentile_values
+    )
+
+    return JSONResponse(
+        content={"group_by": group_by, "sport": sport, "groups": groups},
+        status_code=200,
+    )
@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Request, Query
+from fastapi.responses import JSONResponse
+from aws_lambda_powertools import Logger
+from exceptions.user_exceptions import InvalidUserIdException
+from decorators.exceptions_decorator import exceptions_decorator
+from datetime import date
+
+logger = Logger(service="workout-tracer-api")
+router = APIRouter()
+
+
+def _range_too_long(max_days: int) -> JSONResponse:
+    return JSONResponse(
+        content={
+            "error": f"start to end may span at most {max_days} days; "
+            "request a shorter range."
+        },
+        status_code=400,
+    )
+
+
+@router.get(
+    "/stats/rolling",
+    summary="Get a rolling-window daily series of one workout metric",
+    response_description="One value per day: the sum over the trailing window",
+)
+@exceptions_decorator
+def get_workout_rolling_stats(
+    request: Request,
+    field: str = Query(
+        "distance", description="Metric: distance, moving_time or elevation"
+    ),
+    window_days: int = Query(7, ge=1, le=365, description="Window size in days"),
+    start: str = Query(None, description="First day (YYYY-MM-DD)"),
+    end: str = Query(None, description="Last day (YYYY-MM-DD)"),
+    sport: str = Query(None, description="Only include workouts of this type"),
+):
+    """
+    Rolling Workout Stats Endpoint
+    Returns:
+        A JSON response with the daily rolling series.
+    """
+    from helpers.workout_analytics import (
+        MAX_ROLLING_DAYS,
+        NUMERIC_FIELDS,
+        load_workout_columns,
+        rolling_daily,
+    )
+
+    logger.append_keys(request_id=request.state.request_id)
+
+    token_user_id = getattr(request.state, "user_token", None)
+    if not token_user_id:
+        logger.warning("Token User ID could not be extracted from JWT.")
+        raise InvalidUserIdException("Token User ID is required.")
+
+    if field not in NUMERIC_FIELDS:
+        return JSONResponse(
+            content={
+                "error": f"Invalid field '{field}'. Use one of: {', '.join(NUMERIC_FIELDS)}."
+            },
+            status_code=400,
+        )
+    try:
+        start_day = date.fromisoformat(start) if start else None
+        end_day = date.fromisoformat(end) if end else None
+    except ValueError:
+        return JSONResponse(
+            content={"error": "start and end must be dates in YYYY-MM-DD format."},
+            status_code=400,
+        )
+    # Reject before loading any workouts; rolling_daily re-checks the span
+    if start_day and end_day and (end_day - start_day).days >= MAX_ROLLING_DAYS:
+        return _range_too_long(MAX_ROLLING_DAYS)
+
+    columns = load_workout_columns(token_user_id, request_id=request.state.request_id)
+    try:
+        series = rolling_daily(
+            columns, field, window_days, start=start, end=end, sport=sport
+        )
+    except ValueError:
+        return _range_too_long(MAX_ROLLING_DAYS)
+
+    return JSONResponse(
+        content={
+            "field": field,
+            "window_days": window_days,
+            "sport": sport,
+            "series": series,
+        },
+        status_code=200,
+    )
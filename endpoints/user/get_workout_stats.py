@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Request, Query
+from fastapi.responses import JSONResponse
+from aws_lambda_powertools import Logger
+from exceptions.user_exceptions import InvalidUserIdException
+from decorators.exceptions_decorator import exceptions_decorator
+from dynamodb.helpers.workout_stats_helper import (
+    WorkoutStatsHelper,
+    STATS_PERIODS,
+    STATS_SOURCE_FIELDS,
+)
+
+logger = Logger(service="workout-tracer-api")
+router = APIRouter()
+
+
+@router.get(
+    "/stats",
+    summary="Get the user's workout stats rollups for a range of time buckets",
+    response_description="Per-bucket totals broken down by source and workout type",
+)
+@exceptions_decorator
+def get_workout_stats(
+    request: Request,
+    period: str = Query("week", description="Bucket size: day, week or month"),
+    start: str = Query(
+        None,
+        description="First bucket label, e.g. 2026-10-12 (day), 2026-41 (ISO week), 2026-10 (month)",
+    ),
+    end: str = Query(None, description="Last bucket label, same format as start"),
+    source: str = Query(
+        None, description="Only include one source: strava or apple_health"
+    ),
+):
+    """
+    Workout Stats Endpoint
+    Returns:
+        A JSON response with one entry per bucket in the requested range.
+    """
+    logger.append_keys(request_id=request.state.request_id)
+
+    token_user_id = getattr(request.state, "user_token", None)
+    if not token_user_id:
+        logger.warning("Token User ID could not be extracted from JWT.")
+        raise InvalidUserIdException("Token User ID is required.")
+
+    if period not in STATS_PERIODS:
+        return JSONResponse(
+            content={
+                "error": f"Invalid period '{period}'. Use one of: {', '.join(STATS_PERIODS)}."
+            },
+            status_code=400,
+        )
+    if source and source not in STATS_SOURCE_FIELDS:
+        return JSONResponse(
+            content={
+                "error": f"Invalid source '{source}'. Use one of: {', '.join(STATS_SOURCE_FIELDS)}."
+            },
+            status_code=400,
+        )
+
+    logger.info(
+        f"Fetching {period} stats for user_id={token_user_id}, start={start}, end={end}, source={source}"
+    )
+    stats_helper = WorkoutStatsHelper(request_id=request.state.request_id)
+    buckets = stats_helper.get_stats_range(
+        token_user_id, period, start=start, end=end, source=source
+    )
+
+    return JSONResponse(
+        content={"period": period, "start": start, "end": end, "buckets": buckets},
+        status_code=200,
+    )
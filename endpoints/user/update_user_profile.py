@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
+from helpers.log_payload import log_payload
 from aws_lambda_powertools import Logger
 from exceptions.user_exceptions import (
     InvalidUserIdException,
@@ -14,6 +15,9 @@ from decorators.exceptions_decorator import exceptions_decorator
 from helpers.jwt import decode_jwt, update_cognito_user_attributes
 import os
 from dynamodb.helpers.user_profile_helper import UserProfileHelper
+from dynamodb.helpers.public_bundle_helper import PublicBundleHelper, BUNDLE_SECTIONS
+from dynamodb.helpers.public_snapshot_helper import PublicSnapshotHelper
+from helpers import response_cache
 
 logger = Logger(service="workout-tracer-api")
 router = APIRouter()
@@ -40,7 +44,7 @@ def update_user_profile(request: Request, user_profile: UpdateUserProfileRequest
     Update the user's profile information.
     """
     logger.append_keys(request_id=request.state.request_id)
-    logger.info(f"Request body: {user_profile.dict()}")
+    logger.info("Request body: %s", log_payload(user_profile))
     user_id = getattr(request.state, "user_token", None)
     logger.info(f"user_id from request.state.user_token: {user_id}")
     if not user_id:
@@ -66,7 +70,29 @@ def update_user_profile(request: Request, user_profile: UpdateUserProfileRequest
                 profile_dict = dict(updated_profile.__dict__)
             # Use jsonable_encoder to handle datetime serialization
             profile_dict = jsonable_encoder(profile_dict)
-            logger.info(f"DynamoDB update result for user_id {user_id}: {profile_dict}")
+            logger.info(
+                "DynamoDB update result for user_id %s: %s",
+                user_id,
+                log_payload(profile_dict),
+            )
+            # Public flag and source visibility change both the user's public
+            # responses and the global public user list
+            response_cache.invalidate(user_id)
+            response_cache.invalidate()
+            # Workout writes skip private users' bundles, so going public
+            # rebuilds every section
+            PublicBundleHelper(request_id=request.state.request_id).safe_refresh(
+                user_id, BUNDLE_SECTIONS if user_profile.public_profile else ["profile"]
+            )
+            # Static snapshots must follow right away, and come down entirely
+            # when the profile goes private
+            if (
+                user_profile.public_profile is not None
+                or user_profile.show_workout_source is not None
+            ):
+                PublicSnapshotHelper(
+                    request_id=request.state.request_id
+                ).request_publish(user_id, force=True)
         else:
             logger.warning(f"User with ID {user_id} not found in DynamoDB.")
             raise UserNotFound(f"User with ID {user_id} not found.")
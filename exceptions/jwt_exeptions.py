@@ -26,3 +26,9 @@ class JWTSignatureException(JWTException):
     """Raised when the JWT signature is invalid."""
 
     pass
+
+
+class UnknownSigningKeyException(InvalidJWTException):
+    """Raised when the JWT's kid is not among the user pool's signing keys."""
+
+    pass
@@ -0,0 +1,171 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+import os
+import time
+from aws_lambda_powertools import Logger
+from constants.general import SERVICE_NAME
+from helpers.lazy_import import lazy_import
+from helpers.metrics_emitter import emit_metric
+
+logger = Logger(service=SERVICE_NAME)
+
+boto3 = lazy_import("boto3")
+
+# Kill switch: set CONSUMED_CAPACITY_ENABLED=false to stop requesting capacity
+CONSUMED_CAPACITY_ENABLED = (
+    os.getenv("CONSUMED_CAPACITY_ENABLED", "true").lower() == "true"
+)
+# A single DynamoDB call at or above either threshold gets its own log entry
+EXPENSIVE_OPERATION_UNITS = float(os.getenv("EXPENSIVE_OPERATION_UNITS", "25"))
+SLOW_OPERATION_MS = float(os.getenv("SLOW_OPERATION_MS", "500"))
+
+READ_OPERATIONS = {"GetItem", "BatchGetItem", "Query", "Scan", "TransactGetItems"}
+
+# Key under which the hooks keep a call's start time
+_CONTEXT_STARTED = "consumed_capacity_started"
+
+_ACTIVE_USAGE: ContextVar["CapacityUsage | None"] = ContextVar(
+    "active_capacity_usage", default=None
+)
+
+
+class CapacityUsage:
+    """
+    DynamoDB read and write units consumed by one API request or Lambda
+    invocation. While a usage is active, every DynamoDB call that supports it
+    is sent with ReturnConsumedCapacity=TOTAL and its units are added here;
+    finish() emits the totals as metrics for the endpoint or Lambda.
+    """
+
+    def __init__(self, dimension: str = "Endpoint"):
+        # Metric dimension the totals are reported under: Endpoint or Lambda
+        self.dimension = dimension
+        self.read_units = 0.0
+        self.write_units = 0.0
+        self.operations = 0
+        self.tables = {}
+        self._token = None
+
+    def start(self):
+        self._token = _ACTIVE_USAGE.set(self)
+
+    def record(self, table: str, operation: str, units: float):
+        if operation in READ_OPERATIONS:
+            self.read_units += units
+        else:
+            self.write_units += units
+        self.operations += 1
+        self.tables[table] = self.tables.get(table, 0.0) + units
+
+    def finish(self, scope: str | None):
+        """
+        Emit ConsumedReadCapacity and ConsumedWriteCapacity for `scope` (the
+        route template or Lambda name) and log the per-table split. Never
+        raises.
+        """
+        _ACTIVE_USAGE.reset(self._token)
+        if not self.operations:
+            return
+        try:
+            dimensions = {self.dimension: scope or "unmatched"}
+            emit_metric("ConsumedReadCapacity", dimensions, value=self.read_units)
+            emit_metric("ConsumedWriteCapacity", dimensions, value=self.write_units)
+            logger.info(
+                f"DynamoDB capacity for {scope}: {self.read_units:.1f} RCU, "
+                f"{self.write_units:.1f} WCU over {self.operations} calls",
+                extra={
+                    "capacity_scope": scope,
+                    "read_capacity_units": round(self.read_units, 2),
+                    "write_capacity_units": round(self.write_units, 2),
+                    "capacity_by_table": {
+                        table: round(units, 2) for table, units in self.tables.items()
+                    },
+                },
+            )
+        except Exception as e:
+            logger.warning(f"Failed to report consumed capacity: {e}")
+
+
+@contextmanager
+def capacity_scope(name: str, dimension: str = "Lambda"):
+    """Attribute the DynamoDB capacity consumed inside the block to `name`."""
+    usage = CapacityUsage(dimension)
+    usage.start()
+    try:
+        yield usage
+    finally:
+        usage.finish(name)
+
+
+def track_capacity(name: str):
+    """Decorator for Lambda handlers: one capacity scope per invocation."""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with capacity_scope(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _request_capacity(params, model, context, **kwargs):
+    if _ACTIVE_USAGE.get() is None:
+        return
+    if "ReturnConsumedCapacity" in model.input_shape.members:
+        params.setdefault("ReturnConsumedCapacity", "TOTAL")
+    context[_CONTEXT_STARTED] = time.perf_counter()
+
+
+def _record_capacity(parsed, model, context, **kwargs):
+    started = context.pop(_CONTEXT_STARTED, None)
+    usage = _ACTIVE_USAGE.get()
+    if started is None or usage is None:
+        return
+    consumed = parsed.get("ConsumedCapacity") or []
+    # Batch and transaction calls return one entry per table
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    units = 0.0
+    for entry in consumed:
+        table_units = entry.get("CapacityUnits", 0.0)
+        usage.record(entry.get("TableName"), model.name, table_units)
+        units += table_units
+
+    duration_ms = (time.perf_counter() - started) * 1000
+    if units >= EXPENSIVE_OPERATION_UNITS or duration_ms >= SLOW_OPERATION_MS:
+        tables = ", ".join(entry.get("TableName", "?") for entry in consumed)
+        logger.warning(
+            f"Expensive DynamoDB {model.name} on {tables or 'unknown table'}: "
+            f"{units:.1f} capacity units, {duration_ms:.0f} ms",
+            extra={
+                "dynamodb_operation": model.name,
+                "capacity_units": round(units, 2),
+                "duration_ms": round(duration_ms, 2),
+            },
+        )
+
+
+def install_capacity_hooks():
+    """
+    Request and collect consumed capacity on every DynamoDB call made through
+    boto3's default session while a CapacityUsage is active. Clients copy the
+    session's event hooks when they are created, so call this at init before
+    any DynamoDB client or resource exists.
+    """
+    if not CONSUMED_CAPACITY_ENABLED:
+        return
+    if boto3.DEFAULT_SESSION is None:
+        boto3.setup_default_session()
+    events = boto3.DEFAULT_SESSION.events
+    events.register(
+        "provide-client-params.dynamodb",
+        _request_capacity,
+        unique_id="consumed-capacity-request",
+    )
+    events.register(
+        "after-call.dynamodb", _record_capacity, unique_id="consumed-capacity-record"
+    )
@@ -0,0 +1,173 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import os
+import time
+from aws_lambda_powertools import Logger
+from constants.general import SERVICE_NAME
+from helpers.lazy_import import lazy_import
+from helpers.metrics_emitter import emit_duration
+
+logger = Logger(service=SERVICE_NAME)
+
+boto3 = lazy_import("boto3")
+
+# Server-Timing exposes backend latencies to any caller; keep it out of prod
+SERVER_TIMING_ENABLED = os.getenv("STAGE", "dev").lower() != "prod"
+
+# Key under which the botocore hooks keep a call's start time
+_CONTEXT_STARTED = "dependency_timing_started"
+
+_ACTIVE_TIMINGS: ContextVar["RequestTimings | None"] = ContextVar(
+    "active_request_timings", default=None
+)
+
+
+class RequestTimings:
+    """
+    Downstream calls made while serving one request: every AWS API call
+    (through the botocore hooks) and every Strava call (through track()).
+    The pipeline middleware brackets the request with start()/finish().
+    Sync endpoints run on a threadpool with a copy of the request context,
+    so their calls land in the same object.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self._started = None
+        self._token = None
+
+    def start(self):
+        self._token = _ACTIVE_TIMINGS.set(self)
+        self._started = time.perf_counter()
+
+    def record(self, dependency: str, operation: str, duration_ms: float, error=False):
+        self.calls.append((dependency, operation, duration_ms, error))
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    def by_dependency(self) -> dict:
+        """{dependency: {"calls", "errors", "duration_ms", "operations"}}"""
+        summary = {}
+        for dependency, operation, duration_ms, error in self.calls:
+            entry = summary.setdefault(
+                dependency,
+                {"calls": 0, "errors": 0, "duration_ms": 0.0, "operations": {}},
+            )
+            entry["calls"] += 1
+            entry["errors"] += error
+            entry["duration_ms"] += duration_ms
+            entry["operations"][operation] = entry["operations"].get(operation, 0) + 1
+        for entry in summary.values():
+            entry["duration_ms"] = round(entry["duration_ms"], 2)
+        return summary
+
+    def server_timing(self) -> str:
+        """
+        Server-Timing header value: one entry per dependency, then "app" for
+        the time spent outside them and "total". Calls from parallel threads
+        overlap, so "app" is floored at zero.
+        """
+        total_ms = self.elapsed_ms()
+        dependencies = self.by_dependency()
+        entries = [
+            f'{dependency};dur={entry["duration_ms"]:.1f};desc="{entry["calls"]} calls"'
+            for dependency, entry in dependencies.items()
+        ]
+        downstream_ms = sum(entry["duration_ms"] for entry in dependencies.values())
+        entries.append(f"app;dur={max(total_ms - downstream_ms, 0):.1f}")
+        entries.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(entries)
+
+    def finish(self, status_code: int | None, endpoint: str | None, method: str):
+        """
+        Log the request's dependency timings as structured fields and emit
+        one latency metric per dependency for the endpoint. Never raises.
+        """
+        duration_ms = self.elapsed_ms()
+        _ACTIVE_TIMINGS.reset(self._token)
+        if not self.calls:
+            return
+        try:
+            dependencies = self.by_dependency()
+            logger.info(
+                f"Dependency timings for {method} {endpoint}",
+                extra={
+                    "endpoint": endpoint,
+                    "method": method,
+                    "status_code": status_code,
+                    "duration_ms": round(duration_ms, 2),
+                    "dependencies": dependencies,
+                },
+            )
+            for dependency, entry in dependencies.items():
+                emit_duration(
+                    "DependencyLatency",
+                    entry["duration_ms"],
+                    {"Endpoint": endpoint or "unmatched", "Dependency": dependency},
+                )
+        except Exception as e:
+            logger.warning(f"Failed to report dependency timings: {e}")
+
+
+@contextmanager
+def track(dependency: str, operation: str):
+    """Time the wrapped call as `dependency` for the current request, if any."""
+    timings = _ACTIVE_TIMINGS.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        timings.record(
+            dependency, operation, (time.perf_counter() - started) * 1000, error
+        )
+
+
+def _before_api_call(model, context, **kwargs):
+    if _ACTIVE_TIMINGS.get() is not None:
+        context[_CONTEXT_STARTED] = (
+            model.service_model.service_name,
+            model.name,
+            time.perf_counter(),
+        )
+
+
+def _after_api_call(context, http_response=None, **kwargs):
+    # after-call-error passes `exception` and no response
+    started = context.pop(_CONTEXT_STARTED, None)
+    timings = _ACTIVE_TIMINGS.get()
+    if started is None or timings is None:
+        return
+    service, operation, started_at = started
+    error = http_response is None or http_response.status_code >= 300
+    timings.record(service, operation, (time.perf_counter() - started_at) * 1000, error)
+
+
+def install_botocore_hooks():
+    """
+    Time every AWS API call made through boto3's default session, from
+    parameter validation to the parsed response, retries included. Clients
+    copy the session's event hooks when they are created, so call this at
+    init before any client exists.
+    """
+    if boto3.DEFAULT_SESSION is None:
+        boto3.setup_default_session()
+    events = boto3.DEFAULT_SESSION.events
+    events.register(
+        "before-parameter-build",
+        _before_api_call,
+        unique_id="dependency-timing-before-call",
+    )
+    events.register(
+        "after-call", _after_api_call, unique_id="dependency-timing-after-call"
+    )
+    events.register(
+        "after-call-error", _after_api_call, unique_id="dependency-timing-call-error"
+    )
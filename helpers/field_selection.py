@@ -0,0 +1,122 @@
+from typing import Dict, Iterable, Sequence, Tuple
+
+# Fields clients may request with fields=, in the names responses use
+STRAVA_WORKOUT_FIELDS = (
+    "id",
+    "name",
+    "type",
+    "sport_type",
+    "start_date",
+    "start_date_local",
+    "distance",
+    "total_elevation_gain",
+    "moving_time",
+    "elapsed_time",
+    "kilojoules",
+    "map",
+    "locations",
+    "source",
+)
+# What Strava workout list endpoints return without a fields= selection
+STRAVA_LIST_FIELDS = tuple(
+    field for field in STRAVA_WORKOUT_FIELDS if field != "source"
+)
+# Keys of a stored Strava map returned to clients; the simplified
+# summary_polyline_* variants stored next to them are internal
+STRAVA_MAP_FIELDS = ("id", "summary_polyline", "polyline", "resource_state")
+APPLE_HEALTH_WORKOUT_FIELDS = (
+    "workout_uuid",
+    "name",
+    "workout_activity_type",
+    "start_date",
+    "total_distance",
+    "duration",
+    "total_energy_burned",
+    "elevation_ascended",
+    "summary_polyline",
+    "average_speed",
+    "average_heartrate",
+    "max_heartrate",
+    "locations",
+    "source",
+)
+
+# Strava-format field -> Apple Health attributes it is built from by
+# AppleHealthWorkoutModel.to_strava_format
+STRAVA_FORMAT_APPLE_HEALTH_SOURCES = {
+    "id": ("workout_uuid",),
+    "name": ("name",),
+    "type": ("workout_activity_type",),
+    "sport_type": ("workout_activity_type",),
+    "start_date": ("start_date",),
+    "start_date_local": ("start_date",),
+    "distance": ("total_distance",),
+    "total_elevation_gain": ("elevation_ascended",),
+    "moving_time": ("duration",),
+    "elapsed_time": ("duration",),
+    "kilojoules": ("total_energy_burned",),
+    "map": ("summary_polyline",),
+    "locations": ("locations",),
+    "source": ("source",),
+}
+
+
+def parse_fields(fields: str | None, allowed: Sequence[str]) -> Tuple[str, ...] | None:
+    """
+    Parse a comma separated fields= value against an allowlist.
+    Returns None when no selection was made, otherwise the requested fields
+    de-duplicated in request order. Raises ValueError naming unknown fields.
+    """
+    if fields is None or not fields.strip():
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}."
+        )
+    return tuple(dict.fromkeys(requested))
+
+
+def compile_projection(
+    fields: Iterable[str], subpaths: Dict[str, Sequence[str]] = None
+) -> Tuple[str, Dict[str, str]]:
+    """
+    Compile attribute names into (ProjectionExpression, ExpressionAttributeNames).
+    Every name is aliased, so DynamoDB reserved words such as name, type, map,
+    source and duration need no special casing. `subpaths` narrows a map
+    attribute to some of its keys, e.g. {"map": ["summary_polyline"]}.
+    """
+    parts = []
+    names = {}
+    for i, field in enumerate(fields):
+        alias = f"#f{i}"
+        names[alias] = field
+        paths = (subpaths or {}).get(field)
+        if not paths:
+            parts.append(alias)
+            continue
+        for j, path in enumerate(paths):
+            path_alias = f"{alias}s{j}"
+            names[path_alias] = path
+            parts.append(f"{alias}.{path_alias}")
+    return ", ".join(parts), names
+
+
+def apple_health_fields_for(strava_fields: Iterable[str]) -> Tuple[str, ...]:
+    """
+    Apple Health attributes to read for the requested Strava-format fields.
+    workout_uuid is always included because the model requires it.
+    """
+    attributes = {"workout_uuid": None}
+    for field in strava_fields:
+        for attribute in STRAVA_FORMAT_APPLE_HEALTH_SOURCES[field]:
+            attributes[attribute] = None
+    return tuple(attributes)
+
+
+def select_fields(item: dict, fields: Iterable[str] | None) -> dict:
+    """Keep only the requested top-level fields of a response item."""
+    if fields is None:
+        return item
+    return {field: item[field] for field in fields if field in item}
@@ -1,17 +1,74 @@
 import base64
+import hashlib
 import json
-from exceptions.jwt_exeptions import InvalidJWTException
+import threading
+import time
+import urllib.request
+from exceptions.jwt_exeptions import (
+    ExpiredJWTException,
+    InvalidJWTException,
+    JWTException,
+    JWTSignatureException,
+    UnknownSigningKeyException,
+)
 import configparser
 import os
 from aws_lambda_powertools import Logger
 from starlette.requests import Request as StarletteRequest
-import boto3
-import contextvars
-from starlette.requests import Request as StarletteRequest
-import contextvars
+from helpers import dependency_timing
+from helpers.lazy_import import lazy_import
+from helpers.log_payload import log_payload
+from helpers.lookup_cache import LookupCache
 
 logger = Logger(service="workout-tracer-api")
 
+# Only the Cognito attribute update needs boto3; keep it off the app import
+boto3 = lazy_import("boto3")
+# Signature checks only run on a claims cache miss
+hashes = lazy_import("cryptography.hazmat.primitives.hashes")
+padding = lazy_import("cryptography.hazmat.primitives.asymmetric.padding")
+rsa = lazy_import("cryptography.hazmat.primitives.asymmetric.rsa")
+
+COGNITO_USER_POOL_ID = os.getenv("COGNITO_USER_POOL_ID", "")
+# enforce: only verified claims authenticate; report: verify and log failures
+# but keep the unverified claims (opt-in, for rollout); off: decode only
+JWT_VERIFICATION = os.getenv(
+    "JWT_VERIFICATION", "enforce" if COGNITO_USER_POOL_ID else "off"
+).lower()
+# Optional comma separated app client ids the token must be issued to
+JWT_ALLOWED_CLIENT_IDS = {
+    client_id.strip()
+    for client_id in os.getenv("JWT_ALLOWED_CLIENT_IDS", "").split(",")
+    if client_id.strip()
+}
+# Clock skew tolerated on exp
+JWT_LEEWAY_SECONDS = int(os.getenv("JWT_LEEWAY_SECONDS", "30"))
+# An unknown kid refetches the JWKS at most this often, failed fetches included
+JWKS_MIN_REFRESH_SECONDS = int(os.getenv("JWKS_MIN_REFRESH_SECONDS", "60"))
+JWKS_TIMEOUT_SECONDS = float(os.getenv("JWKS_TIMEOUT_SECONDS", "3"))
+
+# Pool ids look like us-west-2_AbCdEf; the region is the prefix
+COGNITO_ISSUER = (
+    f"https://cognito-idp.{COGNITO_USER_POOL_ID.split('_')[0]}.amazonaws.com"
+    f"/{COGNITO_USER_POOL_ID}"
+)
+
+# kid -> RSA public key; replaced as a whole on refresh
+_jwks = {}
+_jwks_fetched_at = 0.0
+_jwks_lock = threading.Lock()
+
+# sha256(token) -> verified claims, or the verification error for a rejected
+# token, each entry kept until the token's exp
+_VERIFIED_CLAIMS = LookupCache(
+    "jwt_claims", max_entries=int(os.getenv("JWT_CLAIMS_CACHE_MAX_ENTRIES", "1024"))
+)
+
+
+def _b64decode(segment: str) -> bytes:
+    # Pad base64 if needed
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
 
 def decode_jwt(token: str) -> dict:
     """
@@ -20,44 +77,176 @@ def decode_jwt(token: str) -> dict:
     """
     try:
         payload = token.split(".")[1]
-        # Pad base64 if needed
-        padding = "=" * (-len(payload) % 4)
-        decoded = base64.urlsafe_b64decode(payload + padding)
-        claims = json.loads(decoded)
-        logger.debug(f"Decoded JWT claims: {claims}")  # Debug log
+        claims = json.loads(_b64decode(payload))
+        logger.debug("Decoded JWT claims: %s", log_payload(claims))
         return claims
     except Exception as e:
-        logger.error(f"Failed to decode JWT: {e}, token: {token}")  # Debug log
+        logger.error(f"Failed to decode JWT: {e} (token of {len(token)} chars)")
         raise InvalidJWTException(f"Invalid JWT: {e}")
 
 
-def inject_user_token():
-    # Remove reading from dev_creds.cfg, only use id_token from cookies
-    orig_init = StarletteRequest.__init__
-
-    def new_init(self, *args, **kwargs):
-        scope = args[0]
-        id_token = None
-        headers = list(scope.get("headers", []))
-        # Find the cookie header
-        cookie_header = next((v for k, v in headers if k == b"cookie"), None)
-        if cookie_header:
-            cookies = cookie_header.decode("latin-1").split(";")
-            for cookie in cookies:
-                if cookie.strip().startswith("id_token="):
-                    id_token = cookie.strip().split("=", 1)[1]
-                    break
-        # Only inject Authorization header if id_token is found in cookies
-        if id_token and not any(k == b"authorization" for k, v in headers):
-            headers.append((b"authorization", f"Bearer {id_token}".encode("latin-1")))
-            scope["headers"] = headers
-        # Optionally, adjust for local vs. staging/prod (no-op here, but you could add logic if needed)
-        orig_init(self, *args, **kwargs)
-
-    StarletteRequest.__init__ = new_init
-    logger.debug(
-        "Injecting token: Authorization header will be injected from cookies if present."
-    )
+def refresh_jwks():
+    """
+    Fetch the user pool's JWKS and replace the cached signing keys. This
+    blocks on Cognito, so async callers go through signing_key_loaded first.
+    """
+    global _jwks, _jwks_fetched_at
+    # Recorded before fetching so a failing Cognito is retried only once per
+    # JWKS_MIN_REFRESH_SECONDS rather than on every unknown kid
+    _jwks_fetched_at = time.time()
+    with dependency_timing.track("cognito", "/.well-known/jwks.json"):
+        with urllib.request.urlopen(
+            f"{COGNITO_ISSUER}/.well-known/jwks.json", timeout=JWKS_TIMEOUT_SECONDS
+        ) as response:
+            jwks = json.loads(response.read())
+    _jwks = {
+        jwk["kid"]: rsa.RSAPublicNumbers(
+            int.from_bytes(_b64decode(jwk["e"]), "big"),
+            int.from_bytes(_b64decode(jwk["n"]), "big"),
+        ).public_key()
+        for jwk in jwks.get("keys", [])
+        if jwk.get("kty") == "RSA"
+    }
+    logger.info(f"Loaded {len(_jwks)} Cognito signing keys")
+
+
+def get_signing_key(kid: str):
+    """
+    Public key for `kid`. An unknown kid (e.g. after key rotation) refetches
+    the JWKS; concurrent misses share one fetch, and refetches are rate
+    limited so forged kids cannot hammer Cognito.
+    """
+    key = _jwks.get(kid)
+    if key is not None:
+        return key
+    with _jwks_lock:
+        # Another thread may have refreshed while this one waited
+        key = _jwks.get(kid)
+        if key is None and time.time() - _jwks_fetched_at >= JWKS_MIN_REFRESH_SECONDS:
+            refresh_jwks()
+            key = _jwks.get(kid)
+    if key is None:
+        raise UnknownSigningKeyException(f"Unknown JWT signing key '{kid}'")
+    return key
+
+
+def signing_key_loaded(token: str) -> bool:
+    """
+    False when checking `token` may fetch the JWKS (verification is on and
+    its kid is not loaded), so the caller can verify off the event loop.
+    """
+    if JWT_VERIFICATION == "off":
+        return True
+    try:
+        header = json.loads(_b64decode(token.split(".", 1)[0]))
+    except Exception:
+        # Rejected as malformed without a fetch
+        return True
+    return header.get("kid") in _jwks
+
+
+def verify_jwt(token: str) -> dict:
+    """
+    Verify a Cognito-issued RS256 token (signature, exp, iss, token_use and,
+    when configured, the app client) and return its claims. Verified claims
+    are cached by token digest until exp, so a repeated token costs one hash
+    and one dict lookup; so are rejections, except for an unknown kid.
+    Raises InvalidJWTException, ExpiredJWTException or JWTSignatureException.
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    cached = _VERIFIED_CLAIMS.get(digest)
+    if not LookupCache.is_missing(cached):
+        if isinstance(cached, Exception):
+            raise cached.with_traceback(None)
+        return cached
+
+    try:
+        claims = _verify_uncached(token)
+    except JWTException as e:
+        # An unknown kid may be a rotation the JWKS has not caught up with
+        if not isinstance(e, UnknownSigningKeyException):
+            _VERIFIED_CLAIMS.set(
+                digest, type(e)(*e.args), expires_at=_failure_expires_at(token)
+            )
+        raise
+    _VERIFIED_CLAIMS.set(digest, claims, expires_at=claims["exp"] + JWT_LEEWAY_SECONDS)
+    return claims
+
+
+def _failure_expires_at(token: str) -> float | None:
+    """The token's own exp, or None (the cache TTL) when it has none."""
+    try:
+        exp = json.loads(_b64decode(token.split(".")[1])).get("exp")
+    except Exception:
+        return None
+    return exp + JWT_LEEWAY_SECONDS if isinstance(exp, (int, float)) else None
+
+
+def _verify_uncached(token: str) -> dict:
+    try:
+        header_segment, payload_segment, signature_segment = token.split(".")
+        header = json.loads(_b64decode(header_segment))
+        claims = json.loads(_b64decode(payload_segment))
+        signature = _b64decode(signature_segment)
+    except Exception as e:
+        raise InvalidJWTException(f"Malformed JWT: {e}")
+    if header.get("alg") != "RS256":
+        raise InvalidJWTException(f"Unsupported JWT alg '{header.get('alg')}'")
+
+    key = get_signing_key(header.get("kid"))
+    try:
+        key.verify(
+            signature,
+            f"{header_segment}.{payload_segment}".encode(),
+            padding.PKCS1v15(),
+            hashes.SHA256(),
+        )
+    except Exception:
+        raise JWTSignatureException("JWT signature verification failed")
+
+    exp = claims.get("exp")
+    if not isinstance(exp, (int, float)) or exp + JWT_LEEWAY_SECONDS <= time.time():
+        raise ExpiredJWTException("JWT has expired")
+    if claims.get("iss") != COGNITO_ISSUER:
+        raise InvalidJWTException(f"Unexpected JWT issuer '{claims.get('iss')}'")
+    token_use = claims.get("token_use")
+    if token_use not in ("id", "access"):
+        raise InvalidJWTException(f"Unexpected JWT token_use '{token_use}'")
+    if JWT_ALLOWED_CLIENT_IDS:
+        client_id = claims.get("aud") if token_use == "id" else claims.get("client_id")
+        if client_id not in JWT_ALLOWED_CLIENT_IDS:
+            raise InvalidJWTException(f"JWT issued to unexpected client '{client_id}'")
+
+    return claims
+
+
+def promote_id_token_cookie(scope) -> None:
+    """
+    Copy the id_token cookie into an Authorization header on the ASGI scope,
+    so every later reader sees a bearer token. Runs once per request at the
+    edge of the middleware pipeline; an existing Authorization header wins.
+    """
+    cookie_header = None
+    for key, value in scope.get("headers", []):
+        if key == b"authorization":
+            return
+        if key == b"cookie":
+            cookie_header = value
+    if not cookie_header:
+        return
+    for cookie in cookie_header.decode("latin-1").split(";"):
+        cookie = cookie.strip()
+        if cookie.startswith("id_token="):
+            id_token = cookie.split("=", 1)[1]
+            scope["headers"] = list(scope["headers"]) + [
+                (b"authorization", f"Bearer {id_token}".encode("latin-1"))
+            ]
+            return
+
+
+def get_jwt_claims(request: StarletteRequest) -> dict:
+    """Claims decoded once by the request pipeline, or {} when unauthenticated."""
+    return getattr(request.state, "jwt_claims", None) or {}
 
 
 def update_cognito_user_attributes(
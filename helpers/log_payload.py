@@ -0,0 +1,98 @@
+from collections.abc import Mapping
+from functools import lru_cache
+import json
+import os
+import re
+
+# Whole rendered payload, in characters
+LOG_PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "2000"))
+# Longer strings (polylines, raw bodies) are cut to this many characters
+LOG_PAYLOAD_MAX_STRING = int(os.getenv("LOG_PAYLOAD_MAX_STRING", "200"))
+# Lists keep this many leading entries
+LOG_PAYLOAD_MAX_ITEMS = int(os.getenv("LOG_PAYLOAD_MAX_ITEMS", "10"))
+# Containers nested deeper than this are only counted
+LOG_PAYLOAD_MAX_DEPTH = int(os.getenv("LOG_PAYLOAD_MAX_DEPTH", "4"))
+
+REDACTED = "[REDACTED]"
+# Keys whose values never reach the logs
+SENSITIVE_KEY = re.compile(
+    r"token|secret|password|authorization|cookie|api_key|^code$", re.IGNORECASE
+)
+JWT_VALUE = re.compile(r"^eyJ[\w-]+\.[\w-]+\.[\w-]*$")
+
+_SCALARS = (int, float, bool, type(None))
+
+
+@lru_cache(maxsize=1024)
+def _is_sensitive(key: str) -> bool:
+    return SENSITIVE_KEY.search(key) is not None
+
+
+def _prepare(value, depth: int):
+    """Redacted, size-capped copy of `value` that json.dumps can render."""
+    if isinstance(value, _SCALARS):
+        return value
+    if hasattr(value, "model_dump"):
+        value = value.model_dump()
+    if isinstance(value, Mapping):
+        if depth >= LOG_PAYLOAD_MAX_DEPTH:
+            return f"{{{len(value)} keys}}"
+        return {
+            str(key): (
+                REDACTED if _is_sensitive(str(key)) else _prepare(item, depth + 1)
+            )
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple, set)):
+        if depth >= LOG_PAYLOAD_MAX_DEPTH:
+            return f"[{len(value)} items]"
+        items = [
+            _prepare(item, depth + 1) for item in list(value)[:LOG_PAYLOAD_MAX_ITEMS]
+        ]
+        if len(value) > LOG_PAYLOAD_MAX_ITEMS:
+            items.append(f"... {len(value) - LOG_PAYLOAD_MAX_ITEMS} more")
+        return items
+    if isinstance(value, bytes):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, str):
+        if JWT_VALUE.match(value):
+            return REDACTED
+        if len(value) > LOG_PAYLOAD_MAX_STRING:
+            return f"{value[:LOG_PAYLOAD_MAX_STRING]}... ({len(value)} chars)"
+    return value
+
+
+def render_payload(value, max_chars: int = None) -> str:
+    """Render `value` for a log line: redacted, summarized and capped."""
+    max_chars = max_chars or LOG_PAYLOAD_MAX_CHARS
+    try:
+        text = json.dumps(_prepare(value, 0), default=str)
+    except Exception as e:
+        return f"<unloggable {type(value).__name__}: {e}>"
+    if len(text) > max_chars:
+        return f"{text[:max_chars]}... (truncated, {len(text)} chars)"
+    return text
+
+
+class LogPayload:
+    """
+    Deferred log argument. Pass it as a %s argument, e.g.
+    logger.debug("Incoming workout_data: %s", log_payload(workout_data)), and
+    the payload is only rendered if the record is actually emitted.
+    """
+
+    __slots__ = ("value", "max_chars")
+
+    def __init__(self, value, max_chars: int = None):
+        self.value = value
+        self.max_chars = max_chars
+
+    def __str__(self):
+        return render_payload(self.value, self.max_chars)
+
+    __repr__ = __str__
+
+
+def log_payload(value, max_chars: int = None) -> LogPayload:
+    """Wrap a large or sensitive object for lazy, capped and redacted logging."""
+    return LogPayload(value, max_chars)
@@ -0,0 +1,92 @@
+from collections import OrderedDict
+import os
+import time
+from typing import Any, Dict, Hashable, Tuple
+
+# Profile mappings rarely change; bound how long another container can serve
+# a stale public flag after an update it did not see
+LOOKUP_CACHE_TTL_SECONDS = int(os.getenv("LOOKUP_CACHE_TTL_SECONDS", "60"))
+LOOKUP_CACHE_NEGATIVE_TTL_SECONDS = int(
+    os.getenv("LOOKUP_CACHE_NEGATIVE_TTL_SECONDS", "30")
+)
+LOOKUP_CACHE_MAX_ENTRIES = int(os.getenv("LOOKUP_CACHE_MAX_ENTRIES", "1024"))
+
+_MISSING = object()
+
+# name -> LookupCache, for lookup_cache_stats()
+_CACHES: Dict[str, "LookupCache"] = {}
+
+
+class LookupCache:
+    """
+    Per-container TTL + LRU cache for slow-changing lookups such as
+    display_id -> profile. A cached None is a negative entry ("no such user")
+    and expires after the shorter negative TTL.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = LOOKUP_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = LOOKUP_CACHE_TTL_SECONDS,
+        negative_ttl_seconds: int = LOOKUP_CACHE_NEGATIVE_TTL_SECONDS,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        _CACHES[name] = self
+
+    def get(self, key: Hashable, default=_MISSING):
+        """
+        Return the cached value (possibly None for a negative entry), or
+        `default` when the key is absent or expired; check the result with
+        is_missing() to tell the two apart.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    @staticmethod
+    def is_missing(value) -> bool:
+        return value is _MISSING
+
+    def set(self, key: Hashable, value, expires_at: float = None):
+        """Cache `value` for the TTL, or until `expires_at` (epoch seconds) if given."""
+        if expires_at is None:
+            ttl = self.ttl_seconds if value is not None else self.negative_ttl_seconds
+            expires_at = time.time() + ttl
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable = _MISSING):
+        """Drop one key, or every entry when no key is given."""
+        if key is _MISSING:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "size": len(self._entries),
+        }
+
+
+def lookup_cache_stats() -> Dict[str, dict]:
+    """Hit/miss counters for every lookup cache in this container."""
+    return {name: cache.stats() for name, cache in _CACHES.items()}
@@ -1,29 +1,237 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+import json
+import math
 import os
+import threading
+import time
 from aws_lambda_powertools import Logger
-from aws_lambda_powertools.metrics import Metrics, MetricUnit
+from aws_lambda_powertools.metrics import MetricUnit
 
 logger = Logger(service="workout-tracer-api")
 
 stage = os.environ.get("STAGE", "dev")
-metrics = Metrics(
-    namespace=f"WorkoutTracer-{stage.upper()}", service="workout-tracer-api"
+DEFAULT_NAMESPACE = f"WorkoutTracer-{stage.upper()}"
+# Powertools' Metrics reported the service as a dimension; keep it that way
+DEFAULT_DIMENSIONS = {"service": "workout-tracer-api"}
+
+# EMF limits per document: metrics, values per metric
+MAX_METRICS_PER_DOCUMENT = 100
+MAX_VALUES_PER_METRIC = 100
+# Durations are kept to this many significant digits in the histogram
+DURATION_SIGNIFICANT_DIGITS = 2
+
+_ACTIVE_AGGREGATOR: ContextVar["MetricsAggregator | None"] = ContextVar(
+    "active_metrics_aggregator", default=None
 )
 
 
-def emit_metric(metric_name: str, dimensions: dict = None):
+def _bucket(milliseconds: float) -> float:
+    """Round a duration to DURATION_SIGNIFICANT_DIGITS, e.g. 1234.5 -> 1200."""
+    if milliseconds <= 0:
+        return 0.0
+    digits = DURATION_SIGNIFICANT_DIGITS - 1 - math.floor(math.log10(milliseconds))
+    return round(milliseconds, digits)
+
+
+class MetricsAggregator:
+    """
+    Metrics of one API request or Lambda invocation, held in memory and
+    written once by flush(): counts are summed and durations are kept as
+    histograms, one EMF document per namespace and dimension set.
+    """
+
+    def __init__(self):
+        # (namespace, dimensions) -> {metric name: (unit, sum or histogram)}
+        self._sets = {}
+        # Sync endpoints may record from threadpool threads
+        self._lock = threading.Lock()
+        self._token = None
+
+    def _metrics_for(self, namespace: str, dimensions: dict | None) -> dict:
+        merged = {**DEFAULT_DIMENSIONS, **(dimensions or {})}
+        key = (
+            namespace or DEFAULT_NAMESPACE,
+            tuple((name, str(value)) for name, value in merged.items()),
+        )
+        return self._sets.setdefault(key, {})
+
+    def add_count(
+        self,
+        metric_name: str,
+        dimensions: dict = None,
+        value: float = 1,
+        namespace: str = None,
+    ):
+        with self._lock:
+            metric_set = self._metrics_for(namespace, dimensions)
+            _, total = metric_set.get(metric_name, (MetricUnit.Count, 0))
+            metric_set[metric_name] = (MetricUnit.Count, total + value)
+
+    def add_duration(
+        self,
+        metric_name: str,
+        milliseconds: float,
+        dimensions: dict = None,
+        namespace: str = None,
+    ):
+        with self._lock:
+            metric_set = self._metrics_for(namespace, dimensions)
+            _, histogram = metric_set.setdefault(
+                metric_name, (MetricUnit.Milliseconds, {})
+            )
+            bucket = _bucket(milliseconds)
+            histogram[bucket] = histogram.get(bucket, 0) + 1
+
+    def start(self):
+        self._token = _ACTIVE_AGGREGATOR.set(self)
+
+    def finish(self):
+        _ACTIVE_AGGREGATOR.reset(self._token)
+        self.flush()
+
+    def flush(self):
+        """Write everything recorded so far as EMF and reset. Never raises."""
+        with self._lock:
+            sets, self._sets = self._sets, {}
+        try:
+            timestamp = int(time.time() * 1000)
+            for (namespace, dimensions), metric_set in sets.items():
+                for document in _emf_documents(
+                    namespace, dict(dimensions), metric_set, timestamp
+                ):
+                    print(json.dumps(document, separators=(",", ":")))
+        except Exception as e:
+            logger.warning(f"Failed to flush metrics: {e}")
+
+
+def _emf_documents(namespace: str, dimensions: dict, metric_set: dict, timestamp):
+    """
+    Split one dimension set into EMF documents within the per-document
+    metric and per-metric value limits. A histogram is written as
+    {"Values": [...], "Counts": [...]}, one entry per bucket, so the number
+    of samples does not grow the document.
     """
-    Emit a CloudWatch metric with optional dimensions.
+    pending = []
+    for name, (unit, aggregate) in metric_set.items():
+        if not isinstance(aggregate, dict):
+            pending.append((name, unit, aggregate))
+            continue
+        buckets = list(aggregate.items())
+        for start in range(0, len(buckets), MAX_VALUES_PER_METRIC):
+            chunk = buckets[start : start + MAX_VALUES_PER_METRIC]
+            pending.append(
+                (
+                    name,
+                    unit,
+                    {
+                        "Values": [bucket for bucket, _ in chunk],
+                        "Counts": [count for _, count in chunk],
+                    },
+                )
+            )
+
+    documents = []
+    while pending:
+        batch, seen, rest = [], set(), []
+        # A metric name may appear once per document
+        for entry in pending:
+            if entry[0] in seen or len(batch) == MAX_METRICS_PER_DOCUMENT:
+                rest.append(entry)
+            else:
+                seen.add(entry[0])
+                batch.append(entry)
+        pending = rest
+        document = {
+            "_aws": {
+                "Timestamp": timestamp,
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": namespace,
+                        "Dimensions": [list(dimensions)],
+                        "Metrics": [
+                            {"Name": name, "Unit": unit.value}
+                            for name, unit, _ in batch
+                        ],
+                    }
+                ],
+            },
+            **dimensions,
+        }
+        for name, _, value in batch:
+            document[name] = value
+        documents.append(document)
+    return documents
+
+
+@contextmanager
+def metrics_scope():
+    """Aggregate metrics emitted inside the block and flush them once at exit."""
+    aggregator = MetricsAggregator()
+    aggregator.start()
+    try:
+        yield aggregator
+    finally:
+        aggregator.finish()
+
+
+def track_metrics(func):
+    """Decorator for Lambda handlers: one metrics flush per invocation."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with metrics_scope():
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def emit_metric(
+    metric_name: str, dimensions: dict = None, value: float = 1, namespace: str = None
+):
+    """
+    Emit a CloudWatch count metric with optional dimensions. Inside a request
+    or metrics_scope() the count is aggregated and flushed with the scope;
+    otherwise it is written straight away.
 
     Args:
         metric_name: The name of the metric (e.g. "StravaApiCall").
         dimensions: Optional dict of dimension key-value pairs
                     (e.g. {"Endpoint": "/oauth/token"}).
+        value: The count to add, 1 by default.
+        namespace: CloudWatch namespace, WorkoutTracer-<STAGE> by default.
     """
-    try:
-        if dimensions:
-            for key, value in dimensions.items():
-                metrics.add_dimension(name=key, value=str(value))
-        metrics.add_metric(name=metric_name, unit=MetricUnit.Count, value=1)
-        metrics.flush_metrics()
-    except Exception as e:
-        logger.warning(f"Failed to emit metric '{metric_name}': {e}")
+    aggregator = _ACTIVE_AGGREGATOR.get()
+    if aggregator is not None:
+        aggregator.add_count(metric_name, dimensions, value, namespace)
+        return
+    aggregator = MetricsAggregator()
+    aggregator.add_count(metric_name, dimensions, value, namespace)
+    aggregator.flush()
+
+
+def emit_duration(
+    metric_name: str,
+    milliseconds: float,
+    dimensions: dict = None,
+    namespace: str = None,
+):
+    """
+    Emit a CloudWatch latency metric, in milliseconds, with optional
+    dimensions. Aggregated into the scope's histogram like emit_metric.
+
+    Args:
+        metric_name: The name of the metric (e.g. "DependencyLatency").
+        milliseconds: The measured duration.
+        dimensions: Optional dict of dimension key-value pairs
+                    (e.g. {"Dependency": "dynamodb"}).
+        namespace: CloudWatch namespace, WorkoutTracer-<STAGE> by default.
+    """
+    aggregator = _ACTIVE_AGGREGATOR.get()
+    if aggregator is not None:
+        aggregator.add_duration(metric_name, milliseconds, dimensions, namespace)
+        return
+    aggregator = MetricsAggregator()
+    aggregator.add_duration(metric_name, milliseconds, dimensions, namespace)
+    aggregator.flush()
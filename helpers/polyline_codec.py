@@ -0,0 +1,66 @@
+import numpy as np
+
+# Encoded polyline chunks are 5-bit groups offset by 63; bit 0x20 means "more follows"
+_OFFSET = 63
+_CONTINUATION = 0x20
+_CHUNK_MASK = 0x1F
+# Enough 5-bit chunks for any zigzagged coordinate delta at precision <= 7
+_MAX_CHUNKS = 7
+
+
+def _as_bytes(encoded) -> bytes:
+    return encoded.encode("ascii") if isinstance(encoded, str) else bytes(encoded)
+
+
+def _decode_values(buffer: np.ndarray) -> np.ndarray:
+    """Decode a uint8 buffer of concatenated varints into signed int64 values."""
+    if not buffer.size:
+        return np.empty(0, dtype=np.int64)
+    values = buffer.astype(np.int64) - _OFFSET
+    if values.min() < 0 or values.max() > 0x3F:
+        raise ValueError("Invalid character in encoded polyline")
+    terminal = (values & _CONTINUATION) == 0
+    if not terminal[-1]:
+        raise ValueError("Encoded polyline ends mid-value")
+
+    is_start = np.empty(values.size, dtype=bool)
+    is_start[0] = True
+    is_start[1:] = terminal[:-1]
+    # Position of every byte within its value, so chunk k is shifted by 5 * k
+    index = np.arange(values.size)
+    position = index - np.maximum.accumulate(np.where(is_start, index, 0))
+    shifted = (values & _CHUNK_MASK) << (5 * position)
+    raw = np.add.reduceat(shifted, np.flatnonzero(is_start))
+    # Undo zigzag encoding
+    return (raw >> 1) ^ -(raw & 1)
+
+
+def decode(encoded, precision: int = 5) -> np.ndarray:
+    """
+    Decode an encoded polyline (str or bytes) into an (n, 2) float64 array
+    of (lat, lon) rows.
+    """
+    deltas = _decode_values(np.frombuffer(_as_bytes(encoded), dtype=np.uint8))
+    if deltas.size % 2:
+        raise ValueError("Encoded polyline has an odd number of values")
+    return np.cumsum(deltas.reshape(-1, 2), axis=0) / 10.0**precision
+
+
+def encode(coords, precision: int = 5) -> str:
+    """Encode an (n, 2) array-like of (lat, lon) rows as a polyline string."""
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    if not len(coords):
+        return ""
+    scaled = np.round(coords * 10.0**precision).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=np.zeros((1, 2), dtype=np.int64))
+    values = deltas.ravel()
+    zigzag = np.where(values < 0, ~(values << 1), values << 1)
+
+    shifts = 5 * np.arange(_MAX_CHUNKS)
+    remaining = zigzag[:, None] >> shifts
+    present = remaining > 0
+    present[:, 0] = True
+    more = np.zeros_like(present)
+    more[:, :-1] = present[:, 1:]
+    chunks = (remaining & _CHUNK_MASK) | np.where(more, _CONTINUATION, 0)
+    return (chunks[present] + _OFFSET).astype(np.uint8).tobytes().decode("ascii")
@@ -0,0 +1,165 @@
+from typing import Dict, List, Tuple
+from aws_lambda_powertools import Logger
+
+logger = Logger(service="workout-tracer-api")
+
+# Detail levels accepted by list endpoints, coarsest first
+POLYLINE_DETAIL_LEVELS = ("low", "medium", "full")
+
+# Douglas-Peucker tolerance in degrees per simplified level.
+# ~110 m is invisible at country/state zoom, ~11 m at city zoom.
+POLYLINE_TOLERANCES = {
+    "low": 1e-3,
+    "medium": 1e-4,
+}
+
+
+def polyline_variant_field(detail: str) -> str:
+    """Attribute name a simplified variant is stored under, next to summary_polyline."""
+    if detail == "full":
+        return "summary_polyline"
+    return f"summary_polyline_{detail}"
+
+
+def _perpendicular_distance(
+    point: Tuple[float, float],
+    start: Tuple[float, float],
+    end: Tuple[float, float],
+) -> float:
+    """Distance in degrees from point to the segment start-end."""
+    (px, py), (sx, sy), (ex, ey) = point, start, end
+    dx, dy = ex - sx, ey - sy
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return ((px - sx) ** 2 + (py - sy) ** 2) ** 0.5
+    t = max(0.0, min(1.0, ((px - sx) * dx + (py - sy) * dy) / length_sq))
+    return ((px - sx - t * dx) ** 2 + (py - sy - t * dy) ** 2) ** 0.5
+
+
+def simplify_coords(
+    coords: List[Tuple[float, float]], tolerance: float
+) -> List[Tuple[float, float]]:
+    """
+    Douglas-Peucker simplification of a list of (lat, lon) points.
+    Iterative so long routes cannot hit the recursion limit.
+    """
+    if len(coords) < 3:
+        return list(coords)
+
+    keep = [False] * len(coords)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(coords) - 1)]
+    while stack:
+        first, last = stack.pop()
+        max_distance, index = 0.0, None
+        for i in range(first + 1, last):
+            distance = _perpendicular_distance(coords[i], coords[first], coords[last])
+            if distance > max_distance:
+                max_distance, index = distance, i
+        if index is not None and max_distance > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [point for point, kept in zip(coords, keep) if kept]
+
+
+def simplify_mask(coords, tolerance: float):
+    """
+    simplify_coords for an (n, 2) NumPy array: returns a boolean mask of the
+    points kept, measuring each segment's points in one vectorized step.
+    """
+    import numpy as np
+
+    keep = np.zeros(len(coords), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(coords) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = coords[first], coords[last]
+        points = coords[first + 1 : last]
+        segment = end - start
+        length_sq = segment @ segment
+        if length_sq == 0:
+            offsets = points - start
+        else:
+            t = np.clip((points - start) @ segment / length_sq, 0.0, 1.0)
+            offsets = points - start - t[:, None] * segment
+        distances = np.sqrt((offsets * offsets).sum(axis=1))
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance:
+            index += first + 1
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return keep
+
+
+def build_polyline_variants(summary_polyline: str | None) -> Dict[str, str]:
+    """
+    Precompute the simplified variants of an encoded polyline, keyed by the
+    attribute name they are stored under (e.g. "summary_polyline_low").
+    Levels that would not drop any points are omitted. Returns an empty dict
+    when there is no polyline or it cannot be decoded.
+    Uses the NumPy codec where the heavy layer is available and the
+    polyline package otherwise.
+    """
+    if not summary_polyline:
+        return {}
+    try:
+        from helpers import polyline_codec
+    except ImportError:
+        return _build_polyline_variants_pure(summary_polyline)
+
+    try:
+        coords = polyline_codec.decode(summary_polyline)
+    except Exception as e:
+        logger.warning(f"Could not decode polyline for simplification: {e}")
+        return {}
+
+    variants = {}
+    if len(coords) < 3:
+        return variants
+    for detail, tolerance in POLYLINE_TOLERANCES.items():
+        keep = simplify_mask(coords, tolerance)
+        # Nothing to gain over the full polyline, which readers fall back to
+        if not keep.all():
+            variants[polyline_variant_field(detail)] = polyline_codec.encode(
+                coords[keep]
+            )
+    return variants
+
+
+def _build_polyline_variants_pure(summary_polyline: str) -> Dict[str, str]:
+    try:
+        import polyline as polyline_lib
+
+        coords = polyline_lib.decode(summary_polyline)
+    except Exception as e:
+        logger.warning(f"Could not decode polyline for simplification: {e}")
+        return {}
+
+    variants = {}
+    for detail, tolerance in POLYLINE_TOLERANCES.items():
+        simplified = simplify_coords(coords, tolerance)
+        # Nothing to gain over the full polyline, which readers fall back to
+        if len(simplified) < len(coords):
+            variants[polyline_variant_field(detail)] = polyline_lib.encode(simplified)
+    return variants
+
+
+def select_polyline_variant(container: dict | None, detail: str) -> dict | None:
+    """
+    Replace summary_polyline in a map-like dict with the requested variant and
+    drop the other variants. Falls back to the full polyline for workouts
+    stored before variants existed.
+    """
+    if not container:
+        return container
+    variant = container.get(polyline_variant_field(detail))
+    if variant:
+        container["summary_polyline"] = variant
+    for level in POLYLINE_TOLERANCES:
+        container.pop(polyline_variant_field(level), None)
+    return container
@@ -0,0 +1,250 @@
+from contextvars import ContextVar
+from datetime import datetime
+import cProfile
+import io
+import json
+import marshal
+import os
+import pstats
+import random
+import re
+import time
+import tracemalloc
+import urllib.parse
+from aws_lambda_powertools import Logger
+from constants.general import SERVICE_NAME
+from helpers.lazy_import import lazy_import
+
+logger = Logger(service=SERVICE_NAME)
+
+# Only S3 profile uploads need boto3; keep it off the app import
+boto3 = lazy_import("boto3")
+
+# Fraction of requests to profile; 0 disables sampling entirely
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+# Requests carrying this header are always profiled, except in prod
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "X-Profile-Request").lower()
+# CPU profiler for sampled requests: cprofile, pyinstrument or off
+PROFILE_CPU = os.getenv("PROFILE_CPU", "cprofile").lower()
+# Profiles go to S3 when a bucket is set, otherwise to a local directory
+PROFILE_S3_BUCKET = os.getenv("PROFILE_S3_BUCKET")
+PROFILE_S3_PREFIX = os.getenv("PROFILE_S3_PREFIX", "request-profiles")
+PROFILE_OUTPUT_DIR = os.getenv("PROFILE_OUTPUT_DIR", "/tmp/request-profiles")
+# Entries kept in the summary's allocation and function tables
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "15"))
+
+_ACTIVE_PROFILE: ContextVar["RequestProfile | None"] = ContextVar(
+    "active_request_profile", default=None
+)
+
+
+def sample_trigger(headers) -> str | None:
+    """
+    Decide whether to profile a request. Returns "header" or "sampled" for
+    profiled requests and None otherwise, without allocating for the common
+    unsampled case.
+    """
+    if PROFILE_HEADER in headers and os.getenv("STAGE", "dev").lower() != "prod":
+        return "header"
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+def active_profile() -> "RequestProfile | None":
+    """The profile of the current request, if it was sampled."""
+    return _ACTIVE_PROFILE.get()
+
+
+def route_template(scope) -> str | None:
+    """
+    Full route template of a routed request, e.g. /public/workouts/{user_display_id},
+    so profiles of one endpoint group together. Included routers keep their
+    own routes, whose path lacks the include prefix; recover it from the
+    request path.
+    """
+    route = scope.get("route")
+    route_path = getattr(route, "path", None)
+    if not route_path:
+        return None
+    segments = route_path.count("/")
+    parts = scope["path"].split("/")
+    prefix = "/".join(parts[: len(parts) - segments])
+    return prefix + route_path
+
+
+def _slug(endpoint: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", endpoint).strip("_") or "root"
+
+
+class RequestProfile:
+    """
+    Memory and CPU profile of one sampled request. The middleware brackets
+    the request with start()/finish(); CPU time is captured around the
+    endpoint function by run(), since sync endpoints execute on a threadpool
+    thread the middleware's own profiler would not see.
+    """
+
+    def __init__(self, method: str, path: str, request_id: str, trigger: str):
+        self.method = method
+        self.endpoint = path
+        self.request_id = request_id
+        self.trigger = trigger
+        self._owns_tracemalloc = False
+        self._snapshot_before = None
+        self._started = None
+        self._cpu_profile = None
+        self._cpu_text = None
+        self._token = None
+
+    def start(self):
+        self._token = _ACTIVE_PROFILE.set(self)
+        # Concurrent local requests may already be tracing; only the owner
+        # of the trace reports memory deltas
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+            self._snapshot_before = tracemalloc.take_snapshot()
+        self._started = time.perf_counter()
+
+    def run(self, func, *args, **kwargs):
+        """Call the endpoint function under the configured CPU profiler."""
+        if PROFILE_CPU == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                logger.warning("pyinstrument is not installed, using cProfile.")
+            else:
+                profiler = Profiler()
+                profiler.start()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    profiler.stop()
+                    self._cpu_text = profiler.output_text()
+        if PROFILE_CPU == "off":
+            return func(*args, **kwargs)
+        self._cpu_profile = cProfile.Profile()
+        return self._cpu_profile.runcall(func, *args, **kwargs)
+
+    def finish(
+        self, status_code: int | None, endpoint: str = None, request_id: str = None
+    ):
+        """
+        Stop tracing, then write the profile. `endpoint` and `request_id`
+        replace what was known at start(), before routing and the request id
+        middleware ran. Never raises.
+        """
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        _ACTIVE_PROFILE.reset(self._token)
+        self.endpoint = endpoint or self.endpoint
+        self.request_id = request_id or self.request_id
+        try:
+            summary = {
+                "endpoint": self.endpoint,
+                "method": self.method,
+                "status_code": status_code,
+                "request_id": self.request_id,
+                "trigger": self.trigger,
+                "stage": os.getenv("STAGE", "dev"),
+                "timestamp": datetime.utcnow().isoformat(),
+                "duration_ms": round(duration_ms, 2),
+                **self._memory_summary(),
+                "top_functions": self._top_functions(),
+            }
+            self._write(summary)
+        except Exception as e:
+            logger.warning(f"Failed to record request profile: {e}")
+        finally:
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+
+    def _memory_summary(self) -> dict:
+        if not self._owns_tracemalloc:
+            return {}
+        snapshot_after = tracemalloc.take_snapshot()
+        stats = snapshot_after.compare_to(self._snapshot_before, "filename")
+        _, peak = tracemalloc.get_traced_memory()
+        return {
+            "memory_allocated_kb": round(
+                sum(stat.size_diff for stat in stats if stat.size_diff > 0) / 1024, 2
+            ),
+            "memory_freed_kb": round(
+                -sum(stat.size_diff for stat in stats if stat.size_diff < 0) / 1024, 2
+            ),
+            "memory_peak_kb": round(peak / 1024, 2),
+            "top_allocations": [
+                {
+                    "file": str(stat.traceback),
+                    "size_diff_kb": round(stat.size_diff / 1024, 2),
+                    "count_diff": stat.count_diff,
+                }
+                for stat in stats[:PROFILE_TOP_N]
+            ],
+        }
+
+    def _top_functions(self) -> list:
+        if self._cpu_profile is None:
+            return []
+        stats = pstats.Stats(self._cpu_profile, stream=io.StringIO())
+        rows = sorted(stats.stats.items(), key=lambda row: row[1][3], reverse=True)
+        top_functions = []
+        for (filename, line, name), row in rows[:PROFILE_TOP_N]:
+            _, calls, total_time, cumulative_time, _ = row
+            top_functions.append(
+                {
+                    "function": f"{filename}:{line}({name})",
+                    "calls": calls,
+                    "total_ms": round(total_time * 1000, 3),
+                    "cumulative_ms": round(cumulative_time * 1000, 3),
+                }
+            )
+        return top_functions
+
+    def _write(self, summary: dict):
+        name = (
+            f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}"
+            f"_{self.method}_{self.request_id}"
+        )
+        artifacts = {f"{name}.json": json.dumps(summary, indent=2).encode()}
+        if self._cpu_profile is not None:
+            # Same format as cProfile's dump_stats, loadable with pstats/snakeviz
+            self._cpu_profile.create_stats()
+            artifacts[f"{name}.prof"] = marshal.dumps(self._cpu_profile.stats)
+        if self._cpu_text is not None:
+            artifacts[f"{name}.txt"] = self._cpu_text.encode()
+
+        folder = _slug(self.endpoint)
+        if PROFILE_S3_BUCKET:
+            s3 = boto3.client("s3", region_name="us-west-2")
+            # Tag values only allow letters, digits, spaces and + - = . _ : / @,
+            # so the endpoint is tagged with its slug rather than the template
+            tagging = urllib.parse.urlencode(
+                {
+                    "endpoint": folder,
+                    "method": self.method,
+                    "stage": summary["stage"],
+                    "trigger": self.trigger,
+                }
+            )
+            for filename, body in artifacts.items():
+                s3.put_object(
+                    Bucket=PROFILE_S3_BUCKET,
+                    Key=f"{PROFILE_S3_PREFIX}/{folder}/{filename}",
+                    Body=body,
+                    Tagging=tagging,
+                )
+            location = f"s3://{PROFILE_S3_BUCKET}/{PROFILE_S3_PREFIX}/{folder}/{name}"
+        else:
+            directory = os.path.join(PROFILE_OUTPUT_DIR, folder)
+            os.makedirs(directory, exist_ok=True)
+            for filename, body in artifacts.items():
+                with open(os.path.join(directory, filename), "wb") as f:
+                    f.write(body)
+            location = os.path.join(directory, name)
+
+        logger.info(
+            f"Profiled {self.method} {self.endpoint} ({self.trigger}): "
+            f"{summary['duration_ms']} ms, "
+            f"{summary.get('memory_allocated_kb', 'n/a')} KB allocated -> {location}"
+        )
@@ -0,0 +1,269 @@
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, Set, Tuple
+from aws_lambda_powertools import Logger
+import boto3
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from constants.general import SERVICE_NAME
+from dynamodb.helpers.workout_change_log_helper import WorkoutChangeLogHelper
+from helpers.lookup_cache import LookupCache
+from helpers.metrics_emitter import emit_metric
+
+logger = Logger(service=SERVICE_NAME)
+
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+# Total serialized size the per-container cache may hold
+RESPONSE_CACHE_MAX_BYTES = int(
+    os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024))
+)
+# Larger responses are never kept in memory
+RESPONSE_CACHE_MAX_ENTRY_BYTES = int(
+    os.getenv("RESPONSE_CACHE_MAX_ENTRY_BYTES", str(2 * 1024 * 1024))
+)
+# How long a container trusts a user's data version before re-reading it;
+# writes made through this container invalidate it immediately
+RESPONSE_CACHE_VERSION_TTL_SECONDS = int(
+    os.getenv("RESPONSE_CACHE_VERSION_TTL_SECONDS", "5")
+)
+# Optional shared tier across containers: "dynamodb" or "s3"
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "").lower()
+RESPONSE_CACHE_BUCKET = os.getenv("RESPONSE_CACHE_BUCKET")
+
+# Scope of responses that do not belong to a single user, e.g. /user/public_users
+GLOBAL_SCOPE = "GLOBAL"
+
+# Per-container cache: key -> (expires_at, serialized content), LRU bounded by
+# entry count and total size. Content is kept serialized so it is measured
+# exactly and callers always get their own copy.
+_RESPONSE_CACHE: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_cached_bytes = 0
+# scope -> keys stored under it, so a user's entries can be dropped together
+_SCOPE_KEYS: Dict[str, Set[str]] = {}
+_shared_backend = None
+# owner_id -> change log seq, so a cache hit costs no DynamoDB read
+_DATA_VERSIONS = LookupCache(
+    "response_cache_version", ttl_seconds=RESPONSE_CACHE_VERSION_TTL_SECONDS
+)
+
+
+class DynamoDBResponseCacheBackend:
+    """
+    Shared cache tier stored in the user table under PK 'RESPONSE_CACHE#{scope}'.
+    Expired items are removed by the table's TTL attribute.
+    """
+
+    def __init__(self):
+        self.dynamodb = boto3.resource("dynamodb", region_name="us-west-2")
+        table_name = os.getenv("TABLE_NAME", "WorkoutTracer-UserTable-Staging")
+        self.table = self.dynamodb.Table(table_name)
+
+    def get(self, scope: str, key: str) -> str | None:
+        item = self.table.get_item(
+            Key={"PK": f"RESPONSE_CACHE#{scope}", "SK": key}
+        ).get("Item")
+        if not item or int(item.get("ttl", 0)) <= time.time():
+            return None
+        return item["body"]
+
+    def set(self, scope: str, key: str, body: str, expires_at: float):
+        self.table.put_item(
+            Item={
+                "PK": f"RESPONSE_CACHE#{scope}",
+                "SK": key,
+                "body": body,
+                "ttl": int(expires_at),
+            }
+        )
+
+    def invalidate(self, scope: str):
+        query_kwargs = {
+            "KeyConditionExpression": Key("PK").eq(f"RESPONSE_CACHE#{scope}"),
+            "ProjectionExpression": "PK, SK",
+        }
+        with self.table.batch_writer() as batch:
+            while True:
+                response = self.table.query(**query_kwargs)
+                for item in response.get("Items", []):
+                    batch.delete_item(Key={"PK": item["PK"], "SK": item["SK"]})
+                last_key = response.get("LastEvaluatedKey")
+                if not last_key:
+                    break
+                query_kwargs["ExclusiveStartKey"] = last_key
+
+
+class S3ResponseCacheBackend:
+    """
+    Shared cache tier stored as 'response-cache/{scope}/{key}.json' objects in
+    RESPONSE_CACHE_BUCKET. A bucket lifecycle rule should expire old objects.
+    """
+
+    def __init__(self, bucket: str):
+        self.s3 = boto3.client("s3", region_name="us-west-2")
+        self.bucket = bucket
+
+    def _object_key(self, scope: str, key: str) -> str:
+        return f"response-cache/{scope}/{key}.json"
+
+    def get(self, scope: str, key: str) -> str | None:
+        try:
+            response = self.s3.get_object(
+                Bucket=self.bucket, Key=self._object_key(scope, key)
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return None
+            raise
+        if float(response.get("Metadata", {}).get("expires-at", 0)) <= time.time():
+            return None
+        return response["Body"].read().decode()
+
+    def set(self, scope: str, key: str, body: str, expires_at: float):
+        self.s3.put_object(
+            Bucket=self.bucket,
+            Key=self._object_key(scope, key),
+            Body=body.encode(),
+            ContentType="application/json",
+            Metadata={"expires-at": str(int(expires_at))},
+        )
+
+    def invalidate(self, scope: str):
+        paginator = self.s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(
+            Bucket=self.bucket, Prefix=f"response-cache/{scope}/"
+        ):
+            objects = [{"Key": obj["Key"]} for obj in page.get("Contents", [])]
+            if objects:
+                self.s3.delete_objects(
+                    Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True}
+                )
+
+
+def _get_shared_backend():
+    """Create the configured shared tier once per container; None if disabled."""
+    global _shared_backend
+    if _shared_backend is None:
+        if RESPONSE_CACHE_BACKEND == "dynamodb":
+            _shared_backend = DynamoDBResponseCacheBackend()
+        elif RESPONSE_CACHE_BACKEND == "s3" and RESPONSE_CACHE_BUCKET:
+            _shared_backend = S3ResponseCacheBackend(RESPONSE_CACHE_BUCKET)
+        else:
+            _shared_backend = False
+    return _shared_backend or None
+
+
+def build_cache_key(route: str, params: dict, scope: str, version) -> str:
+    """Stable digest of route, query params, owner scope and data version."""
+    raw = json.dumps([route, scope, version, sorted(params.items())], default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _forget(key: str):
+    global _cached_bytes
+    entry = _RESPONSE_CACHE.pop(key, None)
+    if entry:
+        _cached_bytes -= len(entry[1])
+
+
+def _remember(scope: str, key: str, body: str, expires_at: float):
+    """Keep a serialized response, evicting least recently used entries."""
+    global _cached_bytes
+    if len(body) > RESPONSE_CACHE_MAX_ENTRY_BYTES:
+        logger.debug(f"Not caching a {len(body)} character response in memory")
+        return
+    _forget(key)
+    _RESPONSE_CACHE[key] = (expires_at, body)
+    _cached_bytes += len(body)
+    _SCOPE_KEYS.setdefault(scope, set()).add(key)
+    while (
+        len(_RESPONSE_CACHE) > RESPONSE_CACHE_MAX_ENTRIES
+        or _cached_bytes > RESPONSE_CACHE_MAX_BYTES
+    ):
+        evicted = next(iter(_RESPONSE_CACHE))
+        _forget(evicted)
+        for keys in _SCOPE_KEYS.values():
+            keys.discard(evicted)
+
+
+def get_or_build(
+    route: str,
+    params: dict,
+    build: Callable[[], dict],
+    owner_id: str = None,
+    request_id: str = None,
+) -> dict:
+    """
+    Return the cached JSON content for route + params, or call build() and
+    cache its result for RESPONSE_CACHE_TTL_SECONDS. Every call returns its
+    own copy, so callers may modify it.
+    When owner_id is given the key also includes the owner's data version
+    (their change log sequence number), so any workout write makes earlier
+    entries unreachable even in other containers, after at most
+    RESPONSE_CACHE_VERSION_TTL_SECONDS. Without an owner, entries live in the
+    global scope and expire by TTL or explicit invalidation.
+    """
+    scope = owner_id or GLOBAL_SCOPE
+    version = _data_version(owner_id, request_id) if owner_id else None
+    key = build_cache_key(route, params, scope, version)
+    now = time.time()
+
+    cached = _RESPONSE_CACHE.get(key)
+    if cached and cached[0] > now:
+        _RESPONSE_CACHE.move_to_end(key)
+        emit_metric("ResponseCacheHit", {"Route": route, "Tier": "memory"})
+        return json.loads(cached[1])
+
+    backend = _get_shared_backend()
+    if backend:
+        try:
+            body = backend.get(scope, key)
+        except Exception as e:
+            logger.warning(f"Shared response cache read failed for {route}: {e}")
+            body = None
+        if body is not None:
+            emit_metric("ResponseCacheHit", {"Route": route, "Tier": "shared"})
+            _remember(scope, key, body, now + RESPONSE_CACHE_TTL_SECONDS)
+            return json.loads(body)
+
+    emit_metric("ResponseCacheMiss", {"Route": route})
+    content = build()
+    body = json.dumps(content, separators=(",", ":"))
+    expires_at = now + RESPONSE_CACHE_TTL_SECONDS
+    _remember(scope, key, body, expires_at)
+    if backend:
+        try:
+            backend.set(scope, key, body, expires_at)
+        except Exception as e:
+            logger.warning(f"Shared response cache write failed for {route}: {e}")
+    return content
+
+
+def _data_version(owner_id: str, request_id: str = None) -> int:
+    version = _DATA_VERSIONS.get(owner_id)
+    if LookupCache.is_missing(version):
+        version = WorkoutChangeLogHelper(request_id=request_id).get_latest_seq(owner_id)
+        _DATA_VERSIONS.set(owner_id, version)
+    return version
+
+
+def invalidate(owner_id: str = None):
+    """
+    Drop cached responses for a user (or the global scope when owner_id is
+    None) in this container and in the shared tier. Call after writes.
+    """
+    scope = owner_id or GLOBAL_SCOPE
+    if owner_id:
+        _DATA_VERSIONS.invalidate(owner_id)
+    for key in _SCOPE_KEYS.pop(scope, set()):
+        _forget(key)
+    backend = _get_shared_backend()
+    if backend:
+        try:
+            backend.invalidate(scope)
+        except Exception as e:
+            logger.warning(f"Shared response cache invalidation failed: {e}")
+    logger.debug(f"Invalidated cached responses for scope {scope}")
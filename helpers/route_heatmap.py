@@ -0,0 +1,335 @@
+from collections import OrderedDict
+import struct
+import zlib
+from typing import Dict, Tuple
+from aws_lambda_powertools import Logger
+import numpy as np
+from constants.general import SERVICE_NAME
+from dynamodb.helpers.strava_workout_helper import StravaWorkoutHelper
+from dynamodb.helpers.apple_health_workout_helper import AppleHealthWorkoutHelper
+from dynamodb.helpers.workout_change_log_helper import WorkoutChangeLogHelper
+from helpers.polyline_codec import decode as decode_polyline
+
+logger = Logger(service=SERVICE_NAME)
+
+HEATMAP_SOURCES = ("strava", "apple_health")
+HEATMAP_TILE_SIZE = 256
+# Route segments are resampled every ~20 m (in normalized Web Mercator units)
+# so sparse polylines still paint continuous lines
+HEATMAP_SAMPLE_SPACING = 5e-7
+# Pixels crossed by this many routes render at full intensity
+HEATMAP_SATURATION_PASSES = 50
+# Beyond this many pending change events a full reload is cheaper than deltas
+HEATMAP_INCREMENTAL_MAX_CHANGES = 1000
+MAX_WEB_MERCATOR_LAT = 85.05112878
+
+# Attribute names per source, plus the projection that reads only route data
+HEATMAP_SOURCE_FIELDS = {
+    "strava": {
+        "id": "id",
+        "projection_expression": "id, #m.summary_polyline",
+        "expression_attribute_names": {"#m": "map"},
+    },
+    "apple_health": {
+        "id": "workout_uuid",
+        "projection_expression": "workout_uuid, summary_polyline",
+        "expression_attribute_names": None,
+    },
+}
+
+# Per-container caches, LRU bounded:
+# user_id -> RoutePoints
+_POINTS_CACHE: "OrderedDict[str, RoutePoints]" = OrderedDict()
+_POINTS_CACHE_MAX_USERS = 16
+# (user_id, data version, sources, image key) -> PNG bytes
+_IMAGE_CACHE: "OrderedDict[tuple, bytes]" = OrderedDict()
+_IMAGE_CACHE_MAX_IMAGES = 256
+
+
+def heatmap_sources(source: str | None) -> tuple | None:
+    """Resolve a source query value to a tuple of sources, or None if invalid."""
+    if source in (None, "all"):
+        return HEATMAP_SOURCES
+    if source in HEATMAP_SOURCES:
+        return (source,)
+    return None
+
+
+def _summary_polyline(source: str, workout: dict) -> str | None:
+    if source == "strava":
+        return (workout.get("map") or {}).get("summary_polyline")
+    return workout.get("summary_polyline")
+
+
+def route_samples(encoded: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode a polyline into normalized Web Mercator (x, y) in [0, 1), y growing
+    southwards, resampled so consecutive points are at most
+    HEATMAP_SAMPLE_SPACING apart.
+    """
+    coords = decode_polyline(encoded)
+    if not len(coords):
+        return np.empty(0), np.empty(0)
+    lat = np.radians(np.clip(coords[:, 0], -MAX_WEB_MERCATOR_LAT, MAX_WEB_MERCATOR_LAT))
+    xs = (coords[:, 1] + 180.0) / 360.0
+    ys = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0
+    if len(xs) == 1:
+        return xs, ys
+
+    dx, dy = np.diff(xs), np.diff(ys)
+    steps = np.maximum(
+        np.ceil(np.hypot(dx, dy) / HEATMAP_SAMPLE_SPACING).astype(np.int64), 1
+    )
+    segment = np.repeat(np.arange(len(steps)), steps)
+    offset = np.arange(steps.sum()) - np.repeat(np.cumsum(steps) - steps, steps)
+    t = offset / steps[segment]
+    return (
+        np.append(xs[segment] + t * dx[segment], xs[-1]),
+        np.append(ys[segment] + t * dy[segment], ys[-1]),
+    )
+
+
+class RoutePoints:
+    """
+    Resampled route points of one user's workouts, keyed per workout so the
+    set can be patched from change log deltas instead of reloaded.
+    `version` is the change log sequence number the points reflect.
+    """
+
+    def __init__(self, version: int):
+        self.version = version
+        self.routes: Dict[tuple, Tuple[np.ndarray, np.ndarray]] = {}
+        self._merged: Dict[tuple, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def set_route(self, source: str, workout_id, encoded: str | None):
+        """Replace (or with no polyline, remove) one workout's points."""
+        self._merged.clear()
+        key = (source, workout_id)
+        if not encoded:
+            self.routes.pop(key, None)
+            return
+        try:
+            self.routes[key] = route_samples(encoded)
+        except Exception as e:
+            logger.warning(f"Skipping undecodable route {workout_id}: {e}")
+            self.routes.pop(key, None)
+
+    def points(self, sources: tuple) -> Tuple[np.ndarray, np.ndarray]:
+        """All points of the given sources as two flat arrays."""
+        if sources not in self._merged:
+            parts = [
+                samples
+                for (source, _), samples in self.routes.items()
+                if source in sources
+            ]
+            self._merged[sources] = (
+                np.concatenate([x for x, _ in parts]) if parts else np.empty(0),
+                np.concatenate([y for _, y in parts]) if parts else np.empty(0),
+            )
+        return self._merged[sources]
+
+
+def _workout_helpers(request_id: str = None) -> dict:
+    return {
+        "strava": StravaWorkoutHelper(request_id=request_id),
+        "apple_health": AppleHealthWorkoutHelper(request_id=request_id),
+    }
+
+
+def _load_points(user_id: str, version: int, request_id: str = None) -> RoutePoints:
+    points = RoutePoints(version)
+    for source, helper in _workout_helpers(request_id).items():
+        fields = HEATMAP_SOURCE_FIELDS[source]
+        for workout in helper.iter_all_workouts(
+            user_id,
+            projection_expression=fields["projection_expression"],
+            expression_attribute_names=fields["expression_attribute_names"],
+        ):
+            points.set_route(
+                source, workout.get(fields["id"]), _summary_polyline(source, workout)
+            )
+    return points
+
+
+def _apply_changes(
+    user_id: str, points: RoutePoints, version: int, request_id: str = None
+) -> bool:
+    """
+    Patch cached points with the workouts changed since points.version.
+    Returns False when there are too many changes and a reload is cheaper.
+    """
+    change_log_helper = WorkoutChangeLogHelper(request_id=request_id)
+    changes, since = [], points.version
+    while since < version:
+        result = change_log_helper.get_changes(user_id, since=since)
+        changes.extend(result["changes"])
+        if len(changes) > HEATMAP_INCREMENTAL_MAX_CHANGES:
+            return False
+        if result["next_since"] == since:
+            break
+        since = result["next_since"]
+
+    helpers = _workout_helpers(request_id)
+    for change in WorkoutChangeLogHelper.latest_per_workout(changes):
+        source, workout_id = change["source"], change["workout_id"]
+        if source not in HEATMAP_SOURCE_FIELDS:
+            continue
+        workout = None
+        if change["action"] != "delete":
+            fields = HEATMAP_SOURCE_FIELDS[source]
+            get_workout = (
+                helpers[source].get_strava_workout
+                if source == "strava"
+                else helpers[source].get_apple_health_workout
+            )
+            workout = get_workout(
+                user_id,
+                workout_id,
+                projection_expression=fields["projection_expression"],
+                expression_attribute_names=fields["expression_attribute_names"],
+            )
+        points.set_route(
+            source, workout_id, _summary_polyline(source, workout) if workout else None
+        )
+    points.version = max(since, version)
+    logger.info(
+        f"Applied {len(changes)} route changes to heatmap points for {user_id} (version {points.version})"
+    )
+    return True
+
+
+def load_route_points(user_id: str, request_id: str = None) -> RoutePoints:
+    """
+    Return the user's resampled route points at the current data version.
+    Warm containers only fetch the workouts written since the cached version.
+    """
+    version = WorkoutChangeLogHelper(request_id=request_id).get_latest_seq(user_id)
+    points = _POINTS_CACHE.get(user_id)
+    if points is not None and points.version < version:
+        if not _apply_changes(user_id, points, version, request_id=request_id):
+            points = None
+    if points is None:
+        points = _load_points(user_id, version, request_id=request_id)
+        logger.info(
+            f"Loaded {len(points.routes)} routes into heatmap points for {user_id} (version {version})"
+        )
+    _POINTS_CACHE[user_id] = points
+    _POINTS_CACHE.move_to_end(user_id)
+    while len(_POINTS_CACHE) > _POINTS_CACHE_MAX_USERS:
+        _POINTS_CACHE.popitem(last=False)
+    return points
+
+
+def _colorize(intensity: np.ndarray) -> np.ndarray:
+    """Map intensities in [0, 1] to RGBA: transparent, red, orange, pale yellow."""
+    stops = np.array([0.0, 0.001, 0.5, 1.0])
+    colors = np.array(
+        [
+            [0, 0, 0, 0],
+            [200, 0, 0, 110],
+            [255, 140, 0, 210],
+            [255, 255, 190, 255],
+        ],
+        dtype=np.float64,
+    )
+    rgba = np.empty(intensity.shape + (4,), dtype=np.uint8)
+    for channel in range(4):
+        rgba[..., channel] = np.interp(intensity, stops, colors[:, channel])
+    return rgba
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """Encode an (height, width, 4) uint8 array as an RGBA PNG."""
+    height, width = rgba.shape[:2]
+    # Every scanline is prefixed with filter type 0 (none)
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgba.reshape(height, width * 4)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + tag
+            + data
+            + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+        )
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def render_heatmap(
+    xs: np.ndarray,
+    ys: np.ndarray,
+    bounds: Tuple[float, float, float, float],
+    size: int,
+) -> bytes:
+    """
+    Render points within (min_x, min_y, max_x, max_y) in normalized Web
+    Mercator to a size x size PNG. Sample counts are converted to
+    approximate route passes per pixel so brightness is comparable across
+    zoom levels and tiles.
+    """
+    min_x, min_y, max_x, max_y = bounds
+    counts, _, _ = np.histogram2d(
+        ys, xs, bins=size, range=[[min_y, max_y], [min_x, max_x]]
+    )
+    samples_per_pass = max((max_x - min_x) / size / HEATMAP_SAMPLE_SPACING, 1.0)
+    passes = counts / samples_per_pass
+    intensity = np.clip(
+        np.log1p(passes) / np.log1p(HEATMAP_SATURATION_PASSES), 0.0, 1.0
+    )
+    return encode_png(_colorize(intensity))
+
+
+def _cached_image(key: tuple, render) -> bytes:
+    image = _IMAGE_CACHE.get(key)
+    if image is not None:
+        _IMAGE_CACHE.move_to_end(key)
+        return image
+    image = render()
+    _IMAGE_CACHE[key] = image
+    while len(_IMAGE_CACHE) > _IMAGE_CACHE_MAX_IMAGES:
+        _IMAGE_CACHE.popitem(last=False)
+    return image
+
+
+def get_heatmap_tile(
+    user_id: str, z: int, x: int, y: int, sources: tuple, request_id: str = None
+) -> Tuple[int, bytes]:
+    """Return (data version, PNG bytes) for XYZ tile z/x/y of the user's heatmap."""
+    points = load_route_points(user_id, request_id=request_id)
+    n = 2**z
+    bounds = (x / n, y / n, (x + 1) / n, (y + 1) / n)
+    png = _cached_image(
+        (user_id, points.version, sources, ("tile", z, x, y)),
+        lambda: render_heatmap(*points.points(sources), bounds, HEATMAP_TILE_SIZE),
+    )
+    return points.version, png
+
+
+def get_heatmap_image(
+    user_id: str, size: int, sources: tuple, request_id: str = None
+) -> Tuple[int, bytes]:
+    """
+    Return (data version, PNG bytes) of a single square heatmap framing all
+    of the user's routes.
+    """
+    points = load_route_points(user_id, request_id=request_id)
+
+    def render():
+        xs, ys = points.points(sources)
+        if not len(xs):
+            return render_heatmap(xs, ys, (0.0, 0.0, 1.0, 1.0), size)
+        center_x = (xs.min() + xs.max()) / 2
+        center_y = (ys.min() + ys.max()) / 2
+        # Square frame with a 5% margin so edge routes are not cut off
+        half = max(xs.max() - xs.min(), ys.max() - ys.min(), 1e-5) * 0.55
+        bounds = (center_x - half, center_y - half, center_x + half, center_y + half)
+        return render_heatmap(xs, ys, bounds, size)
+
+    png = _cached_image((user_id, points.version, sources, ("image", size)), render)
+    return points.version, png
@@ -0,0 +1,236 @@
+from collections import OrderedDict
+import math
+from typing import Dict, List, Tuple
+from aws_lambda_powertools import Logger
+from constants.general import SERVICE_NAME
+from dynamodb.helpers.strava_workout_helper import StravaWorkoutHelper
+from dynamodb.helpers.apple_health_workout_helper import AppleHealthWorkoutHelper
+from dynamodb.helpers.workout_change_log_helper import WorkoutChangeLogHelper
+from helpers.polyline_resolution import POLYLINE_TOLERANCES, polyline_variant_field
+
+logger = Logger(service=SERVICE_NAME)
+
+MAX_TILE_ZOOM = 18
+# Coordinates are rounded to ~0.1 m, far below a pixel at MAX_TILE_ZOOM
+TILE_COORD_PRECISION = 6
+
+# Attribute names per source, plus the projection that reads only route data
+ROUTE_SOURCES = {
+    "strava": {
+        "id": "id",
+        "type": "type",
+        "projection_expression": (
+            "id, #t, #m.summary_polyline, #m.summary_polyline_low, "
+            "#m.summary_polyline_medium"
+        ),
+        "expression_attribute_names": {"#t": "type", "#m": "map"},
+    },
+    "apple_health": {
+        "id": "workout_uuid",
+        "type": "workout_activity_type",
+        "projection_expression": (
+            "workout_uuid, workout_activity_type, summary_polyline, "
+            "summary_polyline_low, summary_polyline_medium"
+        ),
+        "expression_attribute_names": None,
+    },
+}
+
+# Per-container caches, LRU bounded:
+# user_id -> (data version, RouteIndex)
+_ROUTE_INDEX_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+_ROUTE_INDEX_CACHE_MAX_USERS = 16
+# (user_id, data version, z, x, y, include_source) -> GeoJSON FeatureCollection
+_TILE_CACHE: "OrderedDict[tuple, dict]" = OrderedDict()
+_TILE_CACHE_MAX_TILES = 512
+
+
+def detail_for_zoom(z: int) -> str:
+    """Pick the coarsest polyline variant that still looks right at a zoom level."""
+    if z <= 9:
+        return "low"
+    if z <= 13:
+        return "medium"
+    return "full"
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """Return (west, south, east, north) in degrees of a Web Mercator XYZ tile."""
+    n = 2**z
+
+    def lon(tile_x):
+        return tile_x / n * 360.0 - 180.0
+
+    def lat(tile_y):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return lon(x), lat(y + 1), lon(x + 1), lat(y)
+
+
+class RouteIndex:
+    """
+    A user's decoded routes with one STRtree per polyline detail level,
+    built lazily the first time a tile at that level is requested.
+    """
+
+    def __init__(self, routes: List[dict]):
+        # Each route: {"source", "id", "type", "polylines": {detail: encoded}}
+        self.routes = routes
+        self._trees: Dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self.routes)
+
+    def _tree(self, detail: str) -> tuple:
+        if detail in self._trees:
+            return self._trees[detail]
+
+        from shapely.geometry import LineString
+        from shapely.strtree import STRtree
+        from helpers.polyline_codec import decode as decode_polyline
+
+        route_indexes, lines = [], []
+        for index, route in enumerate(self.routes):
+            encoded = route["polylines"].get(detail)
+            simplify = encoded is None
+            if simplify:
+                # Stored before variants existed; simplify the full route here
+                encoded = route["polylines"].get("full")
+            try:
+                coords = decode_polyline(encoded)
+            except Exception as e:
+                logger.warning(f"Skipping undecodable route {route['id']}: {e}")
+                continue
+            if len(coords) < 2:
+                continue
+            line = LineString(coords[:, ::-1])
+            if simplify and detail in POLYLINE_TOLERANCES:
+                line = line.simplify(POLYLINE_TOLERANCES[detail])
+            route_indexes.append(index)
+            lines.append(line)
+
+        self._trees[detail] = (route_indexes, lines, STRtree(lines))
+        return self._trees[detail]
+
+    def tile(self, z: int, x: int, y: int, include_source: bool = False) -> dict:
+        """Clip every route crossing tile z/x/y and return a GeoJSON FeatureCollection."""
+        from shapely.geometry import box
+
+        route_indexes, lines, tree = self._tree(detail_for_zoom(z))
+        tile_box = box(*tile_bounds(z, x, y))
+        features = []
+        for line_index in tree.query(tile_box, predicate="intersects"):
+            clipped = lines[line_index].intersection(tile_box)
+            parts = [
+                [
+                    [
+                        round(lon, TILE_COORD_PRECISION),
+                        round(lat, TILE_COORD_PRECISION),
+                    ]
+                    for lon, lat in part.coords
+                ]
+                for part in getattr(clipped, "geoms", [clipped])
+                if part.geom_type == "LineString" and not part.is_empty
+            ]
+            if not parts:
+                continue
+            route = self.routes[route_indexes[line_index]]
+            properties = {"id": route["id"], "type": route["type"]}
+            if include_source:
+                properties["source"] = route["source"]
+            features.append(
+                {
+                    "type": "Feature",
+                    "geometry": (
+                        {"type": "LineString", "coordinates": parts[0]}
+                        if len(parts) == 1
+                        else {"type": "MultiLineString", "coordinates": parts}
+                    ),
+                    "properties": properties,
+                }
+            )
+        return {"type": "FeatureCollection", "features": features}
+
+
+def _load_routes(user_id: str, request_id: str = None) -> List[dict]:
+    helpers = {
+        "strava": StravaWorkoutHelper(request_id=request_id),
+        "apple_health": AppleHealthWorkoutHelper(request_id=request_id),
+    }
+    routes = []
+    for source, helper in helpers.items():
+        fields = ROUTE_SOURCES[source]
+        for workout in helper.iter_all_workouts(
+            user_id,
+            projection_expression=fields["projection_expression"],
+            expression_attribute_names=fields["expression_attribute_names"],
+        ):
+            container = (workout.get("map") or {}) if source == "strava" else workout
+            if not container.get("summary_polyline"):
+                continue
+            polylines = {
+                detail: container[polyline_variant_field(detail)]
+                for detail in ("full",) + tuple(POLYLINE_TOLERANCES)
+                if container.get(polyline_variant_field(detail))
+            }
+            routes.append(
+                {
+                    "source": source,
+                    "id": workout.get(fields["id"]),
+                    "type": workout.get(fields["type"]),
+                    "polylines": polylines,
+                }
+            )
+    return routes
+
+
+def load_route_index(
+    user_id: str, request_id: str = None, version: int = None
+) -> Tuple[int, RouteIndex]:
+    """
+    Return (data version, RouteIndex) for a user, reloading routes from
+    DynamoDB only when the user's change log sequence number has moved.
+    Pass `version` when the caller has already read it.
+    """
+    if version is None:
+        version = WorkoutChangeLogHelper(request_id=request_id).get_latest_seq(user_id)
+    cached = _ROUTE_INDEX_CACHE.get(user_id)
+    if cached and cached[0] == version:
+        _ROUTE_INDEX_CACHE.move_to_end(user_id)
+        return cached
+
+    index = RouteIndex(_load_routes(user_id, request_id=request_id))
+    logger.info(f"Loaded {len(index)} routes for {user_id} (version {version})")
+    _ROUTE_INDEX_CACHE[user_id] = (version, index)
+    _ROUTE_INDEX_CACHE.move_to_end(user_id)
+    while len(_ROUTE_INDEX_CACHE) > _ROUTE_INDEX_CACHE_MAX_USERS:
+        _ROUTE_INDEX_CACHE.popitem(last=False)
+    return version, index
+
+
+def get_route_tile(
+    user_id: str,
+    z: int,
+    x: int,
+    y: int,
+    include_source: bool = False,
+    request_id: str = None,
+    version: int = None,
+) -> Tuple[int, dict]:
+    """
+    Return (data version, GeoJSON FeatureCollection) for tile z/x/y of a
+    user's routes. Tiles are cached per data version, so a workout write
+    invalidates them without any explicit purge.
+    """
+    version, index = load_route_index(user_id, request_id=request_id, version=version)
+    key = (user_id, version, z, x, y, include_source)
+    tile = _TILE_CACHE.get(key)
+    if tile is not None:
+        _TILE_CACHE.move_to_end(key)
+        return version, tile
+
+    tile = index.tile(z, x, y, include_source=include_source)
+    _TILE_CACHE[key] = tile
+    while len(_TILE_CACHE) > _TILE_CACHE_MAX_TILES:
+        _TILE_CACHE.popitem(last=False)
+    return version, tile
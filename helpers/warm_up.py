@@ -0,0 +1,113 @@
+from functools import partial
+import os
+import time
+from typing import Callable, Dict, Iterable
+from aws_lambda_powertools import Logger
+from constants.general import SERVICE_NAME, KML_LOCATION_FILES
+from helpers.lazy_import import lazy_import
+
+logger = Logger(service=SERVICE_NAME)
+
+boto3 = lazy_import("boto3")
+
+# Kill switch: set WARM_UP_ENABLED=false to skip all warm-up at init
+WARM_UP_ENABLED = os.getenv("WARM_UP_ENABLED", "true").lower() == "true"
+# Optional comma separated list that replaces a function's declared items
+WARM_UP_ITEMS = os.getenv("WARM_UP_ITEMS")
+
+# Clients whose service models are worth loading ahead of the first request
+WARM_UP_CLIENTS = ("s3", "sqs", "secretsmanager", "kms", "sns", "lambda")
+
+_WARMERS: Dict[str, Callable[[], None]] = {}
+# Items already warmed in this container
+_WARMED = set()
+
+
+def warmer(name: str):
+    """Register a warm-up item under `name`."""
+
+    def register(func: Callable[[], None]) -> Callable[[], None]:
+        _WARMERS[name] = func
+        return func
+
+    return register
+
+
+def _warm_client(service: str):
+    # The first client per service loads its model JSON; later ones reuse it
+    boto3.client(service, region_name="us-west-2")
+
+
+for _service in WARM_UP_CLIENTS:
+    warmer(_service)(partial(_warm_client, _service))
+
+
+@warmer("dynamodb")
+def _warm_dynamodb():
+    table_name = os.getenv("TABLE_NAME", "WorkoutTracer-UserTable-Staging")
+    boto3.resource("dynamodb", region_name="us-west-2").Table(table_name)
+
+
+@warmer("strava_keys")
+def _warm_strava_keys():
+    from clients.strava_client import get_strava_keys
+
+    get_strava_keys()
+
+
+@warmer("pagination_token_key")
+def _warm_pagination_token_key():
+    from endpoints.public.get_public_workouts import get_pagination_token_key
+
+    get_pagination_token_key()
+
+
+@warmer("jwks")
+def _warm_jwks():
+    from helpers.jwt import JWT_VERIFICATION, refresh_jwks
+
+    if JWT_VERIFICATION != "off":
+        refresh_jwks()
+
+
+def _warm_location_layer(location_type: str):
+    from dynamodb.helpers.location_helper import LocationHelper
+
+    LocationHelper().get_geometry_index(KML_LOCATION_FILES[location_type])
+
+
+for _location_type in KML_LOCATION_FILES:
+    warmer(f"kml_{_location_type}")(partial(_warm_location_layer, _location_type))
+
+
+def warm_up(items: Iterable[str]) -> Dict[str, float]:
+    """
+    Run the named warm-up items, meant for module init where Lambda runs at
+    full CPU. Each item runs once per container; failures are logged and
+    skipped so a cold dependency never blocks init. Returns ms per item.
+    """
+    if not WARM_UP_ENABLED:
+        logger.info("Warm-up disabled by WARM_UP_ENABLED.")
+        return {}
+    if WARM_UP_ITEMS is not None:
+        items = [item.strip() for item in WARM_UP_ITEMS.split(",") if item.strip()]
+
+    timings = {}
+    for name in items:
+        if name in _WARMED:
+            continue
+        func = _WARMERS.get(name)
+        if func is None:
+            logger.warning(f"Unknown warm-up item '{name}', skipping.")
+            continue
+        started = time.perf_counter()
+        try:
+            func()
+            _WARMED.add(name)
+        except Exception as e:
+            logger.warning(f"Warm-up item '{name}' failed: {e}")
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(f"Warm-up {name}: {timings[name]} ms")
+
+    logger.info(f"Warm-up finished in {round(sum(timings.values()), 1)} ms")
+    return timings
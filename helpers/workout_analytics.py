@@ -0,0 +1,296 @@
+from collections import OrderedDict
+from typing import Dict, List
+from aws_lambda_powertools import Logger
+import numpy as np
+from constants.general import SERVICE_NAME
+from dynamodb.helpers.strava_workout_helper import StravaWorkoutHelper
+from dynamodb.helpers.apple_health_workout_helper import AppleHealthWorkoutHelper
+from dynamodb.helpers.workout_change_log_helper import WorkoutChangeLogHelper
+from dynamodb.models.workout_summary import WorkoutSummary
+
+logger = Logger(service=SERVICE_NAME)
+
+# Projection that loads the WorkoutSummary attributes the columns use, per source
+ANALYTICS_SOURCES = {
+    "strava": {
+        "projection_expression": (
+            "#t, distance, moving_time, total_elevation_gain, start_date_local"
+        ),
+        "expression_attribute_names": {"#t": "type"},
+    },
+    "apple_health": {
+        "projection_expression": (
+            "workout_activity_type, total_distance, #d, elevation_ascended, start_date"
+        ),
+        "expression_attribute_names": {"#d": "duration"},
+    },
+}
+
+NUMERIC_FIELDS = ("distance", "moving_time", "elevation")
+GROUP_BY_KEYS = ("sport", "week", "month", "year")
+# Longest daily series rolling_daily returns, about five years
+MAX_ROLLING_DAYS = 1827
+
+# Per-container cache: user_id -> (data version, WorkoutColumns), LRU bounded
+_COLUMN_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+_COLUMN_CACHE_MAX_USERS = 32
+
+
+def _to_start_times(start_dates: List[str]) -> np.ndarray:
+    """
+    Convert start date strings to datetime64[s]. A string NumPy cannot parse
+    becomes NaT and is logged, like WorkoutStatsHelper._buckets, so one bad
+    row only drops out of the time groupings.
+    """
+    try:
+        return np.asarray(start_dates, dtype="datetime64[s]")
+    except ValueError:
+        pass
+    start_times = np.empty(len(start_dates), dtype="datetime64[s]")
+    for index, start_date in enumerate(start_dates):
+        try:
+            start_times[index] = np.datetime64(start_date, "s")
+        except ValueError:
+            logger.warning(f"Unparseable start_date for analytics: {start_date}")
+            start_times[index] = np.datetime64("NaT")
+    return start_times
+
+
+class WorkoutColumns:
+    """
+    A user's workouts held as NumPy column arrays, one row per workout.
+    Sports are stored as small integer codes into `sport_names`, and start
+    times as naive local datetime64[s] values (NaT when unknown).
+    """
+
+    def __init__(
+        self,
+        distance: np.ndarray,
+        moving_time: np.ndarray,
+        elevation: np.ndarray,
+        sport_codes: np.ndarray,
+        sport_names: List[str],
+        start_times: np.ndarray,
+    ):
+        self.distance = distance
+        self.moving_time = moving_time
+        self.elevation = elevation
+        self.sport_codes = sport_codes
+        self.sport_names = sport_names
+        self.start_times = start_times
+
+    def __len__(self) -> int:
+        return len(self.distance)
+
+    @classmethod
+    def from_workouts(cls, rows) -> "WorkoutColumns":
+        """
+        Build columns from an iterable of (source, raw workout dict) pairs.
+        Missing numeric values become 0.
+        """
+        distance, moving_time, elevation, sport_codes, start_dates = (
+            [],
+            [],
+            [],
+            [],
+            [],
+        )
+        sport_index: Dict[str, int] = {}
+        for source, workout in rows:
+            summary = WorkoutSummary.from_item(source, workout)
+            distance.append(summary.distance or 0)
+            moving_time.append(summary.moving_time or 0)
+            elevation.append(summary.elevation_gain or 0)
+            sport = summary.workout_type or "unknown"
+            sport_codes.append(sport_index.setdefault(sport, len(sport_index)))
+            start_date = summary.start_date
+            # Drop any timezone suffix; rollups bucket by local date too
+            start_dates.append(str(start_date)[:19] if start_date else "NaT")
+
+        return cls(
+            distance=np.asarray(distance, dtype=np.float64),
+            moving_time=np.asarray(moving_time, dtype=np.float64),
+            elevation=np.asarray(elevation, dtype=np.float64),
+            sport_codes=np.asarray(sport_codes, dtype=np.int16),
+            sport_names=list(sport_index),
+            start_times=_to_start_times(start_dates),
+        )
+
+    def field(self, name: str) -> np.ndarray:
+        if name not in NUMERIC_FIELDS:
+            raise ValueError(f"Unknown field '{name}'")
+        return getattr(self, name)
+
+    def sport_mask(self, sport: str = None) -> np.ndarray:
+        """Boolean row mask for one sport, or all rows when sport is None."""
+        if sport is None:
+            return np.ones(len(self), dtype=bool)
+        if sport not in self.sport_names:
+            return np.zeros(len(self), dtype=bool)
+        return self.sport_codes == self.sport_names.index(sport)
+
+    def group_keys(self, key: str):
+        """
+        Return (integer group code per row, label per code) for a group-by key.
+        Rows without a start time are excluded from time groupings via code -1.
+        """
+        if key == "sport":
+            return self.sport_codes.astype(np.int64), list(self.sport_names)
+        if key not in GROUP_BY_KEYS:
+            raise ValueError(f"Unknown group_by key '{key}'")
+
+        valid = ~np.isnat(self.start_times)
+        days = self.start_times.astype("datetime64[D]")
+        if key == "week":
+            # 1970-01-01 was a Thursday; shift so periods start on Monday
+            periods = (days - np.timedelta64(4, "D")).astype(
+                "datetime64[W]"
+            ) + np.timedelta64(4, "D")
+            periods = periods.astype("datetime64[D]")
+        elif key == "month":
+            periods = days.astype("datetime64[M]")
+        else:
+            periods = days.astype("datetime64[Y]")
+
+        codes = np.full(len(self), -1, dtype=np.int64)
+        if not valid.any():
+            return codes, []
+        unique_periods, inverse = np.unique(periods[valid], return_inverse=True)
+        codes[valid] = inverse
+        return codes, [str(period) for period in unique_periods]
+
+
+def load_workout_columns(user_id: str, request_id: str = None) -> WorkoutColumns:
+    """
+    Return the user's workouts as columns, loading them from DynamoDB once per
+    data version. The version is the user's change log sequence number, so any
+    workout write invalidates the cached arrays at the cost of one GetItem.
+    """
+    version = WorkoutChangeLogHelper(request_id=request_id).get_latest_seq(user_id)
+    cached = _COLUMN_CACHE.get(user_id)
+    if cached and cached[0] == version:
+        _COLUMN_CACHE.move_to_end(user_id)
+        logger.debug(f"Using cached workout columns for {user_id} (version {version})")
+        return cached[1]
+
+    helpers = {
+        "strava": StravaWorkoutHelper(request_id=request_id),
+        "apple_health": AppleHealthWorkoutHelper(request_id=request_id),
+    }
+
+    def rows():
+        for source, helper in helpers.items():
+            fields = ANALYTICS_SOURCES[source]
+            for workout in helper.iter_all_workouts(
+                user_id,
+                projection_expression=fields["projection_expression"],
+                expression_attribute_names=fields["expression_attribute_names"],
+            ):
+                yield source, workout
+
+    columns = WorkoutColumns.from_workouts(rows())
+    logger.info(
+        f"Loaded {len(columns)} workouts into columns for {user_id} (version {version})"
+    )
+    _COLUMN_CACHE[user_id] = (version, columns)
+    _COLUMN_CACHE.move_to_end(user_id)
+    while len(_COLUMN_CACHE) > _COLUMN_CACHE_MAX_USERS:
+        _COLUMN_CACHE.popitem(last=False)
+    return columns
+
+
+def group_by(
+    columns: WorkoutColumns,
+    key: str,
+    sport: str = None,
+    percentiles: List[float] = None,
+) -> List[dict]:
+    """
+    Aggregate count and totals of every numeric field per group, optionally
+    restricted to one sport. When percentiles are given, each group also gets
+    those percentiles of every numeric field.
+    """
+    codes, labels = columns.group_keys(key)
+    mask = columns.sport_mask(sport) & (codes >= 0)
+    codes = codes[mask]
+    counts = np.bincount(codes, minlength=len(labels))
+    totals = {
+        name: np.bincount(
+            codes, weights=columns.field(name)[mask], minlength=len(labels)
+        )
+        for name in NUMERIC_FIELDS
+    }
+
+    order = np.argsort(codes, kind="stable") if percentiles else None
+    boundaries = np.cumsum(counts)
+
+    groups = []
+    for code, label in enumerate(labels):
+        if not counts[code]:
+            continue
+        group = {
+            "group": label,
+            "count": int(counts[code]),
+            **{f"total_{name}": float(totals[name][code]) for name in NUMERIC_FIELDS},
+        }
+        if percentiles:
+            rows = order[boundaries[code] - counts[code] : boundaries[code]]
+            for name in NUMERIC_FIELDS:
+                values = columns.field(name)[mask][rows]
+                group[f"{name}_percentiles"] = dict(
+                    zip(
+                        (str(q) for q in percentiles),
+                        np.percentile(values, percentiles).tolist(),
+                    )
+                )
+        groups.append(group)
+    return groups
+
+
+def rolling_daily(
+    columns: WorkoutColumns,
+    field: str,
+    window_days: int,
+    start: str = None,
+    end: str = None,
+    sport: str = None,
+) -> List[dict]:
+    """
+    Daily series of the rolling `window_days` sum of a numeric field, from
+    `start` to `end` (ISO dates, defaulting to the first and last workout day).
+    A defaulted bound is clamped to MAX_ROLLING_DAYS from the other one; an
+    explicit `start`-`end` span longer than that raises ValueError.
+    """
+    mask = columns.sport_mask(sport) & ~np.isnat(columns.start_times)
+    if not mask.any():
+        return []
+    days = columns.start_times[mask].astype("datetime64[D]")
+    values = columns.field(field)[mask]
+
+    max_span = np.timedelta64(MAX_ROLLING_DAYS - 1, "D")
+    if start and end:
+        first, last = np.datetime64(start, "D"), np.datetime64(end, "D")
+        if last - first > max_span:
+            raise ValueError(f"Date range is longer than {MAX_ROLLING_DAYS} days")
+    elif start:
+        first = np.datetime64(start, "D")
+        last = min(days.max(), first + max_span)
+    else:
+        last = np.datetime64(end, "D") if end else days.max()
+        first = max(days.min(), last - max_span)
+    if last < first:
+        return []
+    # Include the window lead-in so the first output day has a full window
+    origin = first - np.timedelta64(window_days - 1, "D")
+    span = int((last - origin).astype(int)) + 1
+    offsets = (days - origin).astype(np.int64)
+    in_range = (offsets >= 0) & (offsets < span)
+    daily = np.bincount(offsets[in_range], weights=values[in_range], minlength=span)
+
+    cumulative = np.concatenate(([0.0], np.cumsum(daily)))
+    rolling = cumulative[window_days:] - cumulative[:-window_days]
+    dates = np.arange(first, last + np.timedelta64(1, "D"))
+    return [
+        {"date": str(date), "value": float(value)}
+        for date, value in zip(dates, rolling)
+    ]
@@ -4,10 +4,17 @@ from dynamodb.helpers.user_profile_helper import UserProfileHelper
 import os
 import json
 import boto3
+from helpers.consumed_capacity import install_capacity_hooks, track_capacity
+from helpers.warm_up import warm_up
 
 logger = Logger(service="workout-tracer-backfill-location-badges")
 
+install_capacity_hooks()
 
+warm_up(["dynamodb", "sqs"])
+
+
+@track_capacity("backfill_location_badges")
 def lambda_handler(event, context):
     """
     Backfill location badges for a user's workouts by enqueuing them
@@ -4,7 +4,6 @@ from dynamodb.helpers.strava_credentials_helper import StravaCredentialsHelper
 from clients.strava_client import StravaClient, StravaAuthCodeExchangeError
 from dynamodb.models.strava_profile_model import StravaAthleteModel
 from dynamodb.models.strava_credentials_model import StravaCredentialsModel
-from aws_lambda_powertools.metrics import Metrics, MetricUnit
 import requests
 from datetime import datetime, timedelta
 import os
@@ -13,9 +12,16 @@ import pytz
 import base64
 import json
 import boto3
+from helpers.consumed_capacity import install_capacity_hooks, track_capacity
+from helpers.metrics_emitter import emit_metric, track_metrics
+from helpers.warm_up import warm_up
 
 logger = Logger(service="workout-tracer-strava-batch-update")
 
+install_capacity_hooks()
+
+warm_up(["dynamodb", "sqs", "kms", "strava_keys"])
+
 
 def get_valid_strava_credentials(user_id, request_id, logger):
     credentials_helper = StravaCredentialsHelper(request_id=request_id)
@@ -39,15 +45,15 @@ def user_exists_in_cognito(user_id):
         return False
 
 
+@track_metrics
+@track_capacity("batch_update_workouts")
 def lambda_handler(event, context):
     stage = os.getenv("STAGE")
     request_id = getattr(context, "aws_request_id", None)
     logger.append_keys(request_id=request_id)
 
-    metrics = Metrics(
-        namespace=f"WorkoutTracer-{stage.capitalize()}",
-        service="workout_tracer_batch_update",
-    )
+    metrics_namespace = f"WorkoutTracer-{stage.capitalize()}"
+    metrics_dimensions = {"service": "workout_tracer_batch_update"}
 
     max_messages = event.get("max_messages", 550) if isinstance(event, dict) else 550
 
@@ -97,10 +103,11 @@ def lambda_handler(event, context):
                     ReceiptHandle=msg["ReceiptHandle"],
                 )
                 deleted_user_not_exist += 1
-                metrics.add_metric(
-                    name="UserNotExistDelete", unit=MetricUnit.Count, value=1
+                emit_metric(
+                    "UserNotExistDelete",
+                    metrics_dimensions,
+                    namespace=metrics_namespace,
                 )
-                metrics.flush_metrics()
                 continue
 
             # Use the helper to get valid credentials
@@ -114,10 +121,9 @@ def lambda_handler(event, context):
                     f"Strava credentials not found or could not be refreshed for user_id: {user_id}"
                 )
                 errors += 1
-                metrics.add_metric(
-                    name="PutWorkoutError", unit=MetricUnit.Count, value=1
+                emit_metric(
+                    "PutWorkoutError", metrics_dimensions, namespace=metrics_namespace
                 )
-                metrics.flush_metrics()
                 continue
 
             strava_client = StravaClient(request_id=request_id)
@@ -128,10 +134,9 @@ def lambda_handler(event, context):
             if not workout_data:
                 logger.error(f"Failed to retrieve workout data for ID {workout_id}.")
                 errors += 1
-                metrics.add_metric(
-                    name="PutWorkoutError", unit=MetricUnit.Count, value=1
+                emit_metric(
+                    "PutWorkoutError", metrics_dimensions, namespace=metrics_namespace
                 )
-                metrics.flush_metrics()
                 continue
 
             workout_helper = StravaWorkoutHelper(request_id=request_id)
@@ -141,8 +146,9 @@ def lambda_handler(event, context):
             logger.info(
                 f"Workout {workout_id} for user {user_id} stored with action: {action}"
             )
-            metrics.add_metric(name="PutWorkoutSuccess", unit=MetricUnit.Count, value=1)
-            metrics.flush_metrics()
+            emit_metric(
+                "PutWorkoutSuccess", metrics_dimensions, namespace=metrics_namespace
+            )
 
             sqs.delete_message(
                 QueueUrl=sqs_queue_url,
@@ -155,8 +161,9 @@ def lambda_handler(event, context):
                 f"Error processing message for user_id={body.get('user_id', 'unknown')}, workout_id={body.get('workout_id', 'unknown')}: {e}"
             )
             errors += 1
-            metrics.add_metric(name="PutWorkoutError", unit=MetricUnit.Count, value=1)
-            metrics.flush_metrics()
+            emit_metric(
+                "PutWorkoutError", metrics_dimensions, namespace=metrics_namespace
+            )
 
     logger.info(
         f"Processed: {processed}, Errors: {errors}, DeletedUserNotExist: {deleted_user_not_exist}"
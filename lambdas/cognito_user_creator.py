@@ -5,9 +5,15 @@ from typing import Dict, Tuple
 from aws_lambda_powertools import Logger
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from dynamodb.helpers.user_profile_helper import UserProfileHelper
+from helpers.consumed_capacity import install_capacity_hooks, track_capacity
+from helpers.warm_up import warm_up
 
 logger = Logger(service="WorkoutTracer-Cognito-User-Creator")
 
+install_capacity_hooks()
+
+warm_up(["dynamodb", "sns"])
+
 
 class UserProfileCreationError(Exception):
     """Raised when user profile creation fails - this should fail the Lambda."""
@@ -113,6 +119,7 @@ def create_user_profile(
 
 
 @logger.inject_lambda_context
+@track_capacity("cognito_user_creator")
 def handler(event: dict, context: LambdaContext) -> dict:
     """Handle Cognito PostConfirmation trigger."""
     logger.info("POST_CONFIRMATION Lambda triggered")
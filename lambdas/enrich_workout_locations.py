@@ -2,10 +2,17 @@ import json
 from aws_lambda_powertools import Logger
 from dynamodb.helpers.strava_workout_helper import StravaWorkoutHelper
 from dynamodb.helpers.apple_health_workout_helper import AppleHealthWorkoutHelper
+from dynamodb.helpers.public_bundle_helper import PublicBundleHelper
 from constants.general import KML_LOCATION_FILES, ALLOWLISTED_LOCATIONS
+from helpers.consumed_capacity import install_capacity_hooks, track_capacity
+from helpers.warm_up import warm_up
 
 logger = Logger(service="workout-tracer-enrich-workout-locations")
 
+install_capacity_hooks()
+
+warm_up(["dynamodb", "s3", "kml_states", "kml_countries"])
+
 
 def _enrich_workout(user_id, workout_id, request_id, source="strava"):
     if source == "apple_health":
@@ -44,6 +51,7 @@ def _enrich_workout(user_id, workout_id, request_id, source="strava"):
         matched.extend(name for name, hit in locaton_dict.items() if hit)
 
     workout_helper.update_workout_locations(user_id, workout_id, location_data)
+    PublicBundleHelper(request_id=request_id).request_refresh(user_id, ["locations"])
 
     logger.info(f"Enriched workout {workout_id} for user {user_id}: matched={matched}")
     return {
@@ -53,6 +61,7 @@ def _enrich_workout(user_id, workout_id, request_id, source="strava"):
     }
 
 
+@track_capacity("enrich_workout_locations")
 def lambda_handler(event, context):
     request_id = getattr(context, "aws_request_id", None)
     logger.append_keys(request_id=request_id)
@@ -0,0 +1,184 @@
+import gzip
+import json
+import os
+from datetime import datetime
+import boto3
+from aws_lambda_powertools import Logger
+from dynamodb.helpers.public_snapshot_helper import PublicSnapshotHelper
+from dynamodb.helpers.user_profile_helper import UserProfileHelper
+from dynamodb.helpers.workout_change_log_helper import WorkoutChangeLogHelper
+from dynamodb.helpers.workout_stats_helper import WorkoutStatsHelper
+from endpoints.public.get_public_workouts import build_workouts_page
+from endpoints.public.get_public_workout_locations import build_combined_locations
+from helpers.polyline_resolution import POLYLINE_DETAIL_LEVELS
+from helpers.consumed_capacity import install_capacity_hooks, track_capacity
+from helpers.warm_up import warm_up
+
+logger = Logger(service="workout-tracer-publish-public-snapshots")
+
+install_capacity_hooks()
+
+warm_up(["dynamodb", "s3", "sqs"])
+
+SNAPSHOT_PREFIX = "public-snapshots"
+# Versioned objects never change; the manifest is what readers poll
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MANIFEST_CACHE_CONTROL = "public, max-age=60"
+# Same default page size as GET /public/workouts
+WORKOUTS_PAGE_LIMIT = 500
+# Stats snapshot: monthly rollups across every source
+STATS_PERIOD = "month"
+
+
+def _put_json(s3, bucket: str, key: str, content: dict, cache_control: str):
+    s3.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=gzip.compress(json.dumps(content, separators=(",", ":")).encode()),
+        ContentType="application/json",
+        ContentEncoding="gzip",
+        CacheControl=cache_control,
+    )
+
+
+def _render_snapshots(user_id: str, user_profile: dict, request_id: str) -> dict:
+    """
+    Render the response bodies served for a public profile page: the first
+    page of GET /public/workouts at every polyline detail, the stats and the
+    location summary.
+    """
+    show_source = user_profile.get("show_workout_source", False)
+    snapshots = {
+        f"workouts_{detail}": build_workouts_page(
+            request_id, user_id, show_source, WORKOUTS_PAGE_LIMIT, None, detail
+        )
+        for detail in POLYLINE_DETAIL_LEVELS
+    }
+    snapshots["stats"] = {
+        "period": STATS_PERIOD,
+        "buckets": WorkoutStatsHelper(request_id=request_id).get_stats_range(
+            user_id, STATS_PERIOD
+        ),
+    }
+    snapshots["locations"] = build_combined_locations(request_id, user_id)
+    return snapshots
+
+
+def _remove_snapshots(s3, bucket: str, base_key: str) -> int:
+    """Delete every snapshot object under base_key, manifest included."""
+    removed = 0
+    paginator = s3.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=f"{base_key}/"):
+        keys = [{"Key": obj["Key"]} for obj in page.get("Contents", [])]
+        if keys:
+            s3.delete_objects(Bucket=bucket, Delete={"Objects": keys, "Quiet": True})
+            removed += len(keys)
+    return removed
+
+
+def _publish(user_id: str, request_id: str, force: bool = False) -> dict:
+    bucket = os.getenv("SNAPSHOT_BUCKET")
+    if not bucket:
+        raise ValueError("SNAPSHOT_BUCKET is not set.")
+
+    snapshot_helper = PublicSnapshotHelper(request_id=request_id)
+    published_seq = snapshot_helper.claim(user_id)
+    version = WorkoutChangeLogHelper(request_id=request_id).get_latest_seq(user_id)
+    s3 = boto3.client("s3", region_name="us-west-2")
+
+    # Check visibility before the version shortcut: going private changes no
+    # workout, but the published snapshots must still come down
+    user_profile = UserProfileHelper(request_id=request_id).get_user_profile(user_id)
+    if not user_profile or not user_profile.get("public_profile", False):
+        display_id = (user_profile or {}).get("user_display_id")
+        removed = 0
+        if display_id is not None:
+            removed = _remove_snapshots(s3, bucket, f"{SNAPSHOT_PREFIX}/{display_id}")
+        if published_seq is not None or removed:
+            snapshot_helper.mark_unpublished(user_id)
+        logger.info(
+            f"User {user_id} is not public, removed {removed} snapshot objects."
+        )
+        return {
+            "user_id": user_id,
+            "version": version,
+            "published": False,
+            "removed": removed,
+        }
+
+    if not force and published_seq == version:
+        logger.info(f"Snapshot for user {user_id} already at version {version}")
+        return {"user_id": user_id, "version": version, "published": False}
+
+    display_id = user_profile.get("user_display_id")
+    base_key = f"{SNAPSHOT_PREFIX}/{display_id}"
+
+    objects = {}
+    for name, content in _render_snapshots(user_id, user_profile, request_id).items():
+        key = f"{base_key}/v{version}/{name}.json"
+        _put_json(s3, bucket, key, content, IMMUTABLE_CACHE_CONTROL)
+        objects[name] = key
+
+    manifest_key = f"{base_key}/latest.json"
+    _put_json(
+        s3,
+        bucket,
+        manifest_key,
+        {
+            "version": version,
+            "generated_at": datetime.utcnow().isoformat(),
+            "objects": objects,
+        },
+        MANIFEST_CACHE_CONTROL,
+    )
+    snapshot_helper.mark_published(user_id, version, manifest_key)
+    logger.info(f"Published snapshot v{version} for user {user_id} to {base_key}")
+    return {"user_id": user_id, "version": version, "published": True}
+
+
+@track_capacity("publish_public_snapshots")
+def lambda_handler(event, context):
+    """
+    Publish static snapshots of opted-in users' public pages to S3.
+
+    SQS records carry {"user_id": "abc123"} and are queued (with a debounce
+    delay) by PublicSnapshotHelper.request_publish; profile changes queue
+    {"user_id": "abc123", "force": true} with no delay. Users who are no
+    longer public have their snapshots removed. Direct invocation:
+      { "user_id": "abc123", "force": true }
+    """
+    request_id = getattr(context, "aws_request_id", None)
+    logger.append_keys(request_id=request_id)
+
+    records = event.get("Records", [])
+    if records:
+        batch_item_failures = []
+        # A batch may hold several messages for one user; publish each once
+        record_ids_by_user = {}
+        forced_users = set()
+        for record in records:
+            body = json.loads(record["body"])
+            user_id = body.get("user_id")
+            if not user_id:
+                logger.error(f"Missing user_id in SQS record: {record['messageId']}")
+                batch_item_failures.append({"itemIdentifier": record["messageId"]})
+                continue
+            record_ids_by_user.setdefault(user_id, []).append(record["messageId"])
+            if body.get("force"):
+                forced_users.add(user_id)
+
+        for user_id, message_ids in record_ids_by_user.items():
+            try:
+                _publish(user_id, request_id, force=user_id in forced_users)
+            except Exception as e:
+                logger.error(f"Failed to publish snapshot for user {user_id}: {e}")
+                batch_item_failures.extend(
+                    {"itemIdentifier": message_id} for message_id in message_ids
+                )
+        return {"batchItemFailures": batch_item_failures}
+
+    user_id = event.get("user_id")
+    if not user_id:
+        logger.error("Missing user_id in event.")
+        return {"error": "user_id is required."}
+    return _publish(user_id, request_id, force=event.get("force", False))
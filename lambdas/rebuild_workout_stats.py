@@ -0,0 +1,85 @@
+from aws_lambda_powertools import Logger
+from dynamodb.helpers.strava_workout_helper import StravaWorkoutHelper
+from dynamodb.helpers.apple_health_workout_helper import AppleHealthWorkoutHelper
+from dynamodb.helpers.user_profile_helper import UserProfileHelper
+from dynamodb.helpers.workout_stats_helper import WorkoutStatsHelper, STATS_PROJECTIONS
+from helpers.consumed_capacity import install_capacity_hooks, track_capacity
+from helpers.warm_up import warm_up
+
+logger = Logger(service="workout-tracer-rebuild-workout-stats")
+
+install_capacity_hooks()
+
+warm_up(["dynamodb"])
+
+
+@track_capacity("rebuild_workout_stats")
+def lambda_handler(event, context):
+    """
+    Seed workout stats rollups (all-time plus day, week and month buckets)
+    from raw workouts for users stored before rollups existed. Each user and
+    source is seeded once, guarded by a STATS_SEEDED marker item; pass
+    "force" to rebuild seeded users too, e.g. after changing rollup or bucket
+    definitions. A failed workout read fails that user and source without
+    touching their rollups.
+
+    Event schema:
+      { "user_id": "abc123" }          # single user
+      { "user_id": ["abc123", "xyz"] } # multiple users
+      { "all_users": true }            # every user in the table
+      { ..., "force": true }           # also rebuild already seeded users
+    """
+    request_id = getattr(context, "aws_request_id", None)
+    logger.append_keys(request_id=request_id)
+
+    user_id = event.get("user_id")
+    all_users = event.get("all_users", False)
+    force = event.get("force", False)
+
+    if user_id and all_users:
+        return {"error": "Cannot specify both user_id and all_users."}
+    if not user_id and not all_users:
+        return {"error": "Must specify either user_id or all_users."}
+
+    if all_users:
+        user_ids = UserProfileHelper(request_id=request_id).get_all_user_ids()
+        logger.info(f"all_users=True: found {len(user_ids)} users")
+    else:
+        user_ids = [user_id] if isinstance(user_id, str) else user_id
+
+    stats_helper = WorkoutStatsHelper(request_id=request_id)
+    workout_helpers = {
+        "strava": StravaWorkoutHelper(request_id=request_id),
+        "apple_health": AppleHealthWorkoutHelper(request_id=request_id),
+    }
+
+    results = []
+    for uid in user_ids:
+        result = {"user_id": uid}
+        for source, workout_helper in workout_helpers.items():
+            projection_expression, expression_attribute_names = STATS_PROJECTIONS[
+                source
+            ]
+            try:
+                stats = stats_helper.seed_stats(
+                    uid,
+                    source,
+                    lambda: workout_helper.iter_all_workouts(
+                        uid,
+                        projection_expression=projection_expression,
+                        expression_attribute_names=expression_attribute_names,
+                    ),
+                    force=force,
+                )
+                result[source] = (
+                    "already seeded"
+                    if stats is None
+                    else sum(entry["count"] for entry in stats)
+                )
+            except Exception as e:
+                logger.error(f"Failed to rebuild {source} stats for user {uid}: {e}")
+                result[source] = None
+        logger.info(f"Seeded stats for user {uid}: {result}")
+        results.append(result)
+
+    return {"results": results}
@@ -0,0 +1,78 @@
+import json
+from aws_lambda_powertools import Logger
+from dynamodb.helpers.public_bundle_helper import (
+    BUNDLE_SECTIONS,
+    DEFERRED_SECTIONS,
+    PublicBundleHelper,
+)
+from helpers.consumed_capacity import install_capacity_hooks, track_capacity
+from helpers.warm_up import warm_up
+
+logger = Logger(service="workout-tracer-refresh-public-bundles")
+
+install_capacity_hooks()
+
+warm_up(["dynamodb"])
+
+
+def _refresh(user_id: str, sections, request_id: str) -> dict:
+    bundle_helper = PublicBundleHelper(request_id=request_id)
+    bundle_helper.claim_refresh(user_id)
+    updated = bundle_helper.refresh(user_id, sections)
+    logger.info(f"Refreshed public bundle sections {list(updated)} for {user_id}")
+    return {"user_id": user_id, "sections": list(updated)}
+
+
+@track_capacity("refresh_public_bundles")
+def lambda_handler(event, context):
+    """
+    Rebuild the expensive sections of users' public bundles.
+
+    SQS records carry {"user_id": "abc123", "sections": ["locations"]} and are
+    queued (with a debounce delay) by PublicBundleHelper.request_refresh.
+    Direct invocation:
+      { "user_id": "abc123", "sections": ["locations"] }
+    """
+    request_id = getattr(context, "aws_request_id", None)
+    logger.append_keys(request_id=request_id)
+
+    records = event.get("Records", [])
+    if records:
+        batch_item_failures = []
+        # A batch may hold several messages for one user; refresh each once
+        record_ids_by_user = {}
+        sections_by_user = {}
+        for record in records:
+            body = json.loads(record["body"])
+            user_id = body.get("user_id")
+            if not user_id:
+                logger.error(f"Missing user_id in SQS record: {record['messageId']}")
+                batch_item_failures.append({"itemIdentifier": record["messageId"]})
+                continue
+            record_ids_by_user.setdefault(user_id, []).append(record["messageId"])
+            sections_by_user.setdefault(user_id, set()).update(
+                section
+                for section in body.get("sections", DEFERRED_SECTIONS)
+                if section in BUNDLE_SECTIONS
+            )
+
+        for user_id, message_ids in record_ids_by_user.items():
+            try:
+                _refresh(user_id, sorted(sections_by_user[user_id]), request_id)
+            except Exception as e:
+                logger.error(f"Failed to refresh public bundle for user {user_id}: {e}")
+                batch_item_failures.extend(
+                    {"itemIdentifier": message_id} for message_id in message_ids
+                )
+        return {"batchItemFailures": batch_item_failures}
+
+    user_id = event.get("user_id")
+    if not user_id:
+        logger.error("Missing user_id in event.")
+        return {"error": "user_id is required."}
+    sections = [
+        section
+        for section in event.get("sections", DEFERRED_SECTIONS)
+        if section in BUNDLE_SECTIONS
+    ]
+    return _refresh(user_id, sections, request_id)
@@ -7,10 +7,19 @@ import json
 import boto3
 from datetime import datetime
 import pytz
+from helpers.consumed_capacity import install_capacity_hooks, track_capacity
+from helpers.metrics_emitter import track_metrics
+from helpers.warm_up import warm_up
 
 logger = Logger(service="workout-tracer-strava-onboarding")
 
+install_capacity_hooks()
 
+warm_up(["dynamodb", "sqs", "lambda", "kms", "strava_keys"])
+
+
+@track_metrics
+@track_capacity("strava_onboarding_v2")
 def lambda_handler(event, context):
     request_id = getattr(context, "aws_request_id", None)
     logger.append_keys(request_id=request_id)
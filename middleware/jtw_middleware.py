@@ -1,37 +1,62 @@
-from fastapi import FastAPI, Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
-from helpers.jwt import decode_jwt
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from helpers.jwt import JWT_VERIFICATION, decode_jwt, signing_key_loaded, verify_jwt
 from aws_lambda_powertools import Logger
 
 logger = Logger(service="workout-tracer-api")
 
 
-class JWTMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        logger.debug(f"JWTMiddleware: Path={request.url.path} Method={request.method}")
-        auth_header = request.headers.get("authorization")
-        token_user_id = None
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
-            logger.debug("Authorization header found, attempting to decode JWT.")
-            try:
-                claims = decode_jwt(token)
-                token_user_id = claims.get("sub")
-                logger.debug(f"JWT decoded successfully. sub: {token_user_id}")
-            except Exception as e:
-                logger.warning(f"JWT decode failed: {e}")
-        else:
-            logger.debug("No valid Authorization header found.")
-        if not token_user_id:
-            logger.warning(f"No valid user token for path {request.url.path}")
-            if request.url.path == "/docs":
-                logger.debug(
-                    "Passing /docs request to next middleware for Cognito redirect."
-                )
-                return await call_next(request)
-        request.state.user_token = token_user_id
-        response = await call_next(request)
-        logger.debug(
-            f"Response status for {request.url.path}: {getattr(response, 'status_code', 'unknown')}"
-        )
-        return response
+def token_claims(token: str) -> dict:
+    """
+    Claims of a bearer token under the JWT_VERIFICATION mode: verified in
+    enforce mode, verified with failures only logged in report mode, and
+    decoded without verification when off.
+    """
+    if JWT_VERIFICATION == "off":
+        return decode_jwt(token)
+    try:
+        return verify_jwt(token)
+    except Exception as e:
+        if JWT_VERIFICATION != "report":
+            raise
+        logger.warning(f"JWT verification failed (report only): {e}")
+        return decode_jwt(token)
+
+
+def extract_claims(request: Request) -> dict:
+    """
+    Read the request's bearer token claims. Returns {} when the header is
+    missing or the token cannot be decoded or verified.
+    """
+    logger.debug(f"JWT: Path={request.url.path} Method={request.method}")
+    auth_header = request.headers.get("authorization")
+    claims = {}
+    if auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ")[1]
+        logger.debug("Authorization header found, attempting to decode JWT.")
+        try:
+            claims = token_claims(token)
+            logger.debug(f"JWT decoded successfully. sub: {claims.get('sub')}")
+        except Exception as e:
+            logger.warning(f"JWT decode failed: {e}")
+    else:
+        logger.debug("No valid Authorization header found.")
+    if not claims.get("sub"):
+        logger.warning(f"No valid user token for path {request.url.path}")
+    return claims
+
+
+async def extract_claims_async(request: Request) -> dict:
+    """
+    extract_claims for async middleware. A token whose signing key is not
+    loaded may fetch the JWKS, so it is verified on the threadpool instead
+    of blocking the event loop.
+    """
+    auth_header = request.headers.get("authorization")
+    if (
+        auth_header
+        and auth_header.startswith("Bearer ")
+        and not signing_key_loaded(auth_header.split(" ")[1])
+    ):
+        return await run_in_threadpool(extract_claims, request)
+    return extract_claims(request)
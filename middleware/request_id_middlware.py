@@ -1,4 +1,4 @@
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
 from aws_lambda_powertools import Logger
 from constants.general import SERVICE_NAME
 import uuid
@@ -6,16 +6,18 @@ import uuid
 logger = Logger(service=SERVICE_NAME)
 
 
-class RequestIdMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        context = request.scope.get("aws.context")
-        if context:
-            request_id = getattr(context, "aws_request_id", None)
-            logger.append_keys(request_id=request_id)
-        else:
-            request_id = str(uuid.uuid4())
-            logger.append_keys(request_id=request_id)
-            logger.info("No aws.context found generated request_id")
-        request.state.request_id = request_id
-        response = await call_next(request)
-        return response
+def assign_request_id(request: Request) -> str:
+    """
+    Use the Lambda request id (or a new uuid locally) as the request id, on
+    request.state and on every log line.
+    """
+    context = request.scope.get("aws.context")
+    if context:
+        request_id = getattr(context, "aws_request_id", None)
+        logger.append_keys(request_id=request_id)
+    else:
+        request_id = str(uuid.uuid4())
+        logger.append_keys(request_id=request_id)
+        logger.info("No aws.context found generated request_id")
+    request.state.request_id = request_id
+    return request_id
@@ -0,0 +1,101 @@
+from starlette.requests import Request
+from helpers import (
+    consumed_capacity,
+    dependency_timing,
+    metrics_emitter,
+    request_profiler,
+)
+from helpers.jwt import promote_id_token_cookie
+from middleware.cognito_auth_middleware import cognito_docs_response
+from middleware.jtw_middleware import extract_claims_async
+from middleware.request_id_middlware import assign_request_id
+
+
+class RequestPipelineMiddleware:
+    """
+    Pure ASGI middleware running the per-request steps that used to be
+    separate BaseHTTPMiddleware layers, in the same order: id_token cookie
+    promotion, optional profiling, JWT claim extraction, request id, then the
+    Cognito docs redirect. Responses are streamed straight through, without the extra
+    task and body stream each BaseHTTPMiddleware layer added. Downstream call
+    timings, DynamoDB consumed capacity and emitted metrics are collected for
+    every request and reported once it finishes.
+    """
+
+    def __init__(self, app, route_loader=None):
+        self.app = app
+        # endpoints.get_all_routes.LazyRouteLoader, when routes load on demand
+        self.route_loader = route_loader
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        promote_id_token_cookie(scope)
+        # One Request per scope; request.state writes through to scope["state"]
+        request = Request(scope, receive)
+        metrics = metrics_emitter.MetricsAggregator()
+        timings = dependency_timing.RequestTimings()
+        capacity = consumed_capacity.CapacityUsage()
+        trigger = request_profiler.sample_trigger(request.headers)
+        profile = None
+        if trigger is not None:
+            profile = request_profiler.RequestProfile(
+                method=request.method,
+                path=request.url.path,
+                request_id=None,
+                trigger=trigger,
+            )
+        status_code = None
+
+        async def send_with_timings(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if dependency_timing.SERVER_TIMING_ENABLED:
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"server-timing", timings.server_timing().encode()),
+                    ]
+            await send(message)
+
+        metrics.start()
+        timings.start()
+        capacity.start()
+        if profile is not None:
+            profile.start()
+        try:
+            await self._handle(request, scope, receive, send_with_timings)
+        finally:
+            endpoint = request_profiler.route_template(scope)
+            if profile is not None:
+                profile.finish(
+                    status_code,
+                    endpoint=endpoint,
+                    request_id=getattr(request.state, "request_id", None),
+                )
+            capacity.finish(endpoint)
+            timings.finish(status_code, endpoint=endpoint, method=request.method)
+            # Everything the request emitted goes out in one flush
+            metrics.finish()
+
+    async def _handle(self, request: Request, scope, receive, send):
+        # Decoded once here; endpoints reuse them via helpers.jwt.get_jwt_claims
+        request.state.jwt_claims = await extract_claims_async(request)
+        user_token = request.state.jwt_claims.get("sub")
+        # /docs without a token is left to the Cognito redirect below
+        if user_token or request.url.path != "/docs":
+            request.state.user_token = user_token
+
+        assign_request_id(request)
+
+        if self.route_loader is not None:
+            self.route_loader.ensure_loaded(scope["path"])
+
+        response = await cognito_docs_response(request)
+        if response is not None:
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
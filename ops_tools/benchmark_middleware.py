@@ -0,0 +1,158 @@
+import sys
+import os
+import argparse
+import base64
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# Per-request info logs would dominate the timings
+os.environ.setdefault("POWERTOOLS_LOG_LEVEL", "WARNING")
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from helpers import request_profiler
+from middleware.cognito_auth_middleware import cognito_docs_response
+from middleware.jtw_middleware import extract_claims
+from middleware.request_id_middlware import assign_request_id
+from middleware.request_pipeline_middleware import RequestPipelineMiddleware
+
+
+class _ProfilingLayer(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        request_profiler.sample_trigger(request.headers)
+        return await call_next(request)
+
+
+class _JWTLayer(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        request.state.user_token = extract_claims(request).get("sub")
+        return await call_next(request)
+
+
+class _RequestIdLayer(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        assign_request_id(request)
+        return await call_next(request)
+
+
+class _CognitoLayer(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await cognito_docs_response(request)
+        return response or await call_next(request)
+
+
+def make_app(stack: str) -> FastAPI:
+    """
+    A one-route app behind the given middleware stack. "basehttp" is the
+    previous layout, the same steps as four BaseHTTPMiddleware layers.
+    """
+    app = FastAPI()
+
+    @app.get("/bench")
+    def bench(request: Request):
+        return JSONResponse(
+            content={"user": getattr(request.state, "user_token", None)}
+        )
+
+    if stack == "basehttp":
+        for layer in (_CognitoLayer, _RequestIdLayer, _JWTLayer, _ProfilingLayer):
+            app.add_middleware(layer)
+    elif stack == "pipeline":
+        app.add_middleware(RequestPipelineMiddleware)
+    return app
+
+
+def make_token() -> str:
+    """Unsigned JWT; the middleware only reads claims."""
+    segments = [{"alg": "none"}, {"sub": "benchmark-user"}]
+    return (
+        ".".join(
+            base64.urlsafe_b64encode(json.dumps(segment).encode()).decode().rstrip("=")
+            for segment in segments
+        )
+        + ".sig"
+    )
+
+
+def load_test(port: int, requests: int, concurrency: int) -> dict:
+    url = f"http://127.0.0.1:{port}/bench"
+    headers = {"Authorization": f"Bearer {make_token()}"}
+    latencies = []
+
+    def worker(count):
+        with httpx.Client() as client:
+            for _ in range(count):
+                started = time.perf_counter()
+                response = client.get(url, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+
+    per_worker = requests // concurrency
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, [per_worker] * concurrency))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def run(stack: str, port: int, requests: int, concurrency: int) -> dict:
+    server = uvicorn.Server(
+        uvicorn.Config(make_app(stack), port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    try:
+        # Warm up connections and imports before measuring
+        load_test(port, concurrency * 10, concurrency)
+        return load_test(port, requests, concurrency)
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure per-request middleware overhead under a local uvicorn load test."
+    )
+    parser.add_argument(
+        "--stacks",
+        nargs="+",
+        default=["none", "basehttp", "pipeline"],
+        choices=["none", "basehttp", "pipeline"],
+        help="Middleware stacks to compare",
+    )
+    parser.add_argument("--requests", type=int, default=4000, help="Requests per stack")
+    parser.add_argument("--concurrency", type=int, default=8, help="Client threads")
+    parser.add_argument("--port", type=int, default=8765, help="Local port")
+    args = parser.parse_args()
+
+    results = {
+        stack: run(stack, args.port, args.requests, args.concurrency)
+        for stack in args.stacks
+    }
+    baseline = results.get("none")
+    print(f"{args.requests} requests, concurrency {args.concurrency}")
+    for stack, result in results.items():
+        overhead = (
+            f"{result['p50_ms'] - baseline['p50_ms']:+7.2f} ms p50 vs none"
+            if baseline and stack != "none"
+            else ""
+        )
+        print(
+            f"  {stack:<10} {result['requests_per_second']:8.0f} req/s"
+            f"  p50 {result['p50_ms']:6.2f} ms  p99 {result['p99_ms']:6.2f} ms  {overhead}"
+        )
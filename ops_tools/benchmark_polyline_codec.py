@@ -0,0 +1,85 @@
+import sys
+import os
+import argparse
+import math
+import random
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import numpy as np
+import polyline as polyline_lib
+from helpers import polyline_codec, polyline_resolution
+
+
+def make_routes(count, points):
+    """Random-walk routes shaped like recorded activities."""
+    rng = random.Random(42)
+    routes = []
+    for _ in range(count):
+        lat, lon = rng.uniform(-60, 60), rng.uniform(-170, 170)
+        heading = rng.uniform(0, 2 * math.pi)
+        coords = []
+        for _ in range(points):
+            heading += rng.gauss(0, 0.3)
+            lat += 1e-4 * math.cos(heading)
+            lon += 1e-4 * math.sin(heading)
+            coords.append((round(lat, 5), round(lon, 5)))
+        routes.append(polyline_lib.encode(coords))
+    return routes
+
+
+def check_equivalence(routes):
+    for encoded in routes:
+        expected = np.asarray(polyline_lib.decode(encoded))
+        decoded = polyline_codec.decode(encoded)
+        assert np.allclose(expected, decoded), "decode mismatch"
+        assert polyline_codec.encode(decoded) == encoded, "encode mismatch"
+        assert polyline_resolution.build_polyline_variants(
+            encoded
+        ) == polyline_resolution._build_polyline_variants_pure(
+            encoded
+        ), "variants mismatch"
+
+
+def run(count, points, repeat):
+    routes = make_routes(count, points)
+    check_equivalence(routes)
+    coords = [polyline_codec.decode(encoded) for encoded in routes]
+    coord_lists = [polyline_lib.decode(encoded) for encoded in routes]
+
+    cases = {
+        "polyline.decode (per route)": lambda: [
+            polyline_lib.decode(encoded) for encoded in routes
+        ],
+        "polyline_codec.decode (per route)": lambda: [
+            polyline_codec.decode(encoded) for encoded in routes
+        ],
+        "polyline.encode (per route)": lambda: [
+            polyline_lib.encode(route) for route in coord_lists
+        ],
+        "polyline_codec.encode (per route)": lambda: [
+            polyline_codec.encode(route) for route in coords
+        ],
+        "variants, polyline package (per route)": lambda: [
+            polyline_resolution._build_polyline_variants_pure(encoded)
+            for encoded in routes
+        ],
+        "variants, polyline_codec (per route)": lambda: [
+            polyline_resolution.build_polyline_variants(encoded) for encoded in routes
+        ],
+    }
+    print(f"{count} routes x {points} points, best of {repeat}")
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=repeat))
+        print(f"  {name:<38} {best * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the NumPy polyline codec against the polyline package."
+    )
+    parser.add_argument("--routes", type=int, default=1000, help="Number of routes")
+    parser.add_argument("--points", type=int, default=500, help="Points per route")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    args = parser.parse_args()
+    run(args.routes, args.points, args.repeat)
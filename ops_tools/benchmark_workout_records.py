@@ -0,0 +1,108 @@
+import sys
+import os
+import argparse
+import random
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from dynamodb.models.apple_health_workout_model import AppleHealthWorkoutModel
+from dynamodb.models.workout_summary import (
+    SUMMARY_SOURCE_FIELDS,
+    AppleHealthWorkoutSummary,
+    WorkoutSummary,
+)
+
+SPORTS = ("Run", "Walk", "Ride", "Hike", "Swim")
+
+
+def make_apple_health_items(count):
+    """Apple Health items shaped like AppleHealthWorkoutHelper.get_all_workouts rows."""
+    rng = random.Random(42)
+    items = []
+    for i in range(count):
+        duration = rng.uniform(600, 7200)
+        items.append(
+            {
+                "workout_uuid": f"uuid-{i}",
+                "name": f"Workout {i}",
+                "workout_activity_type": rng.choice(SPORTS),
+                "start_date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T07:30:00Z",
+                "total_distance": round(duration * rng.uniform(1.5, 4.0), 1),
+                "elevation_ascended": round(rng.uniform(0, 300), 1),
+                "duration": round(duration, 1),
+                "total_energy_burned": round(duration * 0.15, 1),
+                "summary_polyline": "_p~iF~ps|U_ulLnnqC_mqNvxq`@",
+                "locations": {"states": {"Washington": True}, "countries": {}},
+            }
+        )
+    return items
+
+
+def dict_summary(source, item):
+    """The intermediate dict aggregation paths used to build per workout."""
+    attributes = SUMMARY_SOURCE_FIELDS[source]
+    return {
+        field: item.get(attr) for field, attr in zip(WorkoutSummary._fields, attributes)
+    }
+
+
+def check_equivalence(items):
+    for item in items:
+        expected = AppleHealthWorkoutModel(**item).to_strava_format()
+        actual = AppleHealthWorkoutSummary.from_item(item).to_strava_format()
+        assert (
+            expected == actual
+        ), f"to_strava_format mismatch for {item['workout_uuid']}"
+
+
+def retained_kib(build):
+    """KiB still allocated after build() returns, i.e. the size of what it holds."""
+    tracemalloc.start()
+    held = build()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return retained / 1024
+
+
+def run(count, repeat):
+    items = make_apple_health_items(count)
+    check_equivalence(items[:1000])
+
+    cases = {
+        "AppleHealthWorkoutModel.to_strava_format": lambda: [
+            AppleHealthWorkoutModel(**item).to_strava_format() for item in items
+        ],
+        "AppleHealthWorkoutSummary.to_strava_format": lambda: [
+            AppleHealthWorkoutSummary.from_item(item).to_strava_format()
+            for item in items
+        ],
+        "AppleHealthWorkoutModel (construct only)": lambda: [
+            AppleHealthWorkoutModel(**item) for item in items
+        ],
+        "AppleHealthWorkoutSummary (construct only)": lambda: [
+            AppleHealthWorkoutSummary.from_item(item) for item in items
+        ],
+        "dict summary": lambda: [dict_summary("apple_health", item) for item in items],
+        "WorkoutSummary": lambda: [
+            WorkoutSummary.from_item("apple_health", item) for item in items
+        ],
+    }
+    print(f"{count} Apple Health workouts, best of {repeat}")
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=repeat))
+        kib = retained_kib(case)
+        print(f"  {name:<44} {best * 1000:9.1f} ms {kib:10.0f} KiB held")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark workout summary records against dicts and Pydantic models."
+    )
+    parser.add_argument(
+        "--workouts", type=int, default=10000, help="Number of workouts"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    args = parser.parse_args()
+    run(args.workouts, args.repeat)
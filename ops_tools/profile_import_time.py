@@ -0,0 +1,165 @@
+import sys
+import os
+import argparse
+import re
+import statistics
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+# "import time:       322 |        498 |       cryptography"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+# Route modules app preloads on purpose: the pagination_token_key warm-up item
+# (see helpers.warm_up) imports its endpoint module during init
+WARM_UP_ROUTE_MODULES = {"endpoints.public.get_public_workouts"}
+
+
+def measure(module: str, env: dict) -> dict:
+    """
+    Import `module` in a fresh interpreter under -X importtime and return
+    {module name: (self_us, cumulative_us, depth)}.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            timings[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return timings
+
+
+def median_timings(runs: list) -> dict:
+    """Per-module median across runs, for modules imported in every run."""
+    names = set.intersection(*(set(run) for run in runs))
+    return {
+        name: (
+            statistics.median(run[name][0] for run in runs),
+            statistics.median(run[name][1] for run in runs),
+            runs[0][name][2],
+        )
+        for name in names
+    }
+
+
+def group_by_package(timings: dict) -> dict:
+    """Sum self time per top-level package."""
+    packages = {}
+    for name, (self_us, _, _) in timings.items():
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+    return packages
+
+
+def eager_endpoint_modules(timings: dict) -> list:
+    """
+    Endpoint modules from ROUTE_GROUPS that were imported up front. With
+    LAZY_ROUTES on, LazyRouteLoader defers all of them to the first request.
+    """
+    from endpoints.get_all_routes import ROUTE_GROUPS
+
+    return sorted(
+        name
+        for _, module_names in ROUTE_GROUPS.values()
+        for name in module_names
+        if name in timings and name not in WARM_UP_ROUTE_MODULES
+    )
+
+
+def run(
+    module: str,
+    runs: int,
+    top: int,
+    sort: str,
+    budget_ms: float,
+    check_lazy_routes: bool = True,
+) -> int:
+    env = {"STAGE": "dev", **os.environ}
+    # Warm the bytecode cache so the first run is not an outlier
+    measure(module, env)
+    timings = median_timings([measure(module, env) for _ in range(runs)])
+    total_ms = timings[module][1] / 1000
+
+    key = 0 if sort == "self" else 1
+    rows = sorted(timings.items(), key=lambda row: row[1][key], reverse=True)
+    print(f"import {module}: {total_ms:.1f} ms (median of {runs} runs)\n")
+    print(f"  {'self ms':>9} {'cumul ms':>9}  module")
+    for name, (self_us, cumulative_us, _) in rows[:top]:
+        print(f"  {self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {name}")
+
+    print(f"\n  {'self ms':>9}  top-level package")
+    packages = sorted(group_by_package(timings).items(), key=lambda row: -row[1])
+    for package, self_us in packages[:top]:
+        print(f"  {self_us / 1000:9.1f}  {package}")
+
+    status = 0
+    # Wall time depends on the machine; which modules load up front does not
+    lazy_routes = env.get("LAZY_ROUTES", "true").lower() == "true"
+    if check_lazy_routes and module == "app" and lazy_routes:
+        eager = eager_endpoint_modules(timings)
+        if eager:
+            print(
+                f"\nFAIL: import app loaded route modules eagerly: {', '.join(eager)}"
+            )
+            status = 1
+        else:
+            print("\nOK: import app deferred every route module")
+
+    if budget_ms is not None:
+        if total_ms > budget_ms:
+            print(
+                f"\nFAIL: import {module} took {total_ms:.1f} ms, budget {budget_ms} ms"
+            )
+            return 1
+        print(f"\nOK: import {module} took {total_ms:.1f} ms, budget {budget_ms} ms")
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Report per-module import cost from python -X importtime."
+    )
+    parser.add_argument("--module", default="app", help="Module to import")
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Runs to take the median of"
+    )
+    parser.add_argument("--top", type=int, default=25, help="Rows to show")
+    parser.add_argument(
+        "--sort", choices=["self", "cumulative"], default="cumulative", help="Sort key"
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=(
+            float(os.environ["IMPORT_TIME_BUDGET_MS"])
+            if os.getenv("IMPORT_TIME_BUDGET_MS")
+            else None
+        ),
+        help="Exit non-zero when the import takes longer than this "
+        "(default: IMPORT_TIME_BUDGET_MS)",
+    )
+    parser.add_argument(
+        "--skip-lazy-routes-check",
+        action="store_true",
+        help="Do not fail when importing app loads route modules up front",
+    )
+    args = parser.parse_args()
+    sys.exit(
+        run(
+            args.module,
+            args.runs,
+            args.top,
+            args.sort,
+            args.budget_ms,
+            check_lazy_routes=not args.skip_lazy_routes_check,
+        )
+    )